@@ -0,0 +1,158 @@
+"""
+End-to-end benchmark of tools through the SSE, streamable-http and stdio
+servers.
+
+This runs the fake Pagoda (fake_pagoda.py) in this process, starts MCP
+Pagoda as a subprocess for each transport, and measures latency of tool
+calls one by one and throughput of concurrent calls in a session.
+
+    $ uv run python benchmarks/bench_e2e.py --items 20000 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+from fake_pagoda import add_arguments, config_from_arguments, start_in_thread
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamable_http_client
+
+TOKEN = "benchmark"
+
+# (tool name, arguments)
+SCENARIOS = [
+    ("get_model_list", {}),
+    ("get_item_list", {"model_id": 1}),
+    ("get_item_detail", {"item_id": 1}),
+    ("get_item_details", {"item_ids": list(range(1, 51))}),
+    ("advanced_search", {"entities": [1], "attrinfo": [], "fetch_all": True}),
+    ("router_topology", {}),
+    ("router_path", {"source": "router-0000", "target": "router-0050"}),
+]
+
+
+def server_command(endpoint: str, *args: str) -> list[str]:
+    return [sys.executable, "-m", "mcp_server", "--endpoint", endpoint, *args]
+
+
+async def run_scenarios(session: ClientSession, iterations: int, concurrency: int):
+    await session.initialize()
+    for tool, arguments in SCENARIOS:
+        # the first call warms up connections and caches
+        result = await session.call_tool(tool, arguments)
+        if result.isError:
+            raise RuntimeError(f"{tool} failed: {result.content[0].text}")
+        size = len(result.content[0].text.encode())
+
+        latencies = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await session.call_tool(tool, arguments)
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *[session.call_tool(tool, arguments) for _ in range(concurrency)]
+        )
+        throughput = concurrency / (time.perf_counter() - start)
+
+        latencies.sort()
+        print(
+            f"{tool:18} {size / 1024:9.1f} KiB "
+            f"mean {statistics.mean(latencies) * 1000:8.1f} ms "
+            f"p50 {latencies[len(latencies) // 2] * 1000:8.1f} ms "
+            f"max {latencies[-1] * 1000:8.1f} ms "
+            f"{throughput:8.1f} calls/s"
+        )
+
+
+async def bench_http(
+    endpoint: str, port: int, transport: str, iterations: int, concurrency: int
+):
+    process = subprocess.Popen(
+        server_command(endpoint, "--transport", transport, "--port", str(port)),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://localhost:{port}"
+        async with httpx.AsyncClient() as client:
+            while True:
+                try:
+                    await client.get(url + "/metrics")
+                    break
+                except httpx.ConnectError:
+                    await asyncio.sleep(0.1)
+
+        headers = {"Authorization": f"Bearer {TOKEN}"}
+        if transport == "streamable-http":
+            async with httpx.AsyncClient(headers=headers, timeout=300) as client:
+                async with streamable_http_client(url + "/mcp", http_client=client) as (
+                    read,
+                    write,
+                    _,
+                ):
+                    async with ClientSession(read, write) as session:
+                        await run_scenarios(session, iterations, concurrency)
+        else:
+            async with sse_client(url + "/sse", headers=headers) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await run_scenarios(session, iterations, concurrency)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def bench_stdio(endpoint: str, iterations: int, concurrency: int):
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=server_command(endpoint, "--transport", "stdio", "--token", TOKEN)[1:],
+    )
+    with open(os.devnull, "w") as errlog:
+        async with stdio_client(params, errlog=errlog) as (read, write):
+            async with ClientSession(read, write) as session:
+                await run_scenarios(session, iterations, concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pagoda-port", type=int, default=18080)
+    parser.add_argument("--port", type=int, default=18000)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--transport", choices=["sse", "streamable-http", "stdio", "all"], default="all"
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    config = config_from_arguments(args)
+    endpoint = start_in_thread(config, args.pagoda_port)
+    print(
+        f"models: {config.models}, items: {config.items}, "
+        f"search results: {config.search_results}, routers: {config.routers}, "
+        f"latency: {config.latency * 1000:.0f} ms"
+    )
+
+    for transport in ("sse", "streamable-http"):
+        if args.transport in (transport, "all"):
+            print(f"# {transport}")
+            asyncio.run(
+                bench_http(
+                    endpoint, args.port, transport, args.iterations, args.concurrency
+                )
+            )
+    if args.transport in ("stdio", "all"):
+        print("# stdio")
+        asyncio.run(bench_stdio(endpoint, args.iterations, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
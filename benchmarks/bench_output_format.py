@@ -0,0 +1,98 @@
+"""
+Benchmark of output formats of list tools selectable by output_format.
+
+This compares size of the results of get_item_list and advanced_search in
+"rows" (JSON array of objects) and "table" (column names and arrays of
+values) formats. Tokens are counted with tiktoken when it's installed,
+otherwise they are approximated by splitting into words and symbols.
+
+    $ uv run python benchmarks/bench_output_format.py --rows 20000
+"""
+
+import argparse
+import asyncio
+import re
+import timeit
+
+from fixtures import make_advanced_search_result, make_items
+
+from mcp_server.drivers.pagoda import AdvancedSearchResult
+from mcp_server.drivers.pagoda_async import project_advanced_search_result
+from mcp_server.lib.serializer import dumps
+from mcp_server.tools.common import (
+    dump_advanced_search_result,
+    dump_json_array,
+    dump_json_table,
+)
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count_tokens(text: str) -> int:
+        return len(_encoding.encode(text))
+
+    TOKENIZER = "tiktoken cl100k_base"
+except ImportError:
+    _TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+    def count_tokens(text: str) -> int:
+        return len(_TOKEN_PATTERN.findall(text))
+
+    TOKENIZER = "approximation (words and symbols)"
+
+
+async def _aiter(rows: list[dict]):
+    for row in rows:
+        yield row
+
+
+def measure(func, repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def report(title: str, name: str, text: str, base: str, elapsed: float):
+    print(
+        f"{title:28} {name:6} {len(text.encode()) / 1024:10.1f} KiB "
+        f"({len(text.encode()) / len(base.encode()):5.1%}) "
+        f"{count_tokens(text):10} tokens ({count_tokens(text) / count_tokens(base):5.1%}) "
+        f"{elapsed * 1000:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"rows: {args.rows}, tokenizer: {TOKENIZER}")
+
+    item_rows = [
+        {"id": item["id"], "name": item["name"], "schema": item["schema"]["name"]}
+        for item in make_items(args.rows)
+    ]
+    columns = ["id", "name", "schema"]
+    outputs = {
+        "rows": lambda: asyncio.run(dump_json_array(_aiter(item_rows))),
+        "table": lambda: asyncio.run(dump_json_table(columns, _aiter(item_rows))),
+    }
+    base = outputs["rows"]()
+    for name, func in outputs.items():
+        report("get_item_list", name, func(), base, measure(func, args.repeat))
+
+    search_result = AdvancedSearchResult(**make_advanced_search_result(args.rows))
+    for title, flatten in [
+        ("advanced_search", False),
+        ("advanced_search flatten", True),
+    ]:
+        result = project_advanced_search_result(search_result, flatten=flatten)
+        base = dumps(result)
+        for name in ["rows", "table"]:
+            func = lambda: dump_advanced_search_result(result, name)  # noqa: E731
+            report(title, name, func(), base, measure(func, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark of building RackSpace layout in get_rack_list.
+
+This compares the former implementation, which rescanned all RackSpace
+entries for each unit, with build_rack_space() on a synthetic data hall.
+
+    $ uv run python benchmarks/bench_rack_layout.py --racks 5000 --units 48
+"""
+
+import argparse
+import random
+import timeit
+
+from mcp_server.tools.datacenter import build_rack_space
+
+
+def make_hall(racks: int, units: int) -> list[list[dict]]:
+    rng = random.Random(0)
+    hall = []
+    for rack in range(racks):
+        entries = []
+        unit = 1
+        while unit <= units:
+            # appliances occupy 1 to 4 units, and some units are empty
+            size = rng.randint(1, 4)
+            if rng.random() < 0.8:
+                name = f"appliance-{rack}-{unit}"
+                for occupied in range(unit, min(unit + size, units + 1)):
+                    entries.append(
+                        {"name": str(occupied), "object": {"id": unit, "name": name}}
+                    )
+            unit += size
+        hall.append(entries)
+    return hall
+
+
+def legacy_build_rack_space(units: list[dict], unit_count: int) -> dict:
+    # This is the former loop of get_rack_list
+    result = {}
+    for unit_number in range(1, unit_count + 1):
+        rack_space = []
+        for unit in units:
+            if unit["name"] == str(unit_number):
+                rack_space.append(unit["object"]["name"])
+        result[str(unit_number)] = rack_space
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--racks", type=int, default=5000)
+    parser.add_argument("--units", type=int, default=48)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    hall = make_hall(args.racks, args.units)
+    for entries in hall[:100]:
+        assert legacy_build_rack_space(entries, args.units) == build_rack_space(
+            entries, args.units
+        )
+
+    print(f"racks: {args.racks}, units: {args.units}")
+    for name, func in (
+        ("legacy", legacy_build_rack_space),
+        ("current", build_rack_space),
+    ):
+        elapsed = min(
+            timeit.repeat(
+                lambda: [func(entries, args.units) for entries in hall],
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        print(f"{name:8} {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Micro-benchmark of decoding Pagoda responses in the driver.
+
+This compares the former implementation, which decoded the response body
+for each use and formatted debug payloads even when DEBUG was disabled,
+with the current driver (mcp_server.drivers.pagoda_async) that decodes each
+body exactly once and formats debug payloads lazily. The current driver
+receives the response through a mocked transport of httpx.
+
+    $ uv run python benchmarks/bench_response_decode.py --rows 5000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import timeit
+from unittest import mock
+
+import httpx
+from fixtures import make_advanced_search_result
+
+from mcp_server.drivers import pagoda_async
+from mcp_server.drivers.pagoda import AdvancedSearchResult
+from mcp_server.lib.log import Logger
+
+
+class FormatOnlyHandler(logging.Handler):
+    """This formats records as the file handler does, but writes nothing"""
+
+    def emit(self, record):
+        self.format(record)
+
+
+def make_advanced_search_content(rows: int) -> bytes:
+    return json.dumps(make_advanced_search_result(rows)).encode()
+
+
+def legacy_advanced_search(content: bytes) -> AdvancedSearchResult:
+    # This is the body of advanced_search_api before decoding was unified
+    resp = httpx.Response(200, content=content)
+    log_prefix = ""
+    Logger.debug(log_prefix + f"advanced_search_api(Output) {resp.json()}")
+    return AdvancedSearchResult(**resp.json())
+
+
+def make_current_advanced_search(loop: asyncio.AbstractEventLoop):
+    def current_advanced_search(content: bytes) -> AdvancedSearchResult:
+        client = httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, content=content)
+            )
+        )
+        with mock.patch.object(pagoda_async, "get_async_client", return_value=client):
+            return loop.run_until_complete(
+                pagoda_async.advanced_search_api("http://pagoda", "token", [1], [])
+            )
+
+    return current_advanced_search
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    content = make_advanced_search_content(args.rows)
+    print(f"response size: {len(content) / 1024 / 1024:.1f} MiB")
+
+    # avoid writing megabytes of payloads to the log file while measuring
+    Logger.handlers = [FormatOnlyHandler()]
+
+    loop = asyncio.new_event_loop()
+    for level in (logging.WARNING, logging.DEBUG):
+        Logger.setLevel(level)
+        for name, func in (
+            ("legacy", legacy_advanced_search),
+            ("current", make_current_advanced_search(loop)),
+        ):
+            elapsed = min(
+                timeit.repeat(lambda: func(content), number=1, repeat=args.repeat)
+            )
+            print(f"{logging.getLevelName(level):8} {name:8} {elapsed * 1000:8.1f} ms")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark of JSON serializers that are selectable by --serializer option.
+
+This measures encoding of tool results (advanced_search and get_item_list)
+and decoding of Pagoda responses, comparing with the former implementation
+that encoded json.dumps(model.model_dump()) with the standard library.
+
+    $ uv run python benchmarks/bench_serializer.py --rows 20000
+"""
+
+import argparse
+import json
+import timeit
+
+from fixtures import make_advanced_search_result, make_items
+
+from mcp_server.drivers.pagoda import AdvancedSearchResult
+from mcp_server.lib.serializer import SERIALIZERS
+
+
+def measure(func, repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def report(title: str, name: str, elapsed: float, size: int):
+    print(
+        f"{title:22} {name:10} {elapsed * 1000:8.1f} ms "
+        f"{size / elapsed / 1024 / 1024:8.1f} MiB/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    raw_result = make_advanced_search_result(args.rows)
+    search_result = AdvancedSearchResult(**raw_result)
+    item_rows = [
+        {"id": item["id"], "name": item["name"], "schema": item["schema"]["name"]}
+        for item in make_items(args.rows)
+    ]
+    response_body = json.dumps(raw_result).encode()
+    print(
+        f"rows: {args.rows}, response size: {len(response_body) / 1024 / 1024:.1f} MiB"
+    )
+
+    elapsed = measure(lambda: json.dumps(search_result.model_dump()), args.repeat)
+    report("advanced_search encode", "legacy", elapsed, len(response_body))
+    for name, serializer in SERIALIZERS.items():
+        elapsed = measure(lambda: serializer.dumps(search_result), args.repeat)
+        report("advanced_search encode", name, elapsed, len(response_body))
+
+    size = len(json.dumps(item_rows))
+    for name, serializer in SERIALIZERS.items():
+        elapsed = measure(lambda: serializer.dumps(item_rows), args.repeat)
+        report("get_item_list encode", name, elapsed, size)
+
+    for name, serializer in SERIALIZERS.items():
+        elapsed = measure(lambda: serializer.loads(response_body), args.repeat)
+        report("response decode", name, elapsed, len(response_body))
+
+
+if __name__ == "__main__":
+    main()
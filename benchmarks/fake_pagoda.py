@@ -0,0 +1,253 @@
+"""
+Stand-in of Pagoda for benchmarks, which serves synthetic data of the
+configured size with injected latency.
+
+    $ uv run python benchmarks/fake_pagoda.py --port 18080 --items 20000 --latency 0.05
+
+Any token is accepted, and the endpoints that MCP Pagoda uses are implemented:
+
+    GET  /entity/api/v2/
+    GET  /entity/api/v2/{id}/
+    GET  /entity/api/v2/{id}/entries/
+    GET  /entry/api/v2/{id}/
+    POST /entry/api/v2/advanced_search/
+    GET  /user/api/v2/token/
+    GET  /user/api/v2/me
+    GET  /api/v2/custom/network/get_router_topology/
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+
+import uvicorn
+from fixtures import make_advanced_search_values, make_items
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+# Page size of item list of Pagoda
+ITEM_PAGE_SIZE = 30
+
+
+class FakePagodaConfig:
+    def __init__(
+        self,
+        models: int = 200,
+        items: int = 5000,
+        search_results: int = 2000,
+        routers: int = 200,
+        latency: float = 0.0,
+    ):
+        self.models = models
+        self.items = items
+        self.search_results = search_results
+        self.routers = routers
+        self.latency = latency
+
+
+def make_routers(routers: int) -> list[dict]:
+    """
+    Routers connected as a ring, and each of them also has a link to the one
+    on the opposite side of the ring.
+    """
+    return [
+        {
+            "id": i,
+            "name": f"router-{i:04d}",
+            "schema": {"id": 1, "name": "Router"},
+            "is_active": True,
+            "attrs": [
+                {
+                    "id": 1,
+                    "type": 3073,
+                    "schema": {"id": 1, "name": "ports"},
+                    "value": {
+                        "as_array_named_object": [
+                            {
+                                "name": f"ge-0/0/{port}",
+                                "object": {
+                                    "id": peer,
+                                    "name": f"router-{peer:04d}",
+                                },
+                            }
+                            for port, peer in enumerate(
+                                [(i + 1) % routers, (i + routers // 2) % routers]
+                            )
+                        ]
+                    },
+                }
+            ],
+        }
+        for i in range(routers)
+    ]
+
+
+def create_app(config: FakePagodaConfig) -> Starlette:
+    models = [
+        {
+            "id": i,
+            "name": f"model-{i}",
+            "note": "",
+            "item_name_pattern": "",
+            "status": 0,
+            "is_toplevel": False,
+        }
+        for i in range(1, config.models + 1)
+    ]
+    routers = json.dumps(make_routers(config.routers)).encode()
+
+    async def delay():
+        if config.latency > 0:
+            await asyncio.sleep(config.latency)
+
+    async def model_list(request: Request) -> Response:
+        await delay()
+        limit = int(request.query_params.get("limit", 100))
+        offset = int(request.query_params.get("offset", 0))
+        return JSONResponse(
+            {
+                "count": len(models),
+                "next": None if offset + limit >= len(models) else "next",
+                "previous": None,
+                "results": models[offset : offset + limit],
+            }
+        )
+
+    async def model_detail(request: Request) -> Response:
+        await delay()
+        model_id = request.path_params["id"]
+        return JSONResponse(
+            {
+                **models[(model_id - 1) % len(models)],
+                "id": model_id,
+                "attrs": [
+                    {"id": 1, "name": "IPアドレス"},
+                    {"id": 2, "name": "ユニット数"},
+                    {"id": 3, "name": "RackSpace"},
+                ],
+            }
+        )
+
+    async def item_list(request: Request) -> Response:
+        await delay()
+        page = int(request.query_params.get("page", 1))
+        offset = (page - 1) * ITEM_PAGE_SIZE
+        rows = max(0, min(ITEM_PAGE_SIZE, config.items - offset))
+        return JSONResponse(
+            {
+                "count": config.items,
+                "next": "next" if offset + rows < config.items else None,
+                "previous": None,
+                "results": make_items(rows, request.path_params["id"], offset),
+            }
+        )
+
+    async def item_detail(request: Request) -> Response:
+        await delay()
+        item_id = request.path_params["id"]
+        value = make_advanced_search_values(1, item_id)[0]
+        return JSONResponse(
+            {
+                "id": item_id,
+                "name": value["entry"]["name"],
+                "schema": value["entity"],
+                "is_active": True,
+                "attrs": [
+                    {"id": i, "schema": {"id": i, "name": name}, **attr}
+                    for i, (name, attr) in enumerate(value["attrs"].items())
+                ],
+            }
+        )
+
+    async def advanced_search(request: Request) -> Response:
+        await delay()
+        body = await request.json()
+        offset = body["entry_offset"]
+        rows = max(0, min(body["entry_limit"], config.search_results - offset))
+        return JSONResponse(
+            {
+                "total_count": config.search_results,
+                "values": make_advanced_search_values(rows, offset),
+            }
+        )
+
+    async def token(request: Request) -> Response:
+        await delay()
+        return JSONResponse({"key": request.headers["Authorization"].split()[-1]})
+
+    async def me(request: Request) -> Response:
+        await delay()
+        return JSONResponse(
+            {"user_id": 1, "username": "bench", "email": "", "co_users": None}
+        )
+
+    async def router_topology(request: Request) -> Response:
+        await delay()
+        return Response(routers, media_type="application/json")
+
+    return Starlette(
+        routes=[
+            Route("/entity/api/v2/", model_list),
+            Route("/entity/api/v2/{id:int}/", model_detail),
+            Route("/entity/api/v2/{id:int}/entries/", item_list),
+            Route("/entry/api/v2/advanced_search/", advanced_search, methods=["POST"]),
+            Route("/entry/api/v2/{id:int}/", item_detail),
+            Route("/user/api/v2/token/", token),
+            Route("/user/api/v2/me", me),
+            Route("/api/v2/custom/network/get_router_topology/", router_topology),
+        ]
+    )
+
+
+def start_in_thread(config: FakePagodaConfig, port: int) -> str:
+    """
+    This runs the fake Pagoda in a background thread and returns its URL.
+    """
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_app(config), host="127.0.0.1", port=port, log_level="warning"
+        )
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--models", type=int, default=200)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--search-results", type=int, default=2000)
+    parser.add_argument("--routers", type=int, default=200)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added to each response"
+    )
+
+
+def config_from_arguments(args: argparse.Namespace) -> FakePagodaConfig:
+    return FakePagodaConfig(
+        models=args.models,
+        items=args.items,
+        search_results=args.search_results,
+        routers=args.routers,
+        latency=args.latency,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=18080)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(config_from_arguments(args)), host="127.0.0.1", port=args.port
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Generators of synthetic Pagoda responses that are shared by benchmarks.
+"""
+
+
+def make_advanced_search_values(rows: int, offset: int = 0) -> list[dict]:
+    return [
+        {
+            "entry": {"id": i, "name": f"server-{i:06d}"},
+            "entity": {"id": 1, "name": "Server"},
+            "attrs": {
+                "IPアドレス": {
+                    "type": 1,
+                    "value": {
+                        "as_object": {"id": i, "name": f"10.0.{i // 256}.{i % 256}"}
+                    },
+                    "is_readable": True,
+                },
+                "ユニット数": {
+                    "type": 2,
+                    "value": {"as_string": "2"},
+                    "is_readable": True,
+                },
+                "RackSpace": {
+                    "type": 1025,
+                    "value": {
+                        "as_array_named_object": [
+                            {
+                                "name": str(unit),
+                                "object": {"id": unit, "name": f"rack-{unit}"},
+                            }
+                            for unit in range(4)
+                        ]
+                    },
+                    "is_readable": True,
+                },
+            },
+            "referrals": None,
+        }
+        for i in range(offset, offset + rows)
+    ]
+
+
+def make_advanced_search_result(rows: int) -> dict:
+    return {"total_count": rows, "values": make_advanced_search_values(rows)}
+
+
+def make_items(rows: int, model_id: int = 1, offset: int = 0) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "name": f"item-{i:06d}",
+            "schema": {"id": model_id, "name": f"model-{model_id}"},
+        }
+        for i in range(offset, offset + rows)
+    ]
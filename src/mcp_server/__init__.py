@@ -1,11 +1,10 @@
-import asyncio
-import logging
 from typing import Literal
 
 import click
 from dotenv import load_dotenv
 
-from mcp_server.lib.log import Logger
+from mcp_server.lib.serializer import SerializerName
+from mcp_server.settings import PagodaServerSettings, configure
 
 from .server_sse import serve as serve_sse
 from .server_stdio import serve as serve_stdio
@@ -30,8 +29,11 @@ load_dotenv()
 @click.option(
     "--transport",
     default="sse",
-    type=click.Choice(["sse", "stdio"]),
-    help="Transport protocol to use ('sse' or 'stdio')",
+    type=click.Choice(["sse", "stdio", "streamable-http"]),
+    help=(
+        "Transport protocol to use ('sse', 'stdio' or 'streamable-http', which "
+        "is stateless HTTP)"
+    ),
 )
 @click.option(
     "--auth",
@@ -39,23 +41,110 @@ load_dotenv()
     type=click.Choice(["bearer", "azure"]),
     help="Authentication method to use ('bearer' or 'azure')",
 )
+@click.option(
+    "--pool-size",
+    type=int,
+    help="Number of keep-alive connections to Pagoda kept per endpoint",
+)
+@click.option(
+    "--http-timeout",
+    type=float,
+    help="Timeout (seconds) of each request to Pagoda",
+)
+@click.option(
+    "--model-cache-ttl",
+    type=float,
+    help="Seconds to cache model metadata of Pagoda (0 disables the cache)",
+)
+@click.option(
+    "--token-cache-ttl",
+    type=float,
+    help="Seconds to cache results of token verification (0 disables the cache)",
+)
+@click.option(
+    "--topology-refresh-interval",
+    type=float,
+    help="Seconds between refreshes of cached router topology (0 disables them)",
+)
+@click.option(
+    "--topology-idle-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Seconds to keep router topology of a token after it's used last",
+)
+@click.option(
+    "--serializer",
+    default="auto",
+    type=click.Choice(["auto", "json", "pydantic", "orjson"]),
+    help="JSON serializer to use ('auto' selects orjson when it's installed)",
+)
+@click.option(
+    "--store",
+    default="memory",
+    help=(
+        "Store of state shared by worker processes and nodes ('memory' or "
+        "'sqlite:///{path}'), e.g. OAuth state, token and model caches"
+    ),
+)
+@click.option(
+    "--workers",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Number of worker processes of the server",
+)
 def main(
     host: str,
     port: int,
     endpoint: str,
     token: str,
     loglevel: str,
-    transport: Literal["sse", "stdio"],
+    transport: Literal["sse", "stdio", "streamable-http"],
     auth: Literal["bearer", "azure"],
+    pool_size: int | None,
+    http_timeout: float | None,
+    model_cache_ttl: float | None,
+    token_cache_ttl: float | None,
+    topology_refresh_interval: float | None,
+    topology_idle_timeout: float | None,
+    serializer: SerializerName,
+    store: str,
+    workers: int,
 ) -> None:
-    Logger.setLevel(logging.getLevelName(loglevel))
+    settings = PagodaServerSettings(
+        endpoint=endpoint,
+        token=token,
+        host=host,
+        port=port,
+        transport=transport,
+        auth=auth,
+        loglevel=loglevel,
+        pool_size=pool_size,
+        http_timeout=http_timeout,
+        model_cache_ttl=model_cache_ttl,
+        token_cache_ttl=token_cache_ttl,
+        topology_refresh_interval=topology_refresh_interval,
+        topology_idle_timeout=topology_idle_timeout,
+        serializer=serializer,
+        store=store,
+    )
+    try:
+        configure(settings)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--store")
+
+    if workers > 1 and transport == "stdio":
+        raise click.UsageError("--workers can't be used with stdio transport")
+    # caches, cursors, OAuth state and SSE sessions have to be shared by workers
+    if workers > 1 and store == "memory":
+        raise click.UsageError(
+            "--workers requires --store that is shared by them (e.g. sqlite:///...)"
+        )
 
     match transport:
         case "stdio":
-            asyncio.run(serve_stdio(endpoint, token))
+            serve_stdio(endpoint, token)
 
-        case "sse":
-            asyncio.run(serve_sse(host, port, auth, endpoint, token))
+        case "sse" | "streamable-http":
+            serve_sse(settings, workers)
 
 
 if __name__ == "__main__":
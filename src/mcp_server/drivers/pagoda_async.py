@@ -0,0 +1,974 @@
+"""
+This is the driver of Pagoda API, which doesn't block the event loop of the
+server while waiting for the response from Pagoda. Models of the responses
+are defined in mcp_server.drivers.pagoda.
+"""
+
+import asyncio
+import math
+import re
+import time
+from collections import deque
+from itertools import count, product
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    TypeVar,
+)
+
+import httpx
+from mcp_server.drivers.pagoda import (
+    AdvancedSearchResult,
+    Item,
+    ItemDetail,
+    Model,
+    ModelDetail,
+    User,
+)
+from mcp_server.lib.attribute import project
+from mcp_server.lib.cache import TTLCache, token_scope
+from mcp_server.lib.http import get_async_client
+from mcp_server.lib.log import Logger
+from mcp_server.lib.metrics import record_coalesced_request, record_request, timed
+from mcp_server.lib.ratelimit import RateLimiter
+from mcp_server.lib.serializer import dumps, loads
+from mcp_server.lib.singleflight import SingleFlight
+from mcp_server.model import AdvancedSearchAttrInfo
+
+T = TypeVar("T")
+
+# Pagoda accepts keywords of advanced search up to this length
+KEYWORD_MAX_LENGTH = 249
+# Number of results requested per page when all of them are fetched
+PAGE_SIZE = 100
+# When more than one keyword is split, they're searched by each combination of
+# their chunks, which are limited to this number (chunks of a single keyword
+# aren't limited since they increase searches only linearly)
+MAX_SPLIT_CONDITIONS = 64
+ITEM_FILTER_TEXT_NOT_CONTAINED = 2
+ATTR_FILTER_TEXT_NOT_CONTAINED = 4
+
+# Model definitions are rarely changed, so that model list, model detail and
+# model name to id resolution are cached per endpoint and per token (user).
+MODEL_CACHE = TTLCache(maxsize=1024, ttl=300, namespace="model")
+
+# Identical read requests that are in flight at the same time (e.g. the same
+# tool called by many clients at once) share one request to Pagoda.
+REQUESTS_IN_FLIGHT = SingleFlight()
+
+# ids in URL paths are replaced in metrics of requests
+_ID_PATTERN = re.compile(r"/\d+/")
+
+
+async def invalidate_model_cache(endpoint: str | None = None) -> int:
+    """
+    This drops cached model metadata of the endpoint (or all endpoints when
+    it's not specified) and returns the number of dropped entries.
+    This is called when Pagoda doesn't find a model, whose id may have been
+    resolved from a stale cache (e.g. the model was deleted and re-created).
+    """
+
+    def matches(key: Hashable) -> bool:
+        # keys are tuples of (kind, endpoint, token scope, ...)
+        return endpoint is None or (isinstance(key, tuple) and key[1] == endpoint)
+
+    return await MODEL_CACHE.ainvalidate(matches)
+
+
+async def request_to_airone(
+    method: str,
+    url: str,
+    token: str,
+    params: dict | None,
+    data: dict | None,
+    coalesce: bool = False,
+) -> httpx.Response:
+    """
+    This sends request to the Pagoda.
+    Connections are kept alive and reused through the client pooled per endpoint.
+    When coalesce is true, the response is shared with identical requests
+    (same method, URL, token, params and data) in flight.
+    """
+    if coalesce:
+        coalesced = True
+
+        def send() -> Awaitable[httpx.Response]:
+            # this is called only when no identical request is in flight
+            nonlocal coalesced
+            coalesced = False
+            return request_to_airone(method, url, token, params, data)
+
+        try:
+            return await REQUESTS_IN_FLIGHT.do(
+                (method, url, token_scope(token), dumps(params), dumps(data)), send
+            )
+        finally:
+            if coalesced:
+                record_coalesced_request()
+
+    start = time.perf_counter()
+    resp = await get_async_client(url).request(
+        method=method,
+        url=url,
+        params=params,
+        content=dumps(data).encode(),
+        headers={
+            "Content-Type": "application/json;charset=utf-8",
+            "Authorization": "Token " + token,
+        },
+    )
+    record_request(
+        method,
+        _ID_PATTERN.sub("/{id}/", resp.request.url.path),
+        time.perf_counter() - start,
+        len(resp.content),
+    )
+    return resp
+
+
+async def request_get(
+    url: str, token: str, params: dict | None = None, data: dict | None = None
+) -> httpx.Response:
+    return await request_to_airone("GET", url, token, params, data, coalesce=True)
+
+
+async def request_post(
+    url: str,
+    token: str,
+    params: dict | None = None,
+    data: dict | None = None,
+    coalesce: bool = False,
+) -> httpx.Response:
+    return await request_to_airone("POST", url, token, params, data, coalesce)
+
+
+async def request_patch(
+    url: str, token: str, params: dict | None = None, data: dict | None = None
+) -> httpx.Response:
+    return await request_to_airone("PATCH", url, token, params, data)
+
+
+@timed
+async def get_user_activity_api(
+    endpoint: str,
+    token: str,
+    user_id: int,
+    since: str | None = None,
+    to: str | None = None,
+    within_minutes: int | None = None,
+    log_prefix: str = "",
+) -> list:
+    Logger.debug(
+        "%sget_user_activity_api(Input) user_id=%s, since=%s, to=%s, within_minutes=%s",
+        log_prefix,
+        user_id,
+        since,
+        to,
+        within_minutes,
+    )
+    params = {}
+    if since is not None:
+        params["since"] = since
+    if to is not None:
+        params["to"] = to
+    if within_minutes is not None:
+        params["within_minutes"] = within_minutes
+
+    resp = await request_get(
+        url=endpoint + f"/user/api/v2/{user_id}/activity",
+        params=params,
+        token=token,
+    )
+    if resp.status_code != 200:
+        raise RuntimeError(f"Request failed /user/api/v2/{user_id}/activity")
+
+    result = loads(resp.content)
+    Logger.debug("%sget_user_activity_api(Output) %s", log_prefix, result)
+    return result
+
+
+async def _follow_next_pages(
+    fetch_page: Callable[[int], Awaitable[dict]],
+    first_page: dict,
+    page_keys: Iterator[int],
+) -> AsyncIterator[dict]:
+    """
+    This fetches pages one by one while the previous page has the next one.
+    """
+    page = first_page
+    while page["next"] is not None:
+        page = await fetch_page(next(page_keys))
+        yield page
+
+
+async def iter_pages(
+    fetch_page: Callable[[int], Awaitable[T]],
+    page_keys: Iterable[int],
+    concurrency: int,
+) -> AsyncIterator[T]:
+    """
+    This fetches pages concurrently, at most the number of concurrency ahead
+    of the consumer, and yields them in the order of page_keys.
+    """
+    pending: deque[asyncio.Future] = deque()
+    try:
+        for page_key in page_keys:
+            pending.append(asyncio.ensure_future(fetch_page(page_key)))
+            if len(pending) >= concurrency:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def _get_model_list_page(
+    endpoint: str, token: str, search: str, limit: int, offset: int
+) -> dict:
+    resp = await request_get(
+        url=endpoint + "/entity/api/v2/",
+        params={
+            "search": search,
+            "limit": str(limit),
+            "offset": str(offset),
+        },
+        token=token,
+    )
+    if resp.status_code != 200:
+        raise RuntimeError("Request failed /entity/api/v2/")
+    return loads(resp.content)
+
+
+async def _iter_model_list_pages(
+    endpoint: str, token: str, search: str, concurrency: int
+) -> AsyncIterator[dict]:
+    limit = PAGE_SIZE
+
+    page = await _get_model_list_page(endpoint, token, search, limit, 0)
+    yield page
+
+    if concurrency > 1 and page.get("count") is not None:
+        pages = iter_pages(
+            lambda offset: _get_model_list_page(endpoint, token, search, limit, offset),
+            range(limit, page["count"], limit),
+            concurrency,
+        )
+    else:
+        pages = _follow_next_pages(
+            lambda offset: _get_model_list_page(endpoint, token, search, limit, offset),
+            page,
+            count(limit, limit),
+        )
+    async for page in pages:
+        yield page
+
+
+async def iter_model_list_api(
+    endpoint: str,
+    token: str,
+    search: str = "",
+    log_prefix: str = "",
+    concurrency: int = 1,
+) -> AsyncIterator[Model]:
+    """
+    This yields models page by page, so that only the pages being fetched
+    are kept in memory.
+    When concurrency is more than 1, the remaining pages after the first one
+    are fetched in parallel according to the total count of the first page.
+    Whole result is kept in MODEL_CACHE when all pages are consumed.
+    """
+    Logger.debug("%siter_model_list_api(Input) search=%s", log_prefix, search)
+    cache_key = ("model_list", endpoint, token_scope(token), search)
+    # results are cached as they're returned from Pagoda (JSON), so that they
+    # can be kept in the shared store
+    results = await MODEL_CACHE.aget(cache_key)
+    if results is not None:
+        for result in results:
+            yield Model(**result)
+        return
+
+    results = []
+    async for page in _iter_model_list_pages(endpoint, token, search, concurrency):
+        Logger.debug("%siter_model_list_api(Output) %s", log_prefix, page["results"])
+        for result in page["results"]:
+            results.append(result)
+            yield Model(**result)
+
+    await MODEL_CACHE.aset(cache_key, results)
+
+
+@timed
+async def get_model_list_api(
+    endpoint: str,
+    token: str,
+    search: str = "",
+    log_prefix: str = "",
+    concurrency: int = 1,
+) -> list[Model]:
+    return [
+        model
+        async for model in iter_model_list_api(
+            endpoint, token, search, log_prefix, concurrency
+        )
+    ]
+
+
+async def _get_item_list_page(
+    endpoint: str, token: str, model_id: int, search: str, page: int
+) -> dict:
+    resp = await request_get(
+        url=endpoint + f"/entity/api/v2/{model_id}/entries/",
+        params={
+            "search": search,
+            "is_active": "true",
+            "page": str(page),
+        },
+        token=token,
+    )
+    if resp.status_code == 404:
+        await invalidate_model_cache(endpoint)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Request failed /entity/api/v2/{model_id}/entries/")
+    return loads(resp.content)
+
+
+async def iter_item_list_api(
+    endpoint: str,
+    token: str,
+    model_id: int,
+    search: str = "",
+    log_prefix: str = "",
+    concurrency: int = 1,
+) -> AsyncIterator[Item]:
+    """
+    This yields items page by page, so that only the pages being fetched
+    are kept in memory.
+    When concurrency is more than 1, the remaining pages after the first one
+    are fetched in parallel according to the total count and the page size
+    of the first page.
+    """
+    Logger.debug(
+        "%siter_item_list_api(Input) model_id=%s, search=%s",
+        log_prefix,
+        model_id,
+        search,
+    )
+    page = await _get_item_list_page(endpoint, token, model_id, search, 1)
+    Logger.debug("%siter_item_list_api(Output) %s", log_prefix, page["results"])
+    for result in page["results"]:
+        yield Item(**result)
+
+    if concurrency > 1 and page.get("count") and page["results"] and page["next"]:
+        pages = iter_pages(
+            lambda number: _get_item_list_page(
+                endpoint, token, model_id, search, number
+            ),
+            range(2, math.ceil(page["count"] / len(page["results"])) + 1),
+            concurrency,
+        )
+    else:
+        pages = _follow_next_pages(
+            lambda number: _get_item_list_page(
+                endpoint, token, model_id, search, number
+            ),
+            page,
+            count(2),
+        )
+    async for page in pages:
+        Logger.debug("%siter_item_list_api(Output) %s", log_prefix, page["results"])
+        for result in page["results"]:
+            yield Item(**result)
+
+
+@timed
+async def get_item_list_api(
+    endpoint: str,
+    token: str,
+    model_id: int,
+    search: str = "",
+    log_prefix: str = "",
+    concurrency: int = 1,
+) -> list[Item]:
+    return [
+        item
+        async for item in iter_item_list_api(
+            endpoint, token, model_id, search, log_prefix, concurrency
+        )
+    ]
+
+
+@timed
+async def advanced_search_api(
+    endpoint: str,
+    token: str,
+    entities: list[int],
+    attrinfos: list[AdvancedSearchAttrInfo],
+    item_filter_key: int = 0,
+    item_keyword: str = "",
+    has_referral: bool = False,
+    referral_name: str = "",
+    limit: int = 100,
+    offset: int = 0,
+    log_prefix: str = "",
+) -> AdvancedSearchResult:
+    Logger.debug(
+        "%sadvanced_search_api(Input) entities=%s, attrinfos=%s, "
+        "item_filter_key=%s, item_keyword=%s,has_referral=%s, referral_name=%s",
+        log_prefix,
+        entities,
+        attrinfos,
+        item_filter_key,
+        item_keyword,
+        has_referral,
+        referral_name,
+    )
+    data = {
+        "entities": entities,
+        "attrinfo": [attrinfo.model_dump() for attrinfo in attrinfos],
+        "hint_entry": {
+            "filter_key": item_filter_key,
+            "keyword": item_keyword,
+        },
+        "has_referral": has_referral,
+        "referral_name": referral_name,
+        "is_output_all": False,
+        "entry_limit": limit,
+        "entry_offset": offset,
+    }
+    # advanced search only reads items even though it's a POST request
+    resp = await request_post(
+        url=endpoint + "/entry/api/v2/advanced_search/",
+        data=data,
+        token=token,
+        coalesce=True,
+    )
+    if resp.status_code != 200:
+        raise RuntimeError("Request failed /entry/api/v2/advanced_search/")
+
+    result = loads(resp.content)
+    Logger.debug("%sadvanced_search_api(Output) %s", log_prefix, result)
+    return AdvancedSearchResult(**result)
+
+
+@timed
+async def advanced_search_all_api(
+    endpoint: str,
+    token: str,
+    entities: list[int],
+    attrinfos: list[AdvancedSearchAttrInfo],
+    item_filter_key: int = 0,
+    item_keyword: str = "",
+    has_referral: bool = False,
+    referral_name: str = "",
+    log_prefix: str = "",
+    concurrency: int = 1,
+) -> AdvancedSearchResult:
+    """
+    This retrieves all results of advanced search page by page (PAGE_SIZE).
+    The remaining pages after the first one are decided by total_count of
+    the first result and fetched in parallel at most the number of concurrency.
+    """
+
+    async def _search(offset: int) -> AdvancedSearchResult:
+        return await advanced_search_api(
+            endpoint=endpoint,
+            token=token,
+            entities=entities,
+            attrinfos=attrinfos,
+            item_filter_key=item_filter_key,
+            item_keyword=item_keyword,
+            has_referral=has_referral,
+            referral_name=referral_name,
+            limit=PAGE_SIZE,
+            offset=offset,
+            log_prefix=log_prefix,
+        )
+
+    result = await _search(0)
+    async for page in iter_pages(
+        _search, range(PAGE_SIZE, result.total_count, PAGE_SIZE), concurrency
+    ):
+        result.values.extend(page.values)
+
+    return result
+
+
+def split_keyword(keyword: str, max_length: int = KEYWORD_MAX_LENGTH) -> list[str]:
+    """
+    This splits pipe separated OR keywords into chunks whose length are less
+    than or equal to max_length. A term longer than max_length is left as it is.
+    """
+    if len(keyword) <= max_length:
+        return [keyword]
+
+    chunks = []
+    chunk = ""
+    for term in dict.fromkeys(keyword.split("|")):
+        if not term:
+            continue
+        if chunk and len(chunk) + len(term) + 1 <= max_length:
+            chunk += "|" + term
+        else:
+            if chunk:
+                chunks.append(chunk)
+            chunk = term
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+
+def _split_negative_keyword(keyword: str, is_negative: bool) -> list[str]:
+    if is_negative and len(keyword) > KEYWORD_MAX_LENGTH:
+        # Results of "not contained" conditions can't be merged by union
+        raise ValueError(
+            f"Keyword of not contained condition must be less than "
+            f"{KEYWORD_MAX_LENGTH + 1} characters"
+        )
+    return split_keyword(keyword)
+
+
+@timed
+async def advanced_search_split_api(
+    endpoint: str,
+    token: str,
+    entities: list[int],
+    attrinfos: list[AdvancedSearchAttrInfo],
+    item_filter_key: int = 0,
+    item_keyword: str = "",
+    has_referral: bool = False,
+    referral_name: str = "",
+    log_prefix: str = "",
+    concurrency: int = 1,
+) -> AdvancedSearchResult:
+    """
+    This retrieves all results of advanced search whose OR keywords of item
+    name and attributes might be longer than Pagoda accepts.
+    Such keywords are split into chunks, and searches of each combination of
+    the chunks are executed in parallel, then their results are merged in
+    order with removing duplicated items. ValueError is raised when more than
+    one keyword is split and there are more than MAX_SPLIT_CONDITIONS
+    combinations of their chunks.
+    """
+    item_keywords = _split_negative_keyword(
+        item_keyword, item_filter_key == ITEM_FILTER_TEXT_NOT_CONTAINED
+    )
+    attr_keywords = [
+        _split_negative_keyword(
+            attrinfo.keyword, attrinfo.filter_key == ATTR_FILTER_TEXT_NOT_CONTAINED
+        )
+        for attrinfo in attrinfos
+    ]
+    split_keywords = [x for x in [item_keywords, *attr_keywords] if len(x) > 1]
+    num_conditions = math.prod(len(x) for x in split_keywords)
+    if len(split_keywords) > 1 and num_conditions > MAX_SPLIT_CONDITIONS:
+        raise ValueError(
+            f"Keywords are split into {num_conditions} combinations of searches, "
+            f"which must be {MAX_SPLIT_CONDITIONS} or less. Shorten the keywords "
+            f"or search them separately"
+        )
+    conditions = list(product(item_keywords, *attr_keywords))
+    # Share concurrency between searches of each condition and their pages
+    page_concurrency = max(1, concurrency // min(len(conditions), concurrency))
+
+    async def _search(index: int) -> AdvancedSearchResult:
+        keyword, *keywords = conditions[index]
+        return await advanced_search_all_api(
+            endpoint=endpoint,
+            token=token,
+            entities=entities,
+            attrinfos=[
+                attrinfo.model_copy(update={"keyword": keyword})
+                for attrinfo, keyword in zip(attrinfos, keywords)
+            ],
+            item_filter_key=item_filter_key,
+            item_keyword=keyword,
+            has_referral=has_referral,
+            referral_name=referral_name,
+            log_prefix=log_prefix,
+            concurrency=page_concurrency,
+        )
+
+    values = {}
+    async for result in iter_pages(_search, range(len(conditions)), concurrency):
+        for value in result.values:
+            values.setdefault(value.entry.id, value)
+
+    return AdvancedSearchResult(total_count=len(values), values=list(values.values()))
+
+
+@timed
+async def get_model_id(
+    endpoint: str,
+    token: str,
+    search: str = "",
+) -> int:
+    cache_key = ("model_id", endpoint, token_scope(token), search)
+    model_id = await MODEL_CACHE.aget(cache_key)
+    if model_id is not None:
+        return model_id
+
+    results = await get_model_list_api(
+        endpoint=endpoint,
+        token=token,
+        search=search,
+    )
+    for result in results:
+        if result.name == search:
+            await MODEL_CACHE.aset(cache_key, result.id)
+            return result.id
+    raise RuntimeError(f"Model {search} not found")
+
+
+@timed
+async def get_model_detail_api(
+    endpoint: str,
+    token: str,
+    model_id: int,
+    log_prefix: str = "",
+) -> ModelDetail:
+    """
+    This retrieves model details from the Pagoda API.
+    e.g. https://airone.dmmlabs.jp/entity/api/v2/533972/
+    """
+    Logger.debug("%sget_model_detail_api(Input) model_id=%s", log_prefix, model_id)
+    cache_key = ("model_detail", endpoint, token_scope(token), model_id)
+    result = await MODEL_CACHE.aget(cache_key)
+    if result is not None:
+        return ModelDetail(**result)
+
+    resp = await request_get(
+        url=endpoint + f"/entity/api/v2/{model_id}/",
+        token=token,
+    )
+    if resp.status_code == 404:
+        await invalidate_model_cache(endpoint)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Request failed /entity/api/v2/{model_id}/")
+
+    result = loads(resp.content)
+    Logger.debug("%sget_model_detail_api(Output) %s", log_prefix, result)
+    model_detail = ModelDetail(**result)
+    await MODEL_CACHE.aset(cache_key, result)
+    return model_detail
+
+
+@timed
+async def get_item_detail_api(
+    endpoint: str,
+    token: str,
+    item_id: int,
+    log_prefix: str = "",
+) -> ItemDetail:
+    """
+    This retrieves item details from the Pagoda API.
+    e.g. https://airone.dmmlabs.jp/entry/api/v2/533972/
+    """
+    Logger.debug("%sget_item_detail_api(Input) item_id=%s", log_prefix, item_id)
+    resp = await request_get(
+        url=endpoint + f"/entry/api/v2/{item_id}/",
+        token=token,
+    )
+    if resp.status_code != 200:
+        raise RuntimeError(f"Request failed /entry/api/v2/{item_id}/")
+
+    result = loads(resp.content)
+    Logger.debug("%sget_item_detail_api(Output) %s", log_prefix, result)
+    return ItemDetail(**result)
+
+
+def project_item_detail(
+    item: ItemDetail, fields: list[str] | None = None, flatten: bool = False
+) -> ItemDetail | dict:
+    """
+    This leaves only the selected fields (attribute names or dotted paths) of
+    the item to be serialized, see mcp_server.lib.attribute.project.
+    """
+    if fields is None and not flatten:
+        return item
+
+    attrs = {attr["schema"]["name"]: attr for attr in item.attrs if attr.get("schema")}
+    return project(item.model_dump(exclude={"attrs"}), attrs, fields, flatten)
+
+
+def project_advanced_search_result(
+    result: AdvancedSearchResult, fields: list[str] | None = None, flatten: bool = False
+) -> AdvancedSearchResult | dict:
+    """
+    This leaves only the selected fields (attribute names or dotted paths) of
+    each found item to be serialized, see mcp_server.lib.attribute.project.
+    """
+    if fields is None and not flatten:
+        return result
+
+    return {
+        "total_count": result.total_count,
+        "values": [
+            project(
+                {
+                    "id": value.entry.id,
+                    "name": value.entry.name,
+                    "model": value.entity.model_dump(),
+                    "referrals": value.model_dump(include={"referrals"})["referrals"],
+                },
+                value.attrs,
+                fields,
+                flatten,
+            )
+            for value in result.values
+        ],
+    }
+
+
+@timed
+async def get_me_api(
+    endpoint: str,
+    token: str,
+    log_prefix: str = "",
+) -> User:
+    Logger.debug("%sget_me_api(Input)", log_prefix)
+    resp = await request_get(
+        url=endpoint + "/user/api/v2/me",
+        token=token,
+    )
+    if resp.status_code != 200:
+        raise RuntimeError("Request failed /user/api/v2/me")
+
+    result = loads(resp.content)
+    Logger.debug("%sget_me_api(Output) %s", log_prefix, result)
+    return User(**result)
+
+
+@timed
+async def restore_item_attribute_value_api(
+    endpoint: str,
+    token: str,
+    attribute_value_id: int,
+    log_prefix: str = "",
+) -> dict:
+    """
+    This restores an attribute value via the Pagoda API.
+    """
+    Logger.debug(
+        "%srestore_item_attribute_value_api(Input) attribute_value_id=%s",
+        log_prefix,
+        attribute_value_id,
+    )
+    resp = await request_patch(
+        url=endpoint + f"/entry/api/v2/{attribute_value_id}/attrv_restore/",
+        token=token,
+        data={},
+    )
+    if not (200 <= resp.status_code < 300):
+        raise RuntimeError(
+            f"Request failed /entry/api/v2/{attribute_value_id}/attrv_restore/ "
+            f"status={resp.status_code}"
+        )
+
+    result = loads(resp.content) if resp.content else {}
+    Logger.debug("%srestore_item_attribute_value_api(Output) %s", log_prefix, result)
+    return result
+
+
+# Error of ids that were not processed by run_in_batches
+NOT_PROCESSED = "Not processed"
+
+
+async def run_in_batches(
+    ids: list[int],
+    run_batch: Callable[[list[int]], Awaitable[dict[int, str | None]]],
+    batch_size: int,
+    concurrency: int,
+    min_interval: float = 0.0,
+    on_progress: Callable[[int, int], Awaitable[None]] | None = None,
+) -> dict[int, str | None]:
+    """
+    This splits ids into batches and runs them concurrently under the rate
+    limit. run_batch returns an error message (or None on success) per id, and
+    the whole batch is regarded as failed when it raises an exception.
+    Ids that are not reported by run_batch are regarded as failed, so that
+    nothing is reported as succeeded without being processed.
+    on_progress is called with the numbers of processed and total ids.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be 1 or more")
+
+    limiter = RateLimiter(concurrency, min_interval)
+    batches = [ids[i : i + batch_size] for i in range(0, len(ids), batch_size)]
+    results: dict[int, str | None] = {}
+
+    async def _run(batch: list[int]) -> None:
+        async with limiter:
+            try:
+                outcome = await run_batch(batch)
+                results.update(
+                    (x, outcome[x] if x in outcome else NOT_PROCESSED) for x in batch
+                )
+            except Exception as e:
+                results.update((x, str(e) or type(e).__name__) for x in batch)
+        if on_progress is not None:
+            await on_progress(len(results), len(ids))
+
+    await asyncio.gather(*[_run(batch) for batch in batches])
+    return {x: results.get(x, NOT_PROCESSED) for x in ids}
+
+
+@timed
+async def restore_item_attribute_values_api(
+    endpoint: str,
+    token: str,
+    attribute_value_ids: list[int],
+    batch_size: int = 10,
+    concurrency: int = 4,
+    min_interval: float = 0.0,
+    on_progress: Callable[[int, int], Awaitable[None]] | None = None,
+    log_prefix: str = "",
+) -> dict[int, str | None]:
+    """
+    This restores many attribute values in batches, whose values are restored
+    in parallel, and returns an error message (or None) per attribute value id.
+    """
+
+    async def _restore_batch(batch: list[int]) -> dict[int, str | None]:
+        results = await asyncio.gather(
+            *[
+                restore_item_attribute_value_api(
+                    endpoint=endpoint,
+                    token=token,
+                    attribute_value_id=x,
+                    log_prefix=log_prefix,
+                )
+                for x in batch
+            ],
+            return_exceptions=True,
+        )
+        return {
+            x: str(result) if isinstance(result, Exception) else None
+            for x, result in zip(batch, results)
+        }
+
+    return await run_in_batches(
+        list(dict.fromkeys(attribute_value_ids)),
+        _restore_batch,
+        batch_size=batch_size,
+        concurrency=concurrency,
+        min_interval=min_interval,
+        on_progress=on_progress,
+    )
+
+
+@timed
+async def search_item_api(
+    endpoint: str,
+    token: str,
+    query: str = "",
+    log_prefix: str = "",
+) -> list[Item]:
+    Logger.debug("%ssearch_item_api(Input) query=%s", log_prefix, query)
+    resp = await request_get(
+        url=endpoint + "/entry/api/v2/search/",
+        params={
+            "query": query,
+        },
+        token=token,
+    )
+    if resp.status_code != 200:
+        raise RuntimeError("Request failed /api/v2/search/")
+    results = loads(resp.content)
+
+    Logger.debug("%ssearch_item_api(Output) %s", log_prefix, results)
+    return [Item(**result) for result in results]
+
+
+@timed
+async def rollback_items_api(
+    endpoint: str,
+    token: str,
+    targets: list[int],
+    at: str,
+    log_prefix: str = "",
+) -> dict:
+    """
+    This rolls back items to their state at the specified datetime via the Pagoda API.
+    """
+    Logger.debug(
+        "%srollback_items_api(Input) targets=%s, at=%s", log_prefix, targets, at
+    )
+    resp = await request_post(
+        url=endpoint + "/entry/api/v2/rollback/",
+        token=token,
+        data={"targets": targets, "at": at},
+    )
+    if not (200 <= resp.status_code < 300):
+        raise RuntimeError(
+            f"Request failed /entry/api/v2/rollback status={resp.status_code}"
+        )
+
+    result = loads(resp.content) if resp.content else {}
+    Logger.debug("%srollback_items_api(Output) %s", log_prefix, result)
+    return result
+
+
+@timed
+async def rollback_items_bulk_api(
+    endpoint: str,
+    token: str,
+    targets: list[int],
+    at: str,
+    batch_size: int = 100,
+    concurrency: int = 4,
+    min_interval: float = 0.0,
+    on_progress: Callable[[int, int], Awaitable[None]] | None = None,
+    log_prefix: str = "",
+) -> dict[int, str | None]:
+    """
+    This rolls back items in batches of targets, instead of one request for
+    all of them, and returns an error message (or None) per item id.
+    """
+
+    async def _rollback_batch(batch: list[int]) -> dict[int, str | None]:
+        await rollback_items_api(
+            endpoint=endpoint,
+            token=token,
+            targets=batch,
+            at=at,
+            log_prefix=log_prefix,
+        )
+        return dict.fromkeys(batch)
+
+    return await run_in_batches(
+        list(dict.fromkeys(targets)),
+        _rollback_batch,
+        batch_size=batch_size,
+        concurrency=concurrency,
+        min_interval=min_interval,
+        on_progress=on_progress,
+    )
+
+
+@timed
+async def get_router_topology(
+    endpoint: str,
+    token: str,
+    log_prefix: str = "",
+) -> list[dict]:
+    """
+    This retrieves topology from the Pagoda API.
+    """
+    Logger.debug("%sget_router_topology(Input)", log_prefix)
+    resp = await request_get(
+        url=endpoint + "/api/v2/custom/network/get_router_topology/",
+        params={},
+        token=token,
+    )
+    if resp.status_code != 200:
+        raise RuntimeError("/api/v2/custom/network/get_router_topology/")
+
+    result = loads(resp.content)
+    Logger.debug("%sget_router_topology(Output) %s", log_prefix, result)
+    return result
@@ -0,0 +1,149 @@
+from typing import Any
+
+
+def get_value_names(attr: dict | None) -> list[str]:
+    """
+    Returns names of the value of an attribute in advanced search results.
+    The value is a string (as_string), a referred item (as_object) or an array
+    of them (as_array_string, as_array_object and as_array_named_object).
+    """
+    if not attr:
+        return []
+
+    value = attr.get("value") or {}
+    names = []
+    if value.get("as_string"):
+        names.append(value["as_string"])
+    if value.get("as_object"):
+        names.append(value["as_object"]["name"])
+    names.extend(x for x in value.get("as_array_string") or [] if x)
+    names.extend(x["name"] for x in value.get("as_array_object") or [] if x)
+    names.extend(
+        x["object"]["name"]
+        for x in value.get("as_array_named_object") or []
+        if x.get("object")
+    )
+
+    return names
+
+
+# Keys of the value of an attribute, which are checked in this order
+VALUE_KEYS = [
+    "as_string",
+    "as_number",
+    "as_boolean",
+    "as_object",
+    "as_named_object",
+    "as_group",
+    "as_role",
+    "as_array_string",
+    "as_array_object",
+    "as_array_named_object",
+    "as_array_group",
+    "as_array_role",
+]
+
+
+def _flatten(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_flatten(x) for x in value]
+    if isinstance(value, dict):
+        # named object (e.g. {"name": "U1", "object": {"id": 1, "name": "server"}})
+        if "object" in value:
+            obj = value["object"]
+            return {value.get("name", ""): obj.get("name") if obj else None}
+        return value.get("name") if value else None
+    return value
+
+
+def flatten_value(attr: dict | None) -> Any:
+    """
+    Returns the value of an attribute as a scalar (or a list of them).
+    Referred items are replaced with their names, and a named object is
+    converted to {name: item name}.
+    """
+    if not attr:
+        return None
+
+    value = attr.get("value") or {}
+    keys = [key for key in VALUE_KEYS if value.get(key) is not None]
+    # empty value of other types might be contained together (e.g. as_string="")
+    for key in keys:
+        if value[key] not in ("", [], {}):
+            return _flatten(value[key])
+    return _flatten(value[keys[0]]) if keys else None
+
+
+def get_path(obj: Any, path: list[str]) -> Any:
+    """
+    Returns the value at the path of keys (or list indexes) in obj, or None
+    when it doesn't exist.
+    """
+    for key in path:
+        if isinstance(obj, dict):
+            obj = obj.get(key)
+        elif isinstance(obj, list) and key.isdigit() and int(key) < len(obj):
+            obj = obj[int(key)]
+        else:
+            return None
+    return obj
+
+
+def project(
+    row: dict, attrs: dict[str, dict], fields: list[str] | None, flatten: bool
+) -> dict:
+    """
+    Returns the row of an item with the selected fields only.
+    A field is a name of an attribute (or a property of the item, e.g. model)
+    optionally followed by dotted path in it (e.g. "IPアドレス.value.as_string").
+    When flatten is true, attributes are converted to name → scalar value.
+    """
+    if flatten:
+        attrs = {name: flatten_value(attr) for name, attr in attrs.items()}
+    if fields is None:
+        return {**row, "attrs": attrs}
+
+    projected: dict[str, Any] = {"id": row.get("id"), "name": row.get("name")}
+    projected_attrs: dict[str, Any] = {}
+    for field in fields:
+        # attribute names may contain dots, so the longest one is taken
+        parts = field.split(".")
+        for i in range(len(parts), 0, -1):
+            name = ".".join(parts[:i])
+            if name in attrs:
+                projected_attrs[field] = get_path(attrs[name], parts[i:])
+                break
+        else:
+            projected[field] = get_path(row, parts)
+    projected["attrs"] = projected_attrs
+
+    return projected
+
+
+def get_value_objects(attr: dict | None) -> list[tuple[str, dict]]:
+    """
+    Returns items that are referred by the value of an attribute, as pairs of
+    the name of named object (or "") and the item ({"id": ..., "name": ...}).
+    """
+    if not attr:
+        return []
+
+    value = attr.get("value") or {}
+    objects = []
+    if value.get("as_object"):
+        objects.append(("", value["as_object"]))
+    if (value.get("as_named_object") or {}).get("object"):
+        objects.append(
+            (
+                value["as_named_object"].get("name", ""),
+                value["as_named_object"]["object"],
+            )
+        )
+    objects.extend(("", x) for x in value.get("as_array_object") or [] if x)
+    objects.extend(
+        (x.get("name", ""), x["object"])
+        for x in value.get("as_array_named_object") or []
+        if x.get("object")
+    )
+
+    return objects
@@ -1,6 +1,7 @@
 import logging
 import secrets
 import time
+from typing import Any, Hashable
 
 from mcp.server.auth.middleware.auth_context import get_access_token
 from mcp.server.auth.provider import (
@@ -15,12 +16,14 @@ from mcp.server.auth.settings import AuthSettings, ClientRegistrationOptions
 from mcp.server.fastmcp.server import FastMCP
 from mcp.shared._httpx_utils import create_mcp_http_client
 from mcp.shared.auth import OAuthClientInformationFull, OAuthToken
-from pydantic import AnyHttpUrl
+from pydantic import AnyHttpUrl, BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from starlette.exceptions import HTTPException
 from starlette.requests import Request
 from starlette.responses import JSONResponse, RedirectResponse, Response
 
+from mcp_server.lib.store import MemoryStore, get_shared_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -64,26 +67,60 @@ class AzureServerSettings(BaseSettings):
         super().__init__(**data)
 
 
+# Namespaces of the store that keeps the OAuth state
+CLIENTS = "oauth_clients"
+AUTH_CODES = "oauth_auth_codes"
+TOKENS = "oauth_tokens"
+STATE_MAPPING = "oauth_state_mapping"
+TOKEN_MAPPING = "oauth_token_mapping"
+REFRESH_TOKENS = "oauth_refresh_tokens"
+# Azure AD token of each client, which is mapped to the MCP token issued next
+CLIENT_TOKENS = "oauth_client_tokens"
+
+# Seconds to keep pending authorization requests (state parameters)
+STATE_TTL = 600
+# Seconds to keep tokens after they expire, so that they can be refreshed
+TOKEN_RETENTION = 86400
+
+
+def _ttl(expires_at: float | None) -> float | None:
+    return None if expires_at is None else expires_at - time.time() + TOKEN_RETENTION
+
+
 class SimpleAzureADOAuthProvider(OAuthAuthorizationServerProvider):
-    """Simple Azure AD OAuth provider with essential functionality."""
+    """Simple Azure AD OAuth provider with essential functionality.
+
+    Clients, codes and tokens are kept in the shared store when it's configured,
+    so that they're available in all worker processes (and nodes).
+    """
 
     def __init__(self, settings: BaseSettings):
         self.settings = settings
-        self.clients: dict[str, OAuthClientInformationFull] = {}
-        self.auth_codes: dict[str, AuthorizationCode] = {}
-        self.tokens: dict[str, AccessToken] = {}
-        self.state_mapping: dict[str, dict[str, str]] = {}
-        self.token_mapping: dict[str, str] = {}
-        # Store refresh tokens
-        self.refresh_tokens: dict[str, str] = {}
+        self.store = get_shared_store() or MemoryStore()
+
+    async def _get(
+        self, namespace: str, key: Hashable, model: type[BaseModel] | None = None
+    ) -> Any:
+        value = await self.store.aget(namespace, key)
+        if value is None or model is None:
+            return value
+        return model.model_validate(value)
+
+    async def _set(
+        self, namespace: str, key: Hashable, value: Any, ttl: float | None = None
+    ) -> None:
+        # models are kept as JSON in the store
+        if isinstance(value, BaseModel):
+            value = value.model_dump(mode="json")
+        await self.store.aset(namespace, key, value, ttl=ttl)
 
     async def get_client(self, client_id: str) -> OAuthClientInformationFull | None:
         """Get OAuth client information."""
-        return self.clients.get(client_id)
+        return await self._get(CLIENTS, client_id, OAuthClientInformationFull)
 
     async def register_client(self, client_info: OAuthClientInformationFull):
         """Register a new OAuth client."""
-        self.clients[client_info.client_id] = client_info
+        await self._set(CLIENTS, client_info.client_id, client_info)
 
     async def authorize(
         self, client: OAuthClientInformationFull, params: AuthorizationParams
@@ -92,14 +129,19 @@ class SimpleAzureADOAuthProvider(OAuthAuthorizationServerProvider):
         state = params.state or secrets.token_hex(16)
 
         # Store the state mapping
-        self.state_mapping[state] = {
-            "redirect_uri": str(params.redirect_uri),
-            "code_challenge": params.code_challenge,
-            "redirect_uri_provided_explicitly": str(
-                params.redirect_uri_provided_explicitly
-            ),
-            "client_id": client.client_id,
-        }
+        await self._set(
+            STATE_MAPPING,
+            state,
+            {
+                "redirect_uri": str(params.redirect_uri),
+                "code_challenge": params.code_challenge,
+                "redirect_uri_provided_explicitly": str(
+                    params.redirect_uri_provided_explicitly
+                ),
+                "client_id": client.client_id,
+            },
+            ttl=STATE_TTL,
+        )
 
         # Build Azure AD authorization URL
         auth_url = (
@@ -116,7 +158,7 @@ class SimpleAzureADOAuthProvider(OAuthAuthorizationServerProvider):
 
     async def handle_azure_callback(self, code: str, state: str) -> str:
         """Handle Azure AD OAuth callback."""
-        state_data = self.state_mapping.get(state)
+        state_data = await self._get(STATE_MAPPING, state)
         if not state_data:
             raise HTTPException(400, "Invalid state parameter")
 
@@ -166,62 +208,75 @@ class SimpleAzureADOAuthProvider(OAuthAuthorizationServerProvider):
                 scopes=[self.settings.mcp_scope],
                 code_challenge=code_challenge,
             )
-            self.auth_codes[new_code] = auth_code
+            await self._set(
+                AUTH_CODES, new_code, auth_code, ttl=auth_code.expires_at - time.time()
+            )
 
             # Store Azure AD token - we'll map the MCP token to this later
-            self.tokens[azure_token] = AccessToken(
-                token=azure_token,
-                client_id=client_id,
-                scopes=[self.settings.azure_scope],
-                expires_at=int(time.time() + data.get("expires_in", 3600)),
+            expires_at = int(time.time() + data.get("expires_in", 3600))
+            await self._set(
+                TOKENS,
+                azure_token,
+                AccessToken(
+                    token=azure_token,
+                    client_id=client_id,
+                    scopes=[self.settings.azure_scope],
+                    expires_at=expires_at,
+                ),
+                ttl=_ttl(expires_at),
             )
+            await self._set(CLIENT_TOKENS, client_id, azure_token, ttl=_ttl(expires_at))
 
             # Store refresh token if provided
             if azure_refresh_token:
-                self.refresh_tokens[azure_token] = azure_refresh_token
+                await self._set(
+                    REFRESH_TOKENS,
+                    azure_token,
+                    azure_refresh_token,
+                    ttl=_ttl(expires_at),
+                )
 
-        del self.state_mapping[state]
+        await self.store.adelete(STATE_MAPPING, state)
         return construct_redirect_uri(redirect_uri, code=new_code, state=state)
 
     async def load_authorization_code(
         self, client: OAuthClientInformationFull, authorization_code: str
     ) -> AuthorizationCode | None:
         """Load an authorization code."""
-        return self.auth_codes.get(authorization_code)
+        return await self._get(AUTH_CODES, authorization_code, AuthorizationCode)
 
     async def exchange_authorization_code(
         self, client: OAuthClientInformationFull, authorization_code: AuthorizationCode
     ) -> OAuthToken:
         """Exchange authorization code for tokens."""
-        if authorization_code.code not in self.auth_codes:
+        if await self._get(AUTH_CODES, authorization_code.code) is None:
             raise ValueError("Invalid authorization code")
 
         # Generate MCP access token
         mcp_token = f"mcp_{secrets.token_hex(32)}"
 
         # Store MCP token
-        self.tokens[mcp_token] = AccessToken(
-            token=mcp_token,
-            client_id=client.client_id,
-            scopes=authorization_code.scopes,
-            expires_at=int(time.time()) + 3600,
+        expires_at = int(time.time()) + 3600
+        await self._set(
+            TOKENS,
+            mcp_token,
+            AccessToken(
+                token=mcp_token,
+                client_id=client.client_id,
+                scopes=authorization_code.scopes,
+                expires_at=expires_at,
+            ),
+            ttl=_ttl(expires_at),
         )
 
         # Find Azure AD token for this client
-        azure_token = next(
-            (
-                token
-                for token, data in self.tokens.items()
-                if not token.startswith("mcp_") and data.client_id == client.client_id
-            ),
-            None,
-        )
+        azure_token = await self._get(CLIENT_TOKENS, client.client_id)
 
         # Store mapping between MCP token and Azure AD token
         if azure_token:
-            self.token_mapping[mcp_token] = azure_token
+            await self._set(TOKEN_MAPPING, mcp_token, azure_token, ttl=_ttl(expires_at))
 
-        del self.auth_codes[authorization_code.code]
+        await self.store.adelete(AUTH_CODES, authorization_code.code)
 
         return OAuthToken(
             access_token=mcp_token,
@@ -232,31 +287,36 @@ class SimpleAzureADOAuthProvider(OAuthAuthorizationServerProvider):
 
     async def load_access_token(self, token: str) -> AccessToken | None:
         """Load and validate an access token."""
-        access_token = self.tokens.get(token)
+        access_token = await self._get(TOKENS, token, AccessToken)
         if not access_token:
             return None
 
         # Check if expired
         if access_token.expires_at and access_token.expires_at < time.time():
             # Try to refresh if this is an MCP token with Azure mapping
-            if token.startswith("mcp_") and token in self.token_mapping:
-                azure_token = self.token_mapping[token]
-                if azure_token in self.refresh_tokens:
+            azure_token = await self._get(TOKEN_MAPPING, token)
+            if token.startswith("mcp_") and azure_token:
+                if await self._get(REFRESH_TOKENS, azure_token):
                     # Attempt to refresh the Azure token
                     new_azure_token = await self._refresh_azure_token(azure_token)
                     if new_azure_token:
                         # Update mappings
-                        self.token_mapping[token] = new_azure_token
-                        return self.tokens.get(token)
-
-            del self.tokens[token]
+                        await self._set(
+                            TOKEN_MAPPING,
+                            token,
+                            new_azure_token,
+                            ttl=_ttl(access_token.expires_at),
+                        )
+                        return await self._get(TOKENS, token, AccessToken)
+
+            await self.store.adelete(TOKENS, token)
             return None
 
         return access_token
 
     async def _refresh_azure_token(self, azure_token: str) -> str | None:
         """Refresh an Azure AD token."""
-        refresh_token = self.refresh_tokens.get(azure_token)
+        refresh_token = await self._get(REFRESH_TOKENS, azure_token)
         if not refresh_token:
             return None
 
@@ -281,17 +341,27 @@ class SimpleAzureADOAuthProvider(OAuthAuthorizationServerProvider):
             new_refresh_token = data.get("refresh_token", refresh_token)
 
             # Update tokens
-            token_data = self.tokens[azure_token]
-            del self.tokens[azure_token]
-            del self.refresh_tokens[azure_token]
-
-            self.tokens[new_azure_token] = AccessToken(
-                token=new_azure_token,
-                client_id=token_data.client_id,
-                scopes=token_data.scopes,
-                expires_at=time.time() + data.get("expires_in", 3600),
+            token_data = await self._get(TOKENS, azure_token, AccessToken)
+            if token_data is None:
+                return None
+            await self.store.adelete(TOKENS, azure_token)
+            await self.store.adelete(REFRESH_TOKENS, azure_token)
+
+            expires_at = int(time.time() + data.get("expires_in", 3600))
+            await self._set(
+                TOKENS,
+                new_azure_token,
+                AccessToken(
+                    token=new_azure_token,
+                    client_id=token_data.client_id,
+                    scopes=token_data.scopes,
+                    expires_at=expires_at,
+                ),
+                ttl=_ttl(expires_at),
+            )
+            await self._set(
+                REFRESH_TOKENS, new_azure_token, new_refresh_token, ttl=_ttl(expires_at)
             )
-            self.refresh_tokens[new_azure_token] = new_refresh_token
 
             return new_azure_token
 
@@ -314,13 +384,11 @@ class SimpleAzureADOAuthProvider(OAuthAuthorizationServerProvider):
         self, token: str, token_type_hint: str | None = None
     ) -> None:
         """Revoke a token."""
-        if token in self.tokens:
-            del self.tokens[token]
-        if token in self.token_mapping:
-            del self.token_mapping[token]
+        await self.store.adelete(TOKENS, token)
+        await self.store.adelete(TOKEN_MAPPING, token)
 
 
-def get_azure_mcp_server(host: str, port: int) -> FastMCP:
+def get_azure_mcp_server(host: str, port: int, stateless_http: bool = False) -> FastMCP:
     try:
         # No hardcoded credentials - all from environment variables
         settings = AzureServerSettings(host=host, port=port)
@@ -355,6 +423,7 @@ def get_azure_mcp_server(host: str, port: int) -> FastMCP:
         port=settings.port,
         debug=True,
         auth=auth_settings,
+        stateless_http=stateless_http,
     )
 
     @server.custom_route("/azure/callback", methods=["GET"])
@@ -395,7 +464,7 @@ def get_azure_mcp_server(host: str, port: int) -> FastMCP:
             raise ValueError("Not authenticated")
 
         # Get Azure AD token from mapping
-        azure_token = oauth_provider.token_mapping.get(access_token.token)
+        azure_token = oauth_provider.store.get(TOKEN_MAPPING, access_token.token)
 
         if not azure_token:
             raise ValueError("No Azure AD token found for user")
@@ -0,0 +1,160 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from mcp_server.lib.store import get_shared_store
+
+
+def token_scope(token: str) -> str:
+    """
+    Returns an identifier of the permission of the token, which is used as a
+    part of cache keys instead of the token itself.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries expire after ttl seconds.
+    Setting ttl to 0 disables the cache.
+    When namespace is specified and a shared store is configured, entries are
+    also written to the store, and read from it when they're not in this
+    process (e.g. they're cached by another worker process). Then values have
+    to be JSON-serializable, and coroutines should use the methods prefixed
+    with "a" that don't block the event loop while the store is accessed.
+    """
+
+    def __init__(
+        self, maxsize: int = 1024, ttl: float = 300, namespace: str | None = None
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, maxsize: int | None = None, ttl: float | None = None) -> None:
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if ttl is not None:
+                self.ttl = ttl
+            self._entries.clear()
+
+    def _get_local(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                self._entries.move_to_end(key)
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            return None
+
+    def _count(self, value: Any, default: Any) -> Any:
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._get_local(key)
+        store = get_shared_store()
+        if value is None and self.namespace and store is not None:
+            value = store.get(self.namespace, key)
+            if value is not None:
+                self._set_local(key, value, self.ttl)
+        return self._count(value, default)
+
+    async def aget(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Same as get(), but the shared store is read without blocking the event
+        loop.
+        """
+        value = self._get_local(key)
+        store = get_shared_store()
+        if value is None and self.namespace and store is not None:
+            value = await store.aget(self.namespace, key)
+            if value is not None:
+                self._set_local(key, value, self.ttl)
+        return self._count(value, default)
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        store = get_shared_store()
+        if self.namespace and store is not None:
+            store.set(self.namespace, key, value, ttl)
+        self._set_local(key, value, ttl)
+
+    async def aset(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        store = get_shared_store()
+        if self.namespace and store is not None:
+            await store.aset(self.namespace, key, value, ttl)
+        self._set_local(key, value, ttl)
+
+    def _set_local(self, key: Hashable, value: Any, ttl: float) -> None:
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[0] < time.monotonic():
+                return default
+            return entry[1]
+
+    def _invalidate_local(self, predicate: Callable[[Hashable], bool] | None) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if predicate is None or predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool] | None = None) -> int:
+        """
+        Removes entries whose key matches the predicate (or all entries when
+        it's not specified) and returns the number of removed entries.
+        """
+        store = get_shared_store()
+        removed = 0
+        if self.namespace and store is not None:
+            removed = store.invalidate(self.namespace, predicate)
+        return max(removed, self._invalidate_local(predicate))
+
+    async def ainvalidate(
+        self, predicate: Callable[[Hashable], bool] | None = None
+    ) -> int:
+        store = get_shared_store()
+        removed = 0
+        if self.namespace and store is not None:
+            removed = await store.ainvalidate(self.namespace, predicate)
+        return max(removed, self._invalidate_local(predicate))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,111 @@
+import json
+import secrets
+from typing import AsyncIterator, Hashable, TypeVar
+
+from mcp_server.lib.cache import TTLCache
+from mcp_server.lib.store import get_shared_store
+
+T = TypeVar("T")
+
+# Namespace of the shared store that keeps sources of cursors
+SOURCES = "cursor_sources"
+
+
+async def skip_rows(rows: AsyncIterator[T], count: int) -> AsyncIterator[T]:
+    async for row in rows:
+        if count > 0:
+            count -= 1
+            continue
+        yield row
+
+
+def _scope_id(scope: Hashable) -> str:
+    # scopes are compared as JSON in the shared store, which returns tuples as
+    # lists
+    return json.dumps(scope)
+
+
+class CursorStore:
+    """
+    Holds iterators of results between tool calls, so that a large result is
+    consumed page by page through opaque cursors without fetching it again.
+    A cursor can be used only once and only in the same scope (e.g. token),
+    and it expires when it's not used for ttl seconds. It keeps the limit of
+    the first call as the page size of the following calls.
+    When the source of rows is specified, it's kept in the shared store with
+    the number of rows that have been returned, so that the other processes
+    (e.g. stateless HTTP servers) can resume the cursor by reading the source
+    again from that offset.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 600):
+        self._cursors = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def configure(self, maxsize: int | None = None, ttl: float | None = None) -> None:
+        self._cursors.configure(maxsize=maxsize, ttl=ttl)
+
+    async def read(
+        self,
+        rows: AsyncIterator[T],
+        limit: int | None,
+        scope: Hashable,
+        pending: list[T] | None = None,
+        source: dict | None = None,
+    ) -> tuple[list[T], str | None]:
+        """
+        Returns up to limit rows and the cursor of the rest, which is None
+        when there are no more rows.
+        """
+        page = list(pending or [])
+        if limit is None or len(page) <= limit:
+            async for row in rows:
+                page.append(row)
+                # one more row is read to know whether there are more rows
+                if limit is not None and len(page) > limit:
+                    break
+        if limit is None or len(page) <= limit:
+            return page, None
+
+        cursor = secrets.token_urlsafe(16)
+        if source is not None:
+            source = {**source, "offset": source.get("offset", 0) + limit}
+            store = get_shared_store()
+            if store is not None:
+                await store.aset(
+                    SOURCES,
+                    cursor,
+                    {"scope": _scope_id(scope), "source": source, "limit": limit},
+                    ttl=self._cursors.ttl,
+                )
+        self._cursors.set(cursor, (scope, rows, page[limit:], source, limit))
+        return page[:limit], cursor
+
+    async def resume(
+        self, cursor: str, scope: Hashable
+    ) -> tuple[AsyncIterator | None, list, dict | None, int]:
+        """
+        Returns the iterator, the rows that were read ahead, the source and the
+        page size for the cursor. The iterator is None when the cursor was issued by another
+        process, then the rest is read from the offset of the source.
+        """
+        store = get_shared_store()
+        entry = self._cursors.get(cursor)
+        if entry is not None and entry[0] == scope:
+            self._cursors.pop(cursor)
+            if store is not None and entry[3] is not None:
+                # it may have been resumed by another process
+                if await store.aget(SOURCES, cursor) is None:
+                    raise ValueError("Cursor is invalid or expired")
+                await store.adelete(SOURCES, cursor)
+            return entry[1], entry[2], entry[3], entry[4]
+
+        if entry is not None or store is None:
+            raise ValueError("Cursor is invalid or expired")
+        shared = await store.aget(SOURCES, cursor)
+        if shared is None or shared["scope"] != _scope_id(scope):
+            raise ValueError("Cursor is invalid or expired")
+        await store.adelete(SOURCES, cursor)
+        return None, [], shared["source"], shared["limit"]
+
+    def stats(self) -> dict:
+        return self._cursors.stats()
@@ -1,49 +1,145 @@
+import threading
+from http.cookiejar import DefaultCookiePolicy
 from urllib.parse import urlparse
 
-import requests
+import httpx
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
-def http_request_get(url, headers=None, params=None, timeout=10):
+class HTTPPoolSettings(BaseSettings):
+    """Settings of the connection pool that is shared by all requests to Pagoda"""
+
+    model_config = SettingsConfigDict(env_prefix="MCP_PAGODA_HTTP_")
+
+    # number of keep-alive connections that are kept for each endpoint
+    pool_size: int = 10
+    # seconds to wait for establishing a connection / receiving a response
+    connect_timeout: float = 10
+    read_timeout: float = 60
+
+
+# Clients are shared by all users, so that they must not keep cookies of a
+# user (e.g. Set-Cookie of Pagoda) and send them for the others
+NO_COOKIES = DefaultCookiePolicy(allowed_domains=[])
+
+
+class CountingTransport(httpx.AsyncBaseTransport):
     """
-    指定したURLにGETリクエストを送信する
+    Transport that counts requests sent through it, and the ones waiting for
+    their responses (which are using or waiting for connections of the pool).
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+        self.requests = 0
+        self.waiting = 0
 
-    Args:
-        url (str): リクエスト先のURL
-        headers (dict, optional): リクエストヘッダー
-        params (dict, optional): クエリパラメータ
-        timeout (int): タイムアウト時間（秒）
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.waiting += 1
+        try:
+            return await self.transport.handle_async_request(request)
+        finally:
+            self.waiting -= 1
 
-    Returns:
-        requests.Response: レスポンスオブジェクト
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+_settings = HTTPPoolSettings()
+_clients_lock = threading.Lock()
+_async_clients: dict[tuple[str, bool], httpx.AsyncClient] = {}
+_async_transports: dict[tuple[str, bool], CountingTransport] = {}
+
+
+def _get_base_url(url: str) -> str:
+    parsed_url = urlparse(url)
+    if not parsed_url.scheme or not parsed_url.netloc:
+        raise ValueError("無効なURLです")
+
+    return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+
+def configure_http_pool(
+    pool_size: int | None = None,
+    connect_timeout: float | None = None,
+    read_timeout: float | None = None,
+) -> HTTPPoolSettings:
+    """
+    Change settings of the shared connection pool. Unspecified values are
+    loaded from environment variables (MCP_PAGODA_HTTP_*) or defaults.
+    Clients that have already been created are dropped so that they are
+    re-created with the new settings at the next request.
     """
-    try:
-        # URLの妥当性をチェック
-        parsed_url = urlparse(url)
-        if not parsed_url.scheme or not parsed_url.netloc:
-            raise ValueError("無効なURLです")
+    global _settings
 
-        # GETリクエストを送信
-        response = requests.get(
-            url=url, headers=headers, params=params, timeout=timeout
+    update = {
+        key: value
+        for key, value in {
+            "pool_size": pool_size,
+            "connect_timeout": connect_timeout,
+            "read_timeout": read_timeout,
+        }.items()
+        if value is not None
+    }
+    with _clients_lock:
+        _settings = HTTPPoolSettings(**update)
+        # AsyncClient can only be closed in the event loop, so that these are
+        # left for the garbage collector after they finish their requests.
+        _async_clients.clear()
+        _async_transports.clear()
+
+    return _settings
+
+
+def get_pool_size() -> int:
+    return _settings.pool_size
+
+
+def get_async_client(url: str, verify: bool = False) -> httpx.AsyncClient:
+    """
+    Get a keep-alive AsyncClient that is shared by every request to the same
+    endpoint (scheme and host) of the specified URL. This must be called in
+    the event loop which sends requests with it.
+    Requests of the driver don't verify TLS certificates as the former
+    driver, but ones that authenticate users (e.g. token verification) have
+    to verify them with verify=True, which are sent through another pool.
+    """
+    key = (_get_base_url(url), verify)
+
+    if key not in _async_clients:
+        limits = httpx.Limits(
+            max_connections=_settings.pool_size,
+            max_keepalive_connections=_settings.pool_size,
         )
+        _async_transports[key] = CountingTransport(
+            httpx.AsyncHTTPTransport(limits=limits, verify=verify)
+        )
+        _async_clients[key] = httpx.AsyncClient(
+            transport=_async_transports[key],
+            timeout=httpx.Timeout(
+                _settings.read_timeout, connect=_settings.connect_timeout
+            ),
+        )
+        _async_clients[key].cookies.jar.set_policy(NO_COOKIES)
+
+    return _async_clients[key]
+
+
+def get_pool_stats() -> dict[str, int]:
+    """
+    Returns usage of the shared connection pools, which are summed up over
+    endpoints not to tell them. This helps to tune pool_size: when
+    "waiting_requests" keeps reaching "pool_size", requests are waiting for
+    connections.
+    """
+    with _clients_lock:
+        transports = list(_async_transports.values())
+        endpoints = {base_url for base_url, _ in _async_transports}
 
-        # レスポンスのステータスコードをチェック
-        response.raise_for_status()
-
-        return response
-
-    except requests.exceptions.Timeout:
-        print(f"タイムアウトエラー: {url} への接続がタイムアウトしました")
-        return None
-    except requests.exceptions.ConnectionError:
-        print(f"接続エラー: {url} に接続できませんでした")
-        return None
-    except requests.exceptions.HTTPError as e:
-        print(f"HTTPエラー: {e}")
-        return None
-    except requests.exceptions.RequestException as e:
-        print(f"リクエストエラー: {e}")
-        return None
-    except ValueError as e:
-        print(f"エラー: {e}")
-        return None
+    return {
+        "pool_size": _settings.pool_size,
+        "endpoints": len(endpoints),
+        "requests": sum(transport.requests for transport in transports),
+        "waiting_requests": sum(transport.waiting for transport in transports),
+    }
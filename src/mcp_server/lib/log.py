@@ -23,4 +23,7 @@ Logger.addHandler(my_handler)
 
 def get_prefix(ctx: Context) -> str:
     request = ctx.request_context.request
+    # there is no HTTP request with stdio transport
+    if request is None or request.client is None:
+        return ""
     return f"[From:{request.client.host}] "
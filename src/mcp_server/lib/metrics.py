@@ -0,0 +1,199 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+# Upper bounds of buckets of histograms
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS = tuple(1024 * 4**i for i in range(10))
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000, 20000, 100000)
+
+
+class Histogram:
+    """
+    Counts of observed values in buckets, which are cumulative in to_dict()
+    as the ones of Prometheus.
+    """
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class Metrics:
+    """
+    Registry of histograms that are identified by their names and labels.
+    """
+
+    def __init__(self):
+        self._histograms: dict[tuple[str, tuple], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(
+        self, name: str, value: float, buckets: tuple[float, ...], **labels: str
+    ) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def snapshot(self) -> dict[str, list[dict]]:
+        with self._lock:
+            snapshot: dict[str, list[dict]] = {}
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                snapshot.setdefault(name, []).append(
+                    {"labels": dict(labels), **histogram.to_dict()}
+                )
+            return snapshot
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+METRICS = Metrics()
+
+
+class Span:
+    """
+    Measurements of one tool call. Time of HTTP requests, decoding and
+    serialization is the sum of them, which may exceed the elapsed time of
+    the tool when requests are sent in parallel.
+    A request that is coalesced with an identical one in flight is counted
+    in coalesced_requests, while its time and size are recorded in the span
+    of the tool call that sent it.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.requests = 0
+        self.coalesced_requests = 0
+        self.http_seconds = 0.0
+        self.bytes_in = 0
+        self.chars_out = 0
+        self.rows = 0
+        self.decode_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+
+# Tasks created in a tool call (e.g. to fetch pages in parallel) share its span
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def get_current_span() -> Span | None:
+    return _current_span.get()
+
+
+def record_request(method: str, path: str, seconds: float, size: int) -> None:
+    """
+    This records a request to Pagoda, whose path should have ids replaced
+    (e.g. /entry/api/v2/{id}/) to keep the number of labels small.
+    """
+    METRICS.observe(
+        "pagoda_request_seconds", seconds, SECONDS_BUCKETS, method=method, path=path
+    )
+    METRICS.observe("pagoda_response_bytes", size, BYTES_BUCKETS, path=path)
+
+    span = _current_span.get()
+    if span is not None:
+        span.requests += 1
+        span.http_seconds += seconds
+        span.bytes_in += size
+
+
+def record_coalesced_request() -> None:
+    span = _current_span.get()
+    if span is not None:
+        span.coalesced_requests += 1
+
+
+def record_rows(rows: int) -> None:
+    span = _current_span.get()
+    if span is not None:
+        span.rows += rows
+
+
+def instrument_tool(
+    func: Callable[..., Awaitable[str]],
+) -> Callable[..., Awaitable[str]]:
+    """
+    This wraps a tool function to record its elapsed time and the span of it.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> str:
+        span = Span(func.__name__)
+        token = _current_span.set(span)
+        status = "error"
+        start = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+            # characters are counted instead of bytes not to encode large results
+            span.chars_out = len(result) if isinstance(result, str) else 0
+            status = "ok"
+            return result
+        finally:
+            _current_span.reset(token)
+            seconds = time.perf_counter() - start
+            METRICS.observe(
+                "tool_seconds", seconds, SECONDS_BUCKETS, tool=span.name, status=status
+            )
+            for name, value, buckets in [
+                ("tool_pagoda_requests", span.requests, COUNT_BUCKETS),
+                ("tool_coalesced_requests", span.coalesced_requests, COUNT_BUCKETS),
+                ("tool_http_seconds", span.http_seconds, SECONDS_BUCKETS),
+                ("tool_decode_seconds", span.decode_seconds, SECONDS_BUCKETS),
+                ("tool_serialize_seconds", span.serialize_seconds, SECONDS_BUCKETS),
+                ("tool_input_bytes", span.bytes_in, BYTES_BUCKETS),
+                ("tool_output_chars", span.chars_out, BYTES_BUCKETS),
+                ("tool_rows", span.rows, COUNT_BUCKETS),
+            ]:
+                METRICS.observe(name, value, buckets, tool=span.name)
+
+    return wrapper
+
+
+def timed(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """
+    This records elapsed time of an async function (e.g. of the driver).
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        status = "error"
+        start = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+            status = "ok"
+            return result
+        finally:
+            METRICS.observe(
+                "driver_seconds",
+                time.perf_counter() - start,
+                SECONDS_BUCKETS,
+                func=func.__name__,
+                status=status,
+            )
+
+    return wrapper
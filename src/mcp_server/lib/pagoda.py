@@ -1,9 +1,19 @@
-from mcp_server.lib.http import http_request_get
+import httpx
 
+from mcp_server.lib.cache import TTLCache, token_scope
+from mcp_server.lib.http import get_async_client
+from mcp_server.lib.log import Logger
 
-def is_token_valid(pagoda_url_base: str, token: str) -> bool:
+# Results of token verification are cached so that repeated requests from the
+# same client are authenticated without asking Pagoda every time.
+# Invalid tokens are cached for a shorter time than valid ones.
+TOKEN_CACHE = TTLCache(maxsize=4096, ttl=60, namespace="token")
+TOKEN_NEGATIVE_CACHE_TTL = 10
+
+
+async def is_token_valid_async(pagoda_url_base: str, token: str) -> bool:
     """
-    Verify toekn verification
+    Verify token without blocking the event loop, and cache its result
 
     Args:
         token (str): verifying token
@@ -12,17 +22,35 @@ def is_token_valid(pagoda_url_base: str, token: str) -> bool:
     Returns:
         bool: whether specified token is valid or not
     """
-    headers = {
-        "Authorization": "Token " + token,
-    }
+    cache_key = (pagoda_url_base, token_scope(token))
+    is_valid = await TOKEN_CACHE.aget(cache_key)
+    if is_valid is not None:
+        return is_valid
 
-    response = http_request_get(
-        url=f"{pagoda_url_base}/user/api/v2/token/", headers=headers
-    )
-    if response is None:
+    url = f"{pagoda_url_base}/user/api/v2/token/"
+    try:
+        # the certificate of Pagoda is verified not to accept any token from
+        # a server impersonating it
+        response = await get_async_client(url, verify=True).get(
+            url, headers={"Authorization": "Token " + token}
+        )
+    except (httpx.HTTPError, ValueError) as e:
+        # This is not cached because it might be a temporary failure of Pagoda
+        Logger.warning(f"Failed to verify token: {e}")
         return False
 
-    try:
-        return response.json()["key"] == token
-    except ValueError:
+    if response.is_server_error:
+        Logger.warning(f"Failed to verify token: status={response.status_code}")
         return False
+
+    try:
+        is_valid = response.is_success and response.json()["key"] == token
+    except (ValueError, KeyError):
+        is_valid = False
+
+    await TOKEN_CACHE.aset(
+        cache_key,
+        is_valid,
+        ttl=None if is_valid else min(TOKEN_NEGATIVE_CACHE_TTL, TOKEN_CACHE.ttl),
+    )
+    return is_valid
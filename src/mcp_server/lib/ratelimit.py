@@ -0,0 +1,31 @@
+import asyncio
+
+
+class RateLimiter:
+    """
+    Async context manager that limits the number of concurrent calls and
+    keeps at least min_interval seconds between the starts of the calls.
+    """
+
+    def __init__(self, concurrency: int, min_interval: float = 0.0):
+        self.min_interval = min_interval
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def __aenter__(self) -> "RateLimiter":
+        await self._semaphore.acquire()
+        try:
+            async with self._lock:
+                now = asyncio.get_running_loop().time()
+                if self._next_start > now:
+                    await asyncio.sleep(self._next_start - now)
+                    now = self._next_start
+                self._next_start = now + self.min_interval
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._semaphore.release()
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import struct
+import tempfile
+from urllib.parse import parse_qs
+
+import anyio
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from mcp_server.lib.store import Store
+
+logger = logging.getLogger(__name__)
+
+# Namespace of the store that maps SSE sessions to the worker keeping them
+SESSIONS = "sse_sessions"
+# Seconds to keep a session in the store when its worker exits without
+# removing it (e.g. it's killed)
+SESSION_TTL = 86400
+
+SESSION_ID_PATTERN = re.compile(rb"session_id=([0-9a-f]{32})")
+
+# Relayed requests and responses are JSON prefixed with their length, so that
+# they aren't limited by the buffer size of StreamReader.readline()
+FRAME_HEADER = struct.Struct("!I")
+
+
+async def read_frame(reader: asyncio.StreamReader) -> dict:
+    (length,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    return json.loads(await reader.readexactly(length))
+
+
+async def write_frame(writer: asyncio.StreamWriter, frame: dict) -> None:
+    data = json.dumps(frame).encode()
+    writer.write(FRAME_HEADER.pack(len(data)) + data)
+    await writer.drain()
+
+
+class SSESessionRelay:
+    """
+    ASGI middleware that lets worker processes serve the same SSE sessions.
+
+    A stream of SSE is kept by the worker that accepted it, while messages of
+    the session can be posted to any worker. So each worker records its
+    sessions in the shared store, and relays the messages of the sessions of
+    others to them through a Unix domain socket, where they're handled as if
+    they were posted to that worker (including authorization).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: Store,
+        sse_path: str = "/sse",
+        message_path: str = "/messages/",
+    ):
+        self.app = app
+        self.store = store
+        self.sse_path = sse_path
+        self.message_path = message_path
+        self.socket_path = os.path.join(
+            tempfile.gettempdir(), f"mcp-pagoda-{os.getpid()}.sock"
+        )
+        self._sessions: set[str] = set()
+        self._server: asyncio.Server | None = None
+        self._server_lock = asyncio.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] == self.sse_path:
+            await self._handle_stream(scope, receive, send)
+        elif scope["type"] == "http" and scope["path"] == self.message_path:
+            await self._handle_message(scope, receive, send)
+        elif scope["type"] == "lifespan":
+            await self._handle_lifespan(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _handle_lifespan(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "lifespan.shutdown.complete":
+                self._stop_server()
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _start_server(self) -> None:
+        async with self._server_lock:
+            if self._server is not None:
+                return
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self._server = await asyncio.start_unix_server(
+                self._handle_relay, self.socket_path
+            )
+            os.chmod(self.socket_path, 0o600)
+
+    def _stop_server(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    async def _handle_stream(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self._start_server()
+        session_id: str | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal session_id
+            # The first event of the stream tells the URL to post messages to
+            if session_id is None and message["type"] == "http.response.body":
+                matched = SESSION_ID_PATTERN.search(message.get("body", b""))
+                if matched:
+                    session_id = new_session_id = matched.group(1).decode()
+                    self._sessions.add(new_session_id)
+                    await self.store.aset(
+                        SESSIONS, new_session_id, self.socket_path, ttl=SESSION_TTL
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if session_id is not None:
+                self._sessions.discard(session_id)
+                # the stream may end by cancellation
+                with anyio.CancelScope(shield=True):
+                    await self.store.adelete(SESSIONS, session_id)
+
+    async def _handle_message(self, scope: Scope, receive: Receive, send: Send) -> None:
+        query = parse_qs(scope.get("query_string", b"").decode())
+        session_id = query.get("session_id", [""])[0]
+        owner = None
+        if session_id not in self._sessions:
+            owner = await self.store.aget(SESSIONS, session_id)
+        if owner is None or owner == self.socket_path:
+            return await self.app(scope, receive, send)
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        request = {
+            "query_string": scope.get("query_string", b"").decode("latin-1"),
+            "headers": [
+                [key.decode("latin-1"), value.decode("latin-1")]
+                for key, value in scope["headers"]
+            ],
+            "body": body.decode("latin-1"),
+        }
+        try:
+            reader, writer = await asyncio.open_unix_connection(owner)
+        except (ConnectionRefusedError, FileNotFoundError) as e:
+            # the worker that kept the session has exited
+            logger.warning(f"Failed to relay a message of session {session_id}: {e}")
+            await self.store.adelete(SESSIONS, session_id)
+            response = {
+                "status": 404,
+                "headers": [["content-type", "text/plain; charset=utf-8"]],
+                "body": "Could not find session",
+            }
+        else:
+            try:
+                await write_frame(writer, request)
+                response = await read_frame(reader)
+            except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+                # the session may still be alive, so that it's kept in the store
+                logger.error(f"Failed to relay a message of session {session_id}: {e}")
+                response = {
+                    "status": 502,
+                    "headers": [["content-type", "text/plain; charset=utf-8"]],
+                    "body": "Failed to relay the message",
+                }
+            finally:
+                writer.close()
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response["status"],
+                "headers": [
+                    [key.encode("latin-1"), value.encode("latin-1")]
+                    for key, value in response["headers"]
+                ],
+            }
+        )
+        await send(
+            {"type": "http.response.body", "body": response["body"].encode("latin-1")}
+        )
+
+    async def _handle_relay(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request = await read_frame(reader)
+            scope: Scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "POST",
+                "scheme": "http",
+                "path": self.message_path,
+                "raw_path": self.message_path.encode(),
+                "root_path": "",
+                "query_string": request["query_string"].encode("latin-1"),
+                "headers": [
+                    (key.encode("latin-1"), value.encode("latin-1"))
+                    for key, value in request["headers"]
+                ],
+                "client": None,
+                "server": None,
+            }
+            body = request["body"].encode("latin-1")
+            response = {"status": 500, "headers": [], "body": ""}
+
+            async def receive() -> Message:
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            async def send(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    response["status"] = message["status"]
+                    response["headers"] = [
+                        [key.decode("latin-1"), value.decode("latin-1")]
+                        for key, value in message.get("headers", [])
+                    ]
+                elif message["type"] == "http.response.body":
+                    response["body"] += message.get("body", b"").decode("latin-1")
+
+            await self.app(scope, receive, send)
+            await write_frame(writer, response)
+        except Exception as e:
+            logger.error("Failed to handle a relayed message", exc_info=e)
+        finally:
+            writer.close()
@@ -0,0 +1,112 @@
+import json
+import time
+from typing import Any, Callable, Literal
+
+import pydantic_core
+from mcp_server.lib.metrics import get_current_span
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+SerializerName = Literal["auto", "json", "pydantic", "orjson"]
+
+
+def _to_python(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class Serializer:
+    """
+    Encoder and decoder of JSON that is used for tool results and Pagoda
+    responses. pydantic models are serialized with their field names as
+    model_dump() does.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        dumps: Callable[[Any], str],
+        loads: Callable[[bytes | str], Any],
+    ):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+
+SERIALIZERS: dict[str, Serializer] = {
+    # This is compatible with the output of json.dumps(model.model_dump())
+    "json": Serializer(
+        name="json",
+        dumps=lambda obj: json.dumps(obj, default=_to_python),
+        loads=json.loads,
+    ),
+    # This encodes pydantic models to JSON bytes directly, without dict
+    "pydantic": Serializer(
+        name="pydantic",
+        dumps=lambda obj: pydantic_core.to_json(obj, by_alias=False).decode(),
+        loads=pydantic_core.from_json,
+    ),
+}
+if orjson is not None:
+    _orjson_dumps_bytes = orjson.dumps
+
+    def _orjson_dumps(obj: Any) -> str:
+        # pydantic encodes its models faster than orjson with model_dump()
+        if isinstance(obj, BaseModel):
+            return pydantic_core.to_json(obj, by_alias=False).decode()
+        return _orjson_dumps_bytes(obj, default=_to_python).decode()
+
+    SERIALIZERS["orjson"] = Serializer(
+        name="orjson",
+        dumps=_orjson_dumps,
+        loads=orjson.loads,
+    )
+
+_serializer = SERIALIZERS.get("orjson", SERIALIZERS["pydantic"])
+
+
+def set_serializer(name: SerializerName) -> Serializer:
+    """
+    Select serializer by its name. "auto" selects orjson when it's installed,
+    otherwise pydantic.
+    """
+    global _serializer
+
+    if name == "auto":
+        name = "orjson" if "orjson" in SERIALIZERS else "pydantic"
+    if name not in SERIALIZERS:
+        raise ValueError(f"Serializer {name} is not available")
+
+    _serializer = SERIALIZERS[name]
+    return _serializer
+
+
+def get_serializer() -> Serializer:
+    return _serializer
+
+
+def dumps(obj: Any) -> str:
+    span = get_current_span()
+    if span is None:
+        return _serializer.dumps(obj)
+
+    start = time.perf_counter()
+    result = _serializer.dumps(obj)
+    span.serialize_seconds += time.perf_counter() - start
+    return result
+
+
+def loads(data: bytes | str) -> Any:
+    span = get_current_span()
+    if span is None:
+        return _serializer.loads(data)
+
+    start = time.perf_counter()
+    result = _serializer.loads(data)
+    span.decode_seconds += time.perf_counter() - start
+    return result
@@ -0,0 +1,43 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that have the same key into one call, whose
+    result (or exception) is shared by all of the callers.
+    The call keeps running even if some of the callers are cancelled.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        future = self._in_flight.get(key)
+        if future is None or future.get_loop() is not asyncio.get_running_loop():
+            self.calls += 1
+            future = asyncio.ensure_future(func())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._done(key, future))
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(future)
+
+    def _done(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        # the exception is retrieved here in case all of the callers are cancelled
+        if not future.cancelled():
+            future.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._in_flight),
+            "calls": self.calls,
+            "shared": self.shared,
+        }
@@ -0,0 +1,263 @@
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Hashable
+from urllib.parse import urlparse
+
+import anyio
+
+
+class Store(ABC):
+    """
+    Key-value store that keeps state which has to be shared by worker
+    processes (and nodes), e.g. OAuth state and caches.
+    Keys are grouped by namespace, and values expire after ttl seconds
+    (or never when ttl is None). Keys and values have to be JSON-serializable,
+    and tuples of them are returned as lists.
+    Methods prefixed with "a" are for coroutines, which don't block the event
+    loop while the store is accessed.
+    """
+
+    @abstractmethod
+    def get(self, namespace: str, key: Hashable, default: Any = None) -> Any: ...
+
+    @abstractmethod
+    def set(
+        self, namespace: str, key: Hashable, value: Any, ttl: float | None = None
+    ) -> None: ...
+
+    @abstractmethod
+    def delete(self, namespace: str, key: Hashable) -> None: ...
+
+    @abstractmethod
+    def invalidate(
+        self, namespace: str, predicate: Callable[[Hashable], bool] | None = None
+    ) -> int:
+        """
+        Removes entries of the namespace whose key matches the predicate (or
+        all entries when it's not specified) and returns the number of them.
+        """
+
+    async def aget(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        return await anyio.to_thread.run_sync(
+            functools.partial(self.get, namespace, key, default)
+        )
+
+    async def aset(
+        self, namespace: str, key: Hashable, value: Any, ttl: float | None = None
+    ) -> None:
+        await anyio.to_thread.run_sync(
+            functools.partial(self.set, namespace, key, value, ttl)
+        )
+
+    async def adelete(self, namespace: str, key: Hashable) -> None:
+        await anyio.to_thread.run_sync(functools.partial(self.delete, namespace, key))
+
+    async def ainvalidate(
+        self, namespace: str, predicate: Callable[[Hashable], bool] | None = None
+    ) -> int:
+        return await anyio.to_thread.run_sync(
+            functools.partial(self.invalidate, namespace, predicate)
+        )
+
+
+class MemoryStore(Store):
+    """
+    Store in the memory of the process, which is not shared with others.
+    Its methods don't block, so that coroutines call them directly.
+    """
+
+    def __init__(self):
+        self._entries: dict[tuple[str, Hashable], tuple[float | None, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return default
+            if entry[0] is not None and entry[0] < time.time():
+                del self._entries[(namespace, key)]
+                return default
+            return entry[1]
+
+    def set(
+        self, namespace: str, key: Hashable, value: Any, ttl: float | None = None
+    ) -> None:
+        with self._lock:
+            expires_at = None if ttl is None else time.time() + ttl
+            self._entries[(namespace, key)] = (expires_at, value)
+
+    def delete(self, namespace: str, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop((namespace, key), None)
+
+    def invalidate(
+        self, namespace: str, predicate: Callable[[Hashable], bool] | None = None
+    ) -> int:
+        with self._lock:
+            keys = [
+                x
+                for x in self._entries
+                if x[0] == namespace and (predicate is None or predicate(x[1]))
+            ]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    async def aget(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        return self.get(namespace, key, default)
+
+    async def aset(
+        self, namespace: str, key: Hashable, value: Any, ttl: float | None = None
+    ) -> None:
+        self.set(namespace, key, value, ttl)
+
+    async def adelete(self, namespace: str, key: Hashable) -> None:
+        self.delete(namespace, key)
+
+    async def ainvalidate(
+        self, namespace: str, predicate: Callable[[Hashable], bool] | None = None
+    ) -> int:
+        return self.invalidate(namespace, predicate)
+
+
+class SQLiteStore(Store):
+    """
+    Store in a SQLite file, which is shared by processes on the same host.
+    Keys and values are kept as JSON. The file is created to be accessible
+    only by the owner, because it contains OAuth tokens.
+    """
+
+    # Expired entries are purged once per this number of writes
+    PURGE_INTERVAL = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+        if not os.path.exists(path):
+            os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600))
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS store ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared by threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _encode_key(key: Hashable) -> str:
+        return json.dumps(key, ensure_ascii=False)
+
+    @staticmethod
+    def _decode_key(key: str) -> Hashable:
+        decoded = json.loads(key)
+        return tuple(decoded) if isinstance(decoded, list) else decoded
+
+    def get(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM store WHERE namespace = ? AND key = ?"
+                " AND (expires_at IS NULL OR expires_at >= ?)",
+                (namespace, self._encode_key(key), time.time()),
+            )
+            .fetchone()
+        )
+        return default if row is None else json.loads(row[0])
+
+    def set(
+        self, namespace: str, key: Hashable, value: Any, ttl: float | None = None
+    ) -> None:
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO store VALUES (?, ?, ?, ?)",
+            (
+                namespace,
+                self._encode_key(key),
+                json.dumps(value, ensure_ascii=False),
+                None if ttl is None else time.time() + ttl,
+            ),
+        )
+
+        with self._writes_lock:
+            self._writes += 1
+            purge = self._writes % self.PURGE_INTERVAL == 0
+        if purge:
+            conn.execute("DELETE FROM store WHERE expires_at < ?", (time.time(),))
+
+    def delete(self, namespace: str, key: Hashable) -> None:
+        self._connection().execute(
+            "DELETE FROM store WHERE namespace = ? AND key = ?",
+            (namespace, self._encode_key(key)),
+        )
+
+    def invalidate(
+        self, namespace: str, predicate: Callable[[Hashable], bool] | None = None
+    ) -> int:
+        conn = self._connection()
+        if predicate is None:
+            return conn.execute(
+                "DELETE FROM store WHERE namespace = ?", (namespace,)
+            ).rowcount
+
+        keys = [
+            (namespace, key)
+            for (key,) in conn.execute(
+                "SELECT key FROM store WHERE namespace = ?", (namespace,)
+            )
+            if predicate(self._decode_key(key))
+        ]
+        conn.executemany("DELETE FROM store WHERE namespace = ? AND key = ?", keys)
+        return len(keys)
+
+
+_shared_store: Store | None = None
+
+
+def create_store(url: str) -> Store:
+    """
+    Create a store from its URL, "memory" or "sqlite:///{path of file}".
+    """
+    if url == "memory":
+        return MemoryStore()
+
+    # the path is relative unless it starts with "/" after "sqlite:///" as
+    # the URL of SQLAlchemy (e.g. "sqlite:////var/lib/mcp-pagoda/store.db")
+    parsed = urlparse(url)
+    if parsed.scheme == "sqlite" and not parsed.netloc and parsed.path[1:]:
+        return SQLiteStore(parsed.path[1:])
+    raise ValueError(f"Unsupported store {url}")
+
+
+def configure_store(url: str) -> Store | None:
+    """
+    Set the store that is shared by worker processes. "memory" means that
+    nothing is shared and each cache is kept in its process only.
+    """
+    global _shared_store
+
+    _shared_store = None if url == "memory" else create_store(url)
+    return _shared_store
+
+
+def get_shared_store() -> Store | None:
+    return _shared_store
@@ -0,0 +1,32 @@
+from typing import Any, Literal
+
+# "rows" is a JSON array of objects, and "table" is an object of column names
+# and arrays of values, which doesn't repeat key names in each row.
+OutputFormat = Literal["rows", "table"]
+
+
+def flatten_row(row: dict, prefix: str = "") -> dict[str, Any]:
+    """
+    Returns the row whose nested objects are expanded to dotted keys,
+    e.g. {"model": {"id": 1}} to {"model.id": 1}. Lists are kept as they are.
+    """
+    flattened: dict[str, Any] = {}
+    for key, value in row.items():
+        if isinstance(value, dict) and value:
+            flattened.update(flatten_row(value, f"{prefix}{key}."))
+        else:
+            flattened[f"{prefix}{key}"] = value
+    return flattened
+
+
+def to_table(rows: list[dict]) -> dict:
+    """
+    Returns {"columns": [...], "rows": [[...], ...]} of the rows. Columns are
+    the union of dotted keys of all rows, and missing values are null.
+    """
+    flattened = [flatten_row(row) for row in rows]
+    columns = list(dict.fromkeys(key for row in flattened for key in row))
+    return {
+        "columns": columns,
+        "rows": [[row.get(column) for column in columns] for row in flattened],
+    }
@@ -0,0 +1,158 @@
+from collections import deque
+
+from mcp_server.lib.attribute import get_value_objects
+
+
+class TopologyGraph:
+    """
+    Index of router topology, whose nodes are items of the topology and whose
+    edges are references between them through their attributes.
+    Edges are undirected and labeled with the attribute name (and the name of
+    named object, e.g. a port, if any).
+    """
+
+    def __init__(self, items: list[dict]):
+        self.items: list[dict] = []
+        self.nodes: dict[int, dict] = {}
+        self.ids_by_name: dict[str, int] = {}
+        self.adjacency: dict[int, dict[int, set[str]]] = {}
+        # references of each item as (id, label), including the ones to items
+        # out of the topology, and ids of items referring to each id
+        self._references: dict[int, list[tuple[int, str]]] = {}
+        self._referrers: dict[int, set[int]] = {}
+        self._items_by_id: dict[int, dict] = {}
+        self.update(items)
+
+    @staticmethod
+    def _get_references(item: dict) -> list[tuple[int, str]]:
+        references = []
+        attrs = item.get("attrs") or []
+        if isinstance(attrs, dict):
+            attrs = [{"schema": {"name": k}, **v} for k, v in attrs.items()]
+        for attr in attrs:
+            attrname = (attr.get("schema") or {}).get("name", "")
+            for key, obj in get_value_objects(attr):
+                if obj.get("id") is not None:
+                    label = f"{attrname}:{key}" if key else attrname
+                    references.append((obj["id"], label))
+        return references
+
+    def _link(self, source: int, target: int, label: str) -> None:
+        if target not in self.nodes or target == source:
+            return
+        self.adjacency[source].setdefault(target, set()).add(label)
+        self.adjacency[target].setdefault(source, set()).add(label)
+
+    def update(self, items: list[dict]) -> int:
+        """
+        Applies items of the latest topology, and returns the number of items
+        that are added, changed or removed. Only edges of those items (and of
+        items referring to added or removed ones) are indexed again.
+        """
+        items_by_id = {item["id"]: item for item in items}
+        removed = self._items_by_id.keys() - items_by_id.keys()
+        changed = {
+            node_id
+            for node_id, item in items_by_id.items()
+            if self._items_by_id.get(node_id) != item
+        }
+        # edges from other items appear or disappear with added or removed ones
+        affected = changed | removed
+        for node_id in (changed - self._items_by_id.keys()) | removed:
+            affected |= self._referrers.get(node_id, set())
+
+        for node_id in changed | removed:
+            for target, _ in self._references.pop(node_id, []):
+                referrers = self._referrers.get(target, set())
+                referrers.discard(node_id)
+                if not referrers:
+                    self._referrers.pop(target, None)
+        for node_id in affected:
+            for neighbor in self.adjacency.pop(node_id, {}):
+                self.adjacency.get(neighbor, {}).pop(node_id, None)
+
+        self.items = items
+        self._items_by_id = items_by_id
+        self.nodes = {
+            item["id"]: {"id": item["id"], "name": item.get("name", "")}
+            for item in items
+        }
+        self.ids_by_name = {
+            node["name"]: node_id for node_id, node in self.nodes.items()
+        }
+
+        for node_id in changed:
+            self._references[node_id] = self._get_references(items_by_id[node_id])
+            for target, _ in self._references[node_id]:
+                self._referrers.setdefault(target, set()).add(node_id)
+        for node_id in affected - removed:
+            self.adjacency[node_id] = {}
+        for node_id in affected - removed:
+            for target, label in self._references[node_id]:
+                self._link(node_id, target, label)
+            for referrer in self._referrers.get(node_id, set()):
+                for target, label in self._references[referrer]:
+                    if target == node_id:
+                        self._link(referrer, node_id, label)
+
+        return len(changed | removed)
+
+    def resolve(self, router: str | int) -> int:
+        """
+        Returns the id of the router that is specified by its id or name.
+        """
+        if router in self.ids_by_name:
+            return self.ids_by_name[router]
+        if str(router).isdigit() and int(router) in self.nodes:
+            return int(router)
+        raise ValueError(f"Router {router} is not found in the topology")
+
+    def neighbors(self, node_id: int, depth: int = 1) -> dict[int, int]:
+        """
+        Returns ids of nodes within depth hops from the node, mapped to the
+        number of hops.
+        """
+        hops = {node_id: 0}
+        queue = deque([node_id])
+        while queue:
+            current = queue.popleft()
+            if hops[current] >= depth:
+                continue
+            for neighbor in self.adjacency[current]:
+                if neighbor not in hops:
+                    hops[neighbor] = hops[current] + 1
+                    queue.append(neighbor)
+        return hops
+
+    def path(self, source: int, target: int) -> list[int] | None:
+        """
+        Returns ids of nodes on one of the shortest paths, or None when the
+        nodes are not connected.
+        """
+        previous: dict[int, int | None] = {source: None}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            if current == target:
+                path = []
+                node: int | None = current
+                while node is not None:
+                    path.append(node)
+                    node = previous[node]
+                return path[::-1]
+            for neighbor in self.adjacency[current]:
+                if neighbor not in previous:
+                    previous[neighbor] = current
+                    queue.append(neighbor)
+        return None
+
+    def edges(self, node_ids: set[int]) -> list[dict]:
+        """
+        Returns edges between the nodes.
+        """
+        return [
+            {"source": source, "target": target, "labels": sorted(labels)}
+            for source in sorted(node_ids)
+            for target, labels in sorted(self.adjacency[source].items())
+            if source < target and target in node_ids
+        ]
@@ -0,0 +1,252 @@
+"""
+Load generator of MCP Pagoda, which opens concurrent MCP sessions to the SSE
+(or streamable-http) server, replays a mix of tool calls and reports latency,
+throughput and error rates of them.
+
+    $ uv run mcp-pagoda-loadtest --url http://localhost:8000/sse --token {token} \
+        --sessions 50 --duration 60 --scenario scenario.json
+    $ uv run mcp-pagoda-loadtest --transport streamable-http \
+        --url http://localhost:8000/mcp --token {token}
+
+The scenario is a JSON array of tool calls that are chosen at random
+according to their weights, e.g.
+
+    [
+      {"tool": "get_item_list", "arguments": {"model_id": 1}, "weight": 3},
+      {"tool": "get_rack_list", "arguments": {"floor_name": "1F"}, "weight": 1}
+    ]
+"""
+
+import asyncio
+import json
+import math
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Literal
+
+import click
+import httpx
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamable_http_client
+from mcp_server.lib.serializer import dumps
+
+Transport = Literal["sse", "streamable-http"]
+
+# This is used when --scenario is not specified
+DEFAULT_SCENARIO = [
+    {"tool": "get_model_list", "arguments": {}, "weight": 2},
+    {"tool": "get_item_list", "arguments": {"model_id": 1}, "weight": 2},
+    {"tool": "get_item_detail", "arguments": {"item_id": 1}, "weight": 4},
+    {
+        "tool": "advanced_search",
+        "arguments": {"entities": [1], "attrinfo": [], "limit": 100},
+        "weight": 2,
+    },
+    {"tool": "router_topology", "arguments": {}, "weight": 1},
+]
+
+
+class LoadTestResult:
+    """
+    Latencies and errors of tool calls, which are aggregated per tool.
+    """
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.session_errors: list[str] = []
+
+    def add(self, tool: str, latency: float, is_error: bool) -> None:
+        self.latencies.setdefault(tool, []).append(latency)
+        self.errors[tool] = self.errors.get(tool, 0) + int(is_error)
+
+    @staticmethod
+    def summarize(
+        tool: str, latencies: list[float], errors: int, elapsed: float
+    ) -> dict:
+        latencies = sorted(latencies)
+        return {
+            "tool": tool,
+            "calls": len(latencies),
+            "errors": errors,
+            "error_rate": errors / len(latencies) if latencies else 0.0,
+            "throughput": len(latencies) / elapsed if elapsed else 0.0,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0.0,
+        }
+
+    def report(self, elapsed: float) -> dict:
+        return {
+            "elapsed": elapsed,
+            "session_errors": self.session_errors,
+            "tools": [
+                self.summarize(tool, latencies, self.errors[tool], elapsed)
+                for tool, latencies in sorted(self.latencies.items())
+            ]
+            + [
+                self.summarize(
+                    "total",
+                    [x for latencies in self.latencies.values() for x in latencies],
+                    sum(self.errors.values()),
+                    elapsed,
+                )
+            ],
+        }
+
+
+def percentile(values: list[float], p: float) -> float:
+    """
+    Returns the p-th percentile (nearest rank) of sorted values.
+    """
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(len(values) * p / 100) - 1)]
+
+
+@asynccontextmanager
+async def open_session(
+    url: str, token: str, transport: Transport
+) -> AsyncIterator[ClientSession]:
+    headers = {"Authorization": f"Bearer {token}"}
+    if transport == "streamable-http":
+        async with httpx.AsyncClient(
+            headers=headers, timeout=httpx.Timeout(30, read=300)
+        ) as client:
+            async with streamable_http_client(url, http_client=client) as (
+                read,
+                write,
+                _,
+            ):
+                async with ClientSession(read, write) as session:
+                    yield session
+    else:
+        async with sse_client(url, headers=headers) as (read, write):
+            async with ClientSession(read, write) as session:
+                yield session
+
+
+async def run_session(
+    url: str,
+    token: str,
+    transport: Transport,
+    scenario: list[dict],
+    deadline: float,
+    think_time: float,
+    result: LoadTestResult,
+) -> None:
+    weights = [call.get("weight", 1) for call in scenario]
+    async with open_session(url, token, transport) as session:
+        await session.initialize()
+        while time.monotonic() < deadline:
+            call = random.choices(scenario, weights)[0]
+            start = time.monotonic()
+            try:
+                response = await session.call_tool(
+                    call["tool"], call.get("arguments", {})
+                )
+                is_error = response.isError
+            except Exception:
+                is_error = True
+            result.add(call["tool"], time.monotonic() - start, is_error)
+            if think_time > 0:
+                await asyncio.sleep(think_time)
+
+
+async def run_load_test(
+    url: str,
+    token: str,
+    transport: Transport,
+    scenario: list[dict],
+    sessions: int,
+    duration: float,
+    ramp_up: float,
+    think_time: float,
+) -> dict:
+    result = LoadTestResult()
+    start = time.monotonic()
+    deadline = start + ramp_up + duration
+
+    async def _run_session(index: int) -> None:
+        # sessions are opened one after another over the ramp-up period
+        await asyncio.sleep(ramp_up * index / sessions)
+        try:
+            await run_session(
+                url, token, transport, scenario, deadline, think_time, result
+            )
+        except Exception as e:
+            result.session_errors.append(f"session {index}: {e!r}")
+
+    await asyncio.gather(*[_run_session(i) for i in range(sessions)])
+    return result.report(time.monotonic() - start)
+
+
+def print_report(report: dict) -> None:
+    click.echo(
+        f"{'tool':24} {'calls':>8} {'errors':>7} {'rate':>7} {'calls/s':>9} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    )
+    for row in report["tools"]:
+        click.echo(
+            f"{row['tool']:24} {row['calls']:8} {row['errors']:7} "
+            f"{row['error_rate']:7.1%} {row['throughput']:9.1f} "
+            f"{row['p50'] * 1000:9.1f} {row['p95'] * 1000:9.1f} "
+            f"{row['p99'] * 1000:9.1f} {row['max'] * 1000:9.1f}"
+        )
+    click.echo(f"elapsed: {report['elapsed']:.1f} s")
+    for error in report["session_errors"]:
+        click.echo(f"failed to open {error}", err=True)
+
+
+@click.command()
+@click.option(
+    "--url", default="http://localhost:8000/sse", help="SSE URL of MCP server"
+)
+@click.option(
+    "--transport",
+    default="sse",
+    type=click.Choice(["sse", "streamable-http"]),
+    help="Transport protocol of MCP server (--url is http://.../mcp for streamable-http)",
+)
+@click.option("--token", "-t", required=True, help="Bearer token of Pagoda")
+@click.option("--sessions", "-n", default=10, help="Number of concurrent MCP sessions")
+@click.option("--duration", "-d", default=30.0, help="Seconds to send tool calls")
+@click.option("--ramp-up", default=0.0, help="Seconds to open all of the sessions")
+@click.option(
+    "--think-time", default=0.0, help="Seconds to wait between calls of each session"
+)
+@click.option(
+    "--scenario",
+    type=click.File("r"),
+    help="JSON file of tool calls with their arguments and weights",
+)
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+def main(
+    url: str,
+    transport: Transport,
+    token: str,
+    sessions: int,
+    duration: float,
+    ramp_up: float,
+    think_time: float,
+    scenario,
+    as_json: bool,
+) -> None:
+    calls = json.load(scenario) if scenario else DEFAULT_SCENARIO
+    report = asyncio.run(
+        run_load_test(
+            url, token, transport, calls, sessions, duration, ramp_up, think_time
+        )
+    )
+
+    if as_json:
+        click.echo(dumps(report))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,14 @@ class ModelDetailInput(BaseModel):
 class ItemList(BaseModel):
     model_id: int
     search: str = ""
+    limit: int = Field(
+        default=0,
+        description="If specified, up to this number of items are returned with next_cursor.",
+    )
+    cursor: str = Field(
+        default="",
+        description="next_cursor of the previous result to get the following items.",
+    )
 
 
 class ItemAttribute(BaseModel):
@@ -23,6 +31,16 @@ class ItemAttribute(BaseModel):
 
 class ItemDetailInput(BaseModel):
     item_id: int
+    fields: list[str] | None = Field(
+        default=None,
+        description="""Attribute names or dotted paths in them to be returned.
+e.g. ['IPアドレス', 'model.name', 'RackSpace.value.as_array_named_object']
+""",
+    )
+    flatten: bool = Field(
+        default=False,
+        description="If true, attributes are returned as attribute name to its value.",
+    )
 
 
 class SearchItem(BaseModel):
@@ -42,7 +60,7 @@ class AdvancedSearchAttrInfo(BaseModel):
         description="""
 Narrow search by keywords.
 can use pipes to perform or searches. e.g. 'hoge|fuga'
-maximum length is 249 characters, so if it have more than that, please split it up and execute it.
+maximum length is 249 characters, but longer one is split up and searched automatically.
 """,
     )
 
@@ -62,7 +80,7 @@ class AdvancedSearch(BaseModel):
         default="",
         description="""Narrow down the search by item name.
 can use pipes to perform or searches. e.g. 'hoge|fuga'
-maximum length is 249 characters, so if it have more than that, please split it up and execute it.
+maximum length is 249 characters, but longer one is split up and searched automatically.
 """,
     )
     has_referral: bool = Field(
@@ -75,3 +93,21 @@ maximum length is 249 characters, so if it have more than that, please split it
     )
     limit: int = 100
     offset: int = 0
+    fetch_all: bool = Field(
+        default=False,
+        description="If true, all matched items are returned regardless of limit and offset.",
+    )
+    fields: list[str] | None = Field(
+        default=None,
+        description="""Attribute names or dotted paths in them to be returned.
+e.g. ['IPアドレス', 'model.name', 'RackSpace.value.as_array_named_object']
+""",
+    )
+    flatten: bool = Field(
+        default=False,
+        description="If true, attributes are returned as attribute name to its value.",
+    )
+    output_format: Literal["rows", "table"] = Field(
+        default="rows",
+        description="If table, values are returned as column names and arrays of values.",
+    )
@@ -1,19 +1,32 @@
 import logging
+import os
 from typing import Literal
 
+import uvicorn
 from mcp.server.auth.provider import AccessToken, TokenVerifier
 from mcp.server.auth.settings import AuthSettings
 from mcp.server.fastmcp.server import FastMCP
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp
 
+from mcp_server.drivers.pagoda_async import MODEL_CACHE, REQUESTS_IN_FLIGHT
 from mcp_server.lib.auth.azure import get_azure_mcp_server
 from mcp_server.lib.auth.common import ServerSettings
-from mcp_server.lib.pagoda import is_token_valid
+from mcp_server.lib.http import get_pool_stats
+from mcp_server.lib.metrics import METRICS, instrument_tool
+from mcp_server.lib.pagoda import TOKEN_CACHE, is_token_valid_async
+from mcp_server.lib.relay import SSESessionRelay
+from mcp_server.lib.serializer import dumps
+from mcp_server.lib.store import get_shared_store
 from mcp_server.prompts.lb import LB_LIST
-from mcp_server.tools.common import COMMON_LIST
+from mcp_server.settings import PagodaServerSettings, configure
+from mcp_server.tools.common import COMMON_LIST, CURSORS
 from mcp_server.tools.datacenter import DC_LIST
+from mcp_server.tools.network import NETWORK_LIST
 from mcp_server.tools.router import ROUTER_LIST
 
-TOOL_LIST = COMMON_LIST + DC_LIST + ROUTER_LIST
+TOOL_LIST = COMMON_LIST + DC_LIST + NETWORK_LIST + ROUTER_LIST
 PROMPT_LIST = LB_LIST
 
 
@@ -27,7 +40,8 @@ class PagodaBearer(TokenVerifier):
 
     async def verify_token(self, token: str) -> AccessToken | None:
         # Verify the token using Pagoda's token introspection endpoint
-        if is_token_valid(self.pagoda_url_base, token):
+        # (its result is cached for a short time)
+        if await is_token_valid_async(self.pagoda_url_base, token):
             return AccessToken(
                 token=token,
                 client_id="pagoda",
@@ -35,12 +49,39 @@ class PagodaBearer(TokenVerifier):
             )
 
 
+async def metrics(request: Request) -> Response:
+    """
+    Returns histograms of tool calls and requests to Pagoda, with usage of
+    connection pools and caches. This doesn't require authorization, so that
+    it must not include the endpoint of Pagoda or anything of users.
+    """
+    return Response(
+        dumps(
+            {
+                "histograms": METRICS.snapshot(),
+                "http_pool": get_pool_stats(),
+                "caches": {
+                    "model": MODEL_CACHE.stats(),
+                    "token": TOKEN_CACHE.stats(),
+                    "cursor": CURSORS.stats(),
+                },
+                "requests_in_flight": REQUESTS_IN_FLIGHT.stats(),
+            }
+        ),
+        media_type="application/json",
+    )
+
+
 def create_mcp_server(
-    host, port, pagoda_endpoint, auth_method: Literal["bearer", "azure"]
+    host,
+    port,
+    pagoda_endpoint,
+    auth_method: Literal["bearer", "azure"],
+    stateless_http: bool = False,
 ) -> FastMCP:
     """Create a simple FastMCP server"""
     if auth_method == "azure":
-        server = get_azure_mcp_server(host, port)
+        server = get_azure_mcp_server(host, port, stateless_http)
     else:
         server_settings = ServerSettings(host=host, port=port)
 
@@ -55,36 +96,95 @@ def create_mcp_server(
                 resource_server_url=None,
             ),
             token_verifier=PagodaBearer(pagoda_url_base=pagoda_endpoint),
+            stateless_http=stateless_http,
         )
 
     for func in TOOL_LIST:
         # By using the server.tool() decorator, each tool function can be registered to the MCP server
-        server.tool()(func)
+        server.tool()(instrument_tool(func))
 
     for title, func in PROMPT_LIST:
         # By using the server.prompt() decorator, each prompt function can be registered to the MCP server
         server.prompt(title=title)(func)
 
+    server.custom_route("/metrics", methods=["GET"])(metrics)
+
     return server
 
 
-def serve(
-    host: str,
-    port: int,
-    auth_method: Literal["bearer", "azure"],
-    endpoint: str,
-    token: str,
-) -> int:
+def create_app() -> ASGIApp:
+    """
+    Factory of the ASGI application that is called in each worker process,
+    with the settings passed through environment variables (MCP_PAGODA_*).
+    """
+    settings = PagodaServerSettings()
+    configure(settings)
+
+    # initialize Pagoda instance
+    from mcp_server.tools.common import Pagoda
+
+    Pagoda.initialize(
+        endpoint=settings.endpoint,
+        token=settings.token,
+        is_bearer=(settings.auth == "bearer"),
+    )
+
+    server = create_mcp_server(
+        settings.host,
+        settings.port,
+        settings.endpoint,
+        settings.auth,
+        stateless_http=(settings.transport == "streamable-http"),
+    )
+    if settings.transport == "streamable-http":
+        # each request is independent, so that it can be handled by any worker
+        return server.streamable_http_app()
+
+    store = get_shared_store()
+    if store is None:
+        return server.sse_app()
+
+    # messages of a session may be posted to other workers than its stream
+    return SSESessionRelay(
+        server.sse_app(),
+        store,
+        sse_path=server.settings.sse_path,
+        message_path=server.settings.message_path,
+    )
+
+
+def serve(settings: PagodaServerSettings, workers: int = 1) -> int:
     """Run the simple Azure AD MCP server."""
     logging.basicConfig(level=logging.INFO)
 
+    if workers > 1:
+        # each worker process creates its application by create_app()
+        os.environ.update(settings.to_environ())
+        uvicorn.run(
+            "mcp_server.server_sse:create_app",
+            factory=True,
+            host=settings.host,
+            port=settings.port,
+            workers=workers,
+            log_level=settings.loglevel.lower(),
+        )
+        return 0
+
     # initialize Pagoda instance
     from mcp_server.tools.common import Pagoda
 
     Pagoda.initialize(
-        endpoint=endpoint, token=token, is_bearer=(auth_method == "bearer")
+        endpoint=settings.endpoint,
+        token=settings.token,
+        is_bearer=(settings.auth == "bearer"),
     )
 
-    mcp_server = create_mcp_server(host, port, endpoint, auth_method)
-    mcp_server.run(transport="sse")
+    mcp_server = create_mcp_server(
+        settings.host,
+        settings.port,
+        settings.endpoint,
+        settings.auth,
+        stateless_http=(settings.transport == "streamable-http"),
+    )
+    mcp_server.run(transport=settings.transport)
     return 0
@@ -2,12 +2,14 @@ import logging
 
 from mcp.server.fastmcp.server import FastMCP
 
+from mcp_server.lib.metrics import instrument_tool
 from mcp_server.prompts.lb import LB_LIST
 from mcp_server.tools.common import COMMON_LIST
 from mcp_server.tools.datacenter import DC_LIST
+from mcp_server.tools.network import NETWORK_LIST
 from mcp_server.tools.router import ROUTER_LIST
 
-TOOL_LIST = COMMON_LIST + DC_LIST + ROUTER_LIST
+TOOL_LIST = COMMON_LIST + DC_LIST + NETWORK_LIST + ROUTER_LIST
 PROMPT_LIST = LB_LIST
 
 TOOL_ROUTERS = dict()
@@ -21,7 +23,7 @@ def create_mcp_server() -> FastMCP:
 
     for func in TOOL_LIST:
         # By using the server.tool() decorator, each tool function can be registered to the MCP server
-        server.tool()(func)
+        server.tool()(instrument_tool(func))
 
     for title, func in PROMPT_LIST:
         # By using the server.prompt() decorator, each prompt function can be registered to the MCP server
@@ -36,7 +38,7 @@ def serve(endpoint: str, token: str) -> int:
     # initialize Pagoda instance
     from mcp_server.tools.common import Pagoda
 
-    Pagoda.initialize(endpoint=endpoint, token=token)
+    Pagoda.initialize(endpoint=endpoint, token=token, is_bearer=False)
 
     mcp_server = create_mcp_server()
     mcp_server.run(transport="stdio")
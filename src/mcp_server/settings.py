@@ -0,0 +1,63 @@
+import logging
+from typing import Literal
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from mcp_server.drivers.pagoda_async import MODEL_CACHE
+from mcp_server.lib.http import configure_http_pool
+from mcp_server.lib.log import Logger
+from mcp_server.lib.pagoda import TOKEN_CACHE
+from mcp_server.lib.serializer import SerializerName, set_serializer
+from mcp_server.lib.store import configure_store
+from mcp_server.tools.router import TOPOLOGY_CACHE
+
+
+class PagodaServerSettings(BaseSettings):
+    """
+    Settings of MCP Pagoda given by command line options, which are passed to
+    worker processes through environment variables (MCP_PAGODA_*).
+    """
+
+    model_config = SettingsConfigDict(env_prefix="MCP_PAGODA_")
+
+    endpoint: str = ""
+    token: str | None = None
+    host: str = "localhost"
+    port: int = 8000
+    transport: Literal["sse", "stdio", "streamable-http"] = "sse"
+    auth: Literal["bearer", "azure"] = "bearer"
+    loglevel: str = "INFO"
+    pool_size: int | None = None
+    http_timeout: float | None = None
+    model_cache_ttl: float | None = None
+    token_cache_ttl: float | None = None
+    topology_refresh_interval: float | None = None
+    topology_idle_timeout: float | None = None
+    serializer: SerializerName = "auto"
+    store: str = "memory"
+
+    def to_environ(self) -> dict[str, str]:
+        return {
+            f"MCP_PAGODA_{name.upper()}": str(value)
+            for name, value in self.model_dump().items()
+            if value is not None
+        }
+
+
+def configure(settings: PagodaServerSettings) -> None:
+    """
+    Apply settings to the logger, connection pool, caches, serializer and
+    shared store of this process.
+    """
+    Logger.setLevel(logging.getLevelName(settings.loglevel.upper()))
+    configure_store(settings.store)
+    configure_http_pool(
+        pool_size=settings.pool_size, read_timeout=settings.http_timeout
+    )
+    MODEL_CACHE.configure(ttl=settings.model_cache_ttl)
+    TOKEN_CACHE.configure(ttl=settings.token_cache_ttl)
+    TOPOLOGY_CACHE.configure(
+        refresh_interval=settings.topology_refresh_interval,
+        idle_timeout=settings.topology_idle_timeout,
+    )
+    set_serializer(settings.serializer)
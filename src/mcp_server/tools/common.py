@@ -1,22 +1,48 @@
-import json
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from mcp.server.fastmcp import Context
-from mcp_server.drivers.pagoda import (
+from mcp_server.drivers.pagoda import AdvancedSearchResult
+from mcp_server.drivers.pagoda_async import (
+    KEYWORD_MAX_LENGTH,
     advanced_search_api,
+    advanced_search_split_api,
     get_item_detail_api,
-    get_item_list_api,
     get_me_api,
     get_model_detail_api,
-    get_model_list_api,
     get_user_activity_api,
+    iter_item_list_api,
+    iter_model_list_api,
+    iter_pages,
+    project_advanced_search_result,
+    project_item_detail,
     restore_item_attribute_value_api,
+    restore_item_attribute_values_api,
     rollback_items_api,
+    rollback_items_bulk_api,
     search_item_api,
 )
+from mcp_server.lib.cache import token_scope
+from mcp_server.lib.cursor import CursorStore, skip_rows
+from mcp_server.lib.http import get_pool_size
 from mcp_server.lib.log import get_prefix
+from mcp_server.lib.metrics import record_rows
+from mcp_server.lib.serializer import dumps
+from mcp_server.lib.table import OutputFormat, to_table
 from mcp_server.model import AdvancedSearchAttrInfo
 
+# Number of pages that are fetched from Pagoda in parallel for list tools
+PAGE_CONCURRENCY = 8
+# Number of requests that are sent to Pagoda in parallel for batch tools,
+# which is also bounded by the size of the connection pool
+BATCH_CONCURRENCY = 16
+# Number of batches that are sent to Pagoda in parallel, and the minimum
+# interval in seconds between them, for tools that update many items
+BULK_CONCURRENCY = 4
+BULK_MIN_INTERVAL = 0.1
+
+# Results of list tools that are being read page by page with cursors
+CURSORS = CursorStore(maxsize=256, ttl=600)
+
 
 # FIXME: This refers PagodaDriver
 class Pagoda:
@@ -37,7 +63,7 @@ class Pagoda:
         return cls._instance
 
     @classmethod
-    def initialize(cls, endpoint: str, token: str, is_bearer: bool) -> "Pagoda":
+    def initialize(cls, endpoint: str, token: str | None, is_bearer: bool) -> "Pagoda":
         """エンドポイントとトークンでPagodaを初期化"""
         instance = cls.get_instance()
         instance.endpoint = endpoint
@@ -56,98 +82,233 @@ def get_backend_param(ctx: Context = None) -> tuple[str, str]:
     return pagoda_instance.endpoint, pagoda_instance.token
 
 
+async def dump_json_array(rows: AsyncIterator[dict]) -> str:
+    """
+    This serializes each row as soon as it is yielded, so that rows are not
+    accumulated as objects before serializing the whole result.
+    """
+    chunks = []
+    async for row in rows:
+        chunks.append(dumps(row))
+    record_rows(len(chunks))
+    return "[" + ",".join(chunks) + "]"
+
+
+async def dump_json_table(columns: list[str], rows: AsyncIterator[dict]) -> str:
+    """
+    This is the "table" output format of dump_json_array, whose rows are
+    arrays of values in the order of columns.
+    """
+    chunks = []
+    async for row in rows:
+        chunks.append(dumps([row[column] for column in columns]))
+    record_rows(len(chunks))
+    return '{"columns":' + dumps(columns) + ',"rows":[' + ",".join(chunks) + "]}"
+
+
+def dump_advanced_search_result(
+    result: AdvancedSearchResult | dict, output_format: OutputFormat
+) -> str:
+    record_rows(
+        len(
+            result.values
+            if isinstance(result, AdvancedSearchResult)
+            else result["values"]
+        )
+    )
+    if output_format != "table":
+        return dumps(result)
+
+    if isinstance(result, AdvancedSearchResult):
+        result = result.model_dump()
+    return dumps({"total_count": result["total_count"], **to_table(result["values"])})
+
+
 # This is a MCP tool function
-def get_model_list(search: str = "", ctx: Context = None) -> str:
-    """list all models"""
+async def get_model_list(
+    search: str = "", output_format: OutputFormat = "rows", ctx: Context = None
+) -> str:
+    """list all models. when output_format is "table", this returns column names and arrays of values instead of objects."""
     endpoint, token = get_backend_param(ctx)
 
     # access to backend service (Pagoda)
-    model_list = get_model_list_api(
+    model_list = iter_model_list_api(
         endpoint=endpoint,
         token=token,
         search=search,
         log_prefix=get_prefix(ctx),
+        concurrency=PAGE_CONCURRENCY,
     )
 
-    return json.dumps(
-        [
-            {
-                "id": model.id,
-                "name": model.name,
-                "note": model.note,
-            }
-            for model in model_list
-        ]
+    rows = (
+        {
+            "id": model.id,
+            "name": model.name,
+            "note": model.note,
+        }
+        async for model in model_list
     )
+    if output_format == "table":
+        return await dump_json_table(["id", "name", "note"], rows)
+    return await dump_json_array(rows)
 
 
-def get_model_detail(model_id: int, ctx: Context) -> str:
+async def get_model_detail(model_id: int, ctx: Context) -> str:
     """get model detail"""
     endpoint, token = get_backend_param(ctx)
 
-    model_detail = get_model_detail_api(
+    model_detail = await get_model_detail_api(
         endpoint=endpoint,
         token=token,
         model_id=model_id,
         log_prefix=get_prefix(ctx),
     )
 
-    return json.dumps(model_detail.model_dump())
+    return dumps(model_detail)
 
 
-def get_item_list(model_id: int, search: str = "", ctx: Context = None) -> str:
-    """list all items for a model"""
-    endpoint, token = get_backend_param(ctx)
-
-    item_list = get_item_list_api(
+def _iter_item_rows(
+    endpoint: str, token: str, model_id: int, search: str, ctx: Context
+) -> AsyncIterator[dict]:
+    item_list = iter_item_list_api(
         endpoint=endpoint,
         token=token,
         model_id=model_id,
         search=search,
         log_prefix=get_prefix(ctx),
+        concurrency=PAGE_CONCURRENCY,
     )
 
-    return json.dumps(
-        [
-            {
-                "id": item.id,
-                "name": item.name,
-                "schema": item.model.name,
-            }
-            for item in item_list
-        ]
+    return (
+        {
+            "id": item.id,
+            "name": item.name,
+            "schema": item.model.name,
+        }
+        async for item in item_list
     )
 
 
-def get_item_detail(item_id: int, ctx: Context) -> str:
-    """get item detail"""
+async def get_item_list(
+    model_id: int,
+    search: str = "",
+    output_format: OutputFormat = "rows",
+    limit: int = 0,
+    cursor: str = "",
+    ctx: Context = None,
+) -> str:
+    """list all items for a model. when output_format is "table", this returns column names and arrays of values instead of objects. when limit is specified, this returns up to limit items and next_cursor, and the following items are returned by calling again with the cursor (model_id and search are ignored then, and limit of the first call is used when it's not specified)."""
     endpoint, token = get_backend_param(ctx)
+    columns = ["id", "name", "schema"]
+
+    if limit > 0 or cursor:
+        scope = (endpoint, token_scope(token))
+        if cursor:
+            rows, pending, source, page_size = await CURSORS.resume(cursor, scope)
+            # the page size of the first call is kept unless it's specified
+            limit = limit if limit > 0 else page_size
+        else:
+            rows, pending = _iter_item_rows(endpoint, token, model_id, search, ctx), []
+            source = {"model_id": model_id, "search": search, "offset": 0}
+        if rows is None:
+            # the cursor was issued by another process, which is resumed by
+            # reading the items again and skipping the ones already returned
+            if source is None:
+                raise ValueError("Cursor is invalid or expired")
+            rows = skip_rows(
+                _iter_item_rows(
+                    endpoint, token, source["model_id"], source["search"], ctx
+                ),
+                source["offset"],
+            )
+
+        page, next_cursor = await CURSORS.read(rows, limit, scope, pending, source)
+        record_rows(len(page))
+        if output_format == "table":
+            page = {
+                "columns": columns,
+                "rows": [[row[column] for column in columns] for row in page],
+            }
+        return dumps({"items": page, "next_cursor": next_cursor})
+
+    rows = _iter_item_rows(endpoint, token, model_id, search, ctx)
+    if output_format == "table":
+        return await dump_json_table(columns, rows)
+    return await dump_json_array(rows)
 
-    item_detail = get_item_detail_api(
+
+async def get_item_detail(
+    item_id: int,
+    fields: list[str] | None = None,
+    flatten: bool = False,
+    ctx: Context = None,
+) -> str:
+    """get item detail. fields selects attribute names or dotted paths (e.g. "model.name") to be returned. when flatten is true, attributes are returned as name to value."""
+    endpoint, token = get_backend_param(ctx)
+
+    item_detail = await get_item_detail_api(
         endpoint=endpoint,
         token=token,
         item_id=item_id,
         log_prefix=get_prefix(ctx),
     )
 
-    return json.dumps(item_detail.model_dump())
+    return dumps(project_item_detail(item_detail, fields, flatten))
 
 
-def search_item(query: str, ctx: Context) -> str:
+async def get_item_details(
+    item_ids: list[int],
+    fields: list[str] | None = None,
+    flatten: bool = False,
+    ctx: Context = None,
+) -> str:
+    """get details of many items at once. this returns details of found items and errors of the others. fields and flatten work as the ones of get_item_detail."""
+    endpoint, token = get_backend_param(ctx)
+    item_ids = list(dict.fromkeys(item_ids))
+
+    async def _get_item_detail(index: int) -> dict:
+        try:
+            item_detail = await get_item_detail_api(
+                endpoint=endpoint,
+                token=token,
+                item_id=item_ids[index],
+                log_prefix=get_prefix(ctx),
+            )
+            return {"item": project_item_detail(item_detail, fields, flatten)}
+        except Exception as e:
+            return {"error": {"item_id": item_ids[index], "error": str(e)}}
+
+    items = []
+    errors = []
+    async for result in iter_pages(
+        _get_item_detail,
+        range(len(item_ids)),
+        min(BATCH_CONCURRENCY, get_pool_size()),
+    ):
+        if "item" in result:
+            items.append(result["item"])
+        else:
+            errors.append(result["error"])
+
+    record_rows(len(items))
+    return dumps({"items": items, "errors": errors})
+
+
+async def search_item(query: str, ctx: Context) -> str:
     """search items by partial match of the item name"""
     endpoint, token = get_backend_param(ctx)
 
-    item_list = search_item_api(
+    item_list = await search_item_api(
         endpoint=endpoint,
         token=token,
         query=query,
         log_prefix=get_prefix(ctx),
     )
 
-    return json.dumps([item.model_dump() for item in item_list])
+    return dumps(item_list)
 
 
-def advanced_search(
+async def advanced_search(
     entities: list,
     attrinfo: list,
     item_filter_key: int = 0,
@@ -156,16 +317,47 @@ def advanced_search(
     referral_name: str = "",
     limit: int = 100,
     offset: int = 0,
+    fetch_all: bool = False,
+    fields: list[str] | None = None,
+    flatten: bool = False,
+    output_format: OutputFormat = "rows",
     ctx: Context = None,
 ) -> str:
-    """advanced search for items"""
+    """advanced search for items. when fetch_all is true, all matched items are returned regardless of limit and offset. keywords longer than 249 characters are split up and searched automatically, and then limit and offset are applied to all matched items (total_count is the number of them). fields selects attribute names or dotted paths to be returned, and flatten returns attributes as name to value. when output_format is "table", values are returned as column names (dotted paths) and arrays of values."""
     endpoint, token = get_backend_param(ctx)
+    attrinfos = [AdvancedSearchAttrInfo(**info) for info in attrinfo]
+    if not fetch_all and limit < 1:
+        raise ValueError("limit must be 1 or more")
+    if not fetch_all and offset < 0:
+        raise ValueError("offset must be 0 or more")
+
+    if fetch_all or any(
+        len(keyword) > KEYWORD_MAX_LENGTH
+        for keyword in [item_keyword] + [info.keyword for info in attrinfos]
+    ):
+        result = await advanced_search_split_api(
+            endpoint=endpoint,
+            token=token,
+            entities=entities,
+            attrinfos=attrinfos,
+            item_filter_key=item_filter_key,
+            item_keyword=item_keyword,
+            has_referral=has_referral,
+            referral_name=referral_name,
+            log_prefix=get_prefix(ctx),
+            concurrency=PAGE_CONCURRENCY,
+        )
+        if not fetch_all:
+            result.values = result.values[offset : offset + limit]
+        return dump_advanced_search_result(
+            project_advanced_search_result(result, fields, flatten), output_format
+        )
 
-    result = advanced_search_api(
+    result = await advanced_search_api(
         endpoint=endpoint,
         token=token,
         entities=entities,
-        attrinfos=[AdvancedSearchAttrInfo(**info) for info in attrinfo],
+        attrinfos=attrinfos,
         item_filter_key=item_filter_key,
         item_keyword=item_keyword,
         has_referral=has_referral,
@@ -174,10 +366,12 @@ def advanced_search(
         offset=offset,
         log_prefix=get_prefix(ctx),
     )
-    return json.dumps(result.model_dump())
+    return dump_advanced_search_result(
+        project_advanced_search_result(result, fields, flatten), output_format
+    )
 
 
-def get_user_activity(
+async def get_user_activity(
     user_id: int,
     since: str = "",
     to: str = "",
@@ -187,7 +381,7 @@ def get_user_activity(
     """get activity history for a user. since and to are ISO 8601 datetime strings that define the start and end of the time range. within_minutes limits results to activities within that many minutes of since."""
     endpoint, token = get_backend_param(ctx)
 
-    result = get_user_activity_api(
+    result = await get_user_activity_api(
         endpoint=endpoint,
         token=token,
         user_id=user_id,
@@ -196,49 +390,105 @@ def get_user_activity(
         within_minutes=within_minutes or None,
     )
 
-    return json.dumps(result)
+    return dumps(result)
 
 
-def get_me(ctx: Context = None) -> str:
+async def get_me(ctx: Context = None) -> str:
     """get the current authenticated user's profile"""
     endpoint, token = get_backend_param(ctx)
 
-    user = get_me_api(
+    user = await get_me_api(
         endpoint=endpoint,
         token=token,
         log_prefix=get_prefix(ctx),
     )
 
-    return json.dumps(user.model_dump())
+    return dumps(user)
 
 
-def restore_item_attribute_value(attribute_value_id: int, ctx: Context) -> str:
+async def restore_item_attribute_value(attribute_value_id: int, ctx: Context) -> str:
     """restore an attribute value to its previous state by attribute value ID"""
     endpoint, token = get_backend_param(ctx)
 
-    result = restore_item_attribute_value_api(
+    result = await restore_item_attribute_value_api(
         endpoint=endpoint,
         token=token,
         attribute_value_id=attribute_value_id,
         log_prefix=get_prefix(ctx),
     )
 
-    return json.dumps(result)
+    return dumps(result)
 
 
-def rollback_items(targets: list[int], at: str, ctx: Context = None) -> str:
+async def rollback_items(targets: list[int], at: str, ctx: Context = None) -> str:
     """roll back items to their configuration state at the specified datetime. targets is a list of item IDs. at is an ISO 8601 datetime string."""
     endpoint, token = get_backend_param(ctx)
 
-    result = rollback_items_api(
+    result = await rollback_items_api(
+        endpoint=endpoint,
+        token=token,
+        targets=targets,
+        at=at,
+        log_prefix=get_prefix(ctx),
+    )
+
+    return dumps(result)
+
+
+def _bulk_summary(results: dict[int, str | None]) -> dict:
+    return {
+        "succeeded": [x for x, error in results.items() if error is None],
+        "failed": [
+            {"id": x, "error": error}
+            for x, error in results.items()
+            if error is not None
+        ],
+    }
+
+
+async def restore_item_attribute_values(
+    attribute_value_ids: list[int], batch_size: int = 10, ctx: Context = None
+) -> str:
+    """restore many attribute values to their previous state at once. this returns succeeded IDs and failed IDs with their errors."""
+    if batch_size < 1:
+        raise ValueError("batch_size must be 1 or more")
+    endpoint, token = get_backend_param(ctx)
+
+    results = await restore_item_attribute_values_api(
+        endpoint=endpoint,
+        token=token,
+        attribute_value_ids=attribute_value_ids,
+        batch_size=batch_size,
+        concurrency=BULK_CONCURRENCY,
+        min_interval=BULK_MIN_INTERVAL,
+        on_progress=ctx.report_progress,
+        log_prefix=get_prefix(ctx),
+    )
+
+    return dumps(_bulk_summary(results))
+
+
+async def rollback_items_bulk(
+    targets: list[int], at: str, batch_size: int = 100, ctx: Context = None
+) -> str:
+    """roll back many items to their configuration state at the specified datetime, batch_size items per request. targets is a list of item IDs. at is an ISO 8601 datetime string. this returns succeeded IDs and failed IDs with their errors."""
+    if batch_size < 1:
+        raise ValueError("batch_size must be 1 or more")
+    endpoint, token = get_backend_param(ctx)
+
+    results = await rollback_items_bulk_api(
         endpoint=endpoint,
         token=token,
         targets=targets,
         at=at,
+        batch_size=batch_size,
+        concurrency=BULK_CONCURRENCY,
+        min_interval=BULK_MIN_INTERVAL,
+        on_progress=ctx.report_progress,
         log_prefix=get_prefix(ctx),
     )
 
-    return json.dumps(result)
+    return dumps(_bulk_summary(results))
 
 
 COMMON_LIST = [
@@ -247,9 +497,12 @@ COMMON_LIST = [
     get_model_detail,
     get_item_list,
     get_item_detail,
+    get_item_details,
     search_item,
     advanced_search,
     get_user_activity,
     restore_item_attribute_value,
+    restore_item_attribute_values,
     rollback_items,
+    rollback_items_bulk,
 ]
@@ -1,25 +1,50 @@
-import json
-
 from mcp.server.fastmcp import Context
-from mcp_server.drivers.pagoda import advanced_search_api, get_model_id
+from mcp_server.drivers.pagoda import AdvancedSearchResult, AdvancedSearchResultItem
+from mcp_server.drivers.pagoda_async import (
+    advanced_search_all_api,
+    get_model_id,
+    iter_pages,
+)
 from mcp_server.lib.log import get_prefix
+from mcp_server.lib.serializer import dumps
 from mcp_server.model import AdvancedSearchAttrInfo
-from mcp_server.tools.common import get_backend_param
+from mcp_server.tools.common import PAGE_CONCURRENCY, get_backend_param
 
 ATTRNAME_UNIT = "ユニット数"
 
 
-def get_rack_list(floor_name: str, ctx: Context) -> str:
-    """list all racks"""
-    endpoint, token = get_backend_param(ctx)
+def build_rack_space(units: list[dict], unit_count: int) -> dict[str, list[str]]:
+    """
+    This makes names of appliances for each unit number (from 1 to unit_count)
+    from RackSpace attribute value in a single pass of its entries.
+    """
+    rack_space = {str(unit_number): [] for unit_number in range(1, unit_count + 1)}
+    for unit in units:
+        appliances = rack_space.get(unit["name"])
+        if appliances is not None:
+            appliances.append(unit["object"]["name"])
+
+    return rack_space
 
-    rack_model_id = get_model_id(
+
+async def _search_racks(
+    endpoint: str,
+    token: str,
+    floor_name: str,
+    log_prefix: str,
+    concurrency: int,
+) -> AdvancedSearchResult:
+    """
+    This retrieves all racks whose floor contains floor_name (or all racks
+    when it's empty) with their unit count, RackSpace and floor.
+    """
+    rack_model_id = await get_model_id(
         endpoint=endpoint,
         token=token,
         search="ラック",
     )
 
-    row_results = advanced_search_api(
+    return await advanced_search_all_api(
         endpoint=endpoint,
         token=token,
         entities=[rack_model_id],
@@ -28,37 +53,108 @@ def get_rack_list(floor_name: str, ctx: Context) -> str:
             AdvancedSearchAttrInfo(name="RackSpace"),
             AdvancedSearchAttrInfo(
                 name="フロア",
-                filter_key=3,
+                filter_key=3 if floor_name else 0,
                 keyword=floor_name,
             ),
         ],
+        log_prefix=log_prefix,
+        concurrency=concurrency,
+    )
+
+
+def _get_unit_count(row_result: AdvancedSearchResultItem) -> int:
+    try:
+        return int(row_result.attrs[ATTRNAME_UNIT]["value"]["as_string"])
+    except (KeyError, ValueError):
+        return 0
+
+
+def _get_floor_name(row_result: AdvancedSearchResultItem) -> str:
+    if row_result.attrs["フロア"]["value"]["as_object"] != {}:
+        return row_result.attrs["フロア"]["value"]["as_object"]["name"]
+    return ""
+
+
+async def get_rack_list(floor_name: str, ctx: Context) -> str:
+    """list all racks"""
+    endpoint, token = get_backend_param(ctx)
+
+    row_results = await _search_racks(
+        endpoint=endpoint,
+        token=token,
+        floor_name=floor_name,
         log_prefix=get_prefix(ctx),
+        concurrency=PAGE_CONCURRENCY,
     )
 
     results = []
     for row_result in row_results.values:
-        try:
-            unit_count = int(row_result.attrs[ATTRNAME_UNIT]["value"]["as_string"])
-        except (KeyError, ValueError):
-            unit_count = 0
+        unit_count = _get_unit_count(row_result)
         result = {
             "name": row_result.entry.name,
             ATTRNAME_UNIT: unit_count,
-            "フロア": "",
-            "RackSpace": {},
+            "フロア": _get_floor_name(row_result),
+            "RackSpace": build_rack_space(
+                row_result.attrs["RackSpace"]["value"]["as_array_named_object"],
+                unit_count,
+            ),
         }
-        if row_result.attrs["フロア"]["value"]["as_object"] != {}:
-            result["フロア"] = row_result.attrs["フロア"]["value"]["as_object"]["name"]
-
-        for unit_number in range(1, unit_count + 1):
-            rack_space = []
-            for unit in row_result.attrs["RackSpace"]["value"]["as_array_named_object"]:
-                if unit["name"] == str(unit_number):
-                    rack_space.append(unit["object"]["name"])
-            result["RackSpace"][str(unit_number)] = rack_space
         results.append(result)
 
-    return json.dumps({"rack_list": results})
+    return dumps({"rack_list": results})
+
+
+async def get_rack_inventory(
+    floor_names: list[str] | None = None, ctx: Context = None
+) -> str:
+    """list racks of many floors (or all floors when floor_names is not specified) in compact columnar format. floor names have to match exactly. each row has rack name, floor, unit count and the number of occupied units."""
+    endpoint, token = get_backend_param(ctx)
+    floor_names = list(dict.fromkeys(floor_names or [""]))
+
+    async def _search(index: int) -> AdvancedSearchResult:
+        result = await _search_racks(
+            endpoint=endpoint,
+            token=token,
+            floor_name=floor_names[index],
+            log_prefix=get_prefix(ctx),
+            # Share concurrency between floors and pages of each floor
+            concurrency=max(1, PAGE_CONCURRENCY // len(floor_names)),
+        )
+        # The search matches floors partially (e.g. "1F" matches "11F" too)
+        if floor_names[index]:
+            result.values = [
+                row_result
+                for row_result in result.values
+                if _get_floor_name(row_result) == floor_names[index]
+            ]
+        return result
+
+    rows = {}
+    async for row_results in iter_pages(
+        _search, range(len(floor_names)), PAGE_CONCURRENCY
+    ):
+        for row_result in row_results.values:
+            if row_result.entry.id in rows:
+                continue
+
+            unit_count = _get_unit_count(row_result)
+            rack_space = build_rack_space(
+                row_result.attrs["RackSpace"]["value"]["as_array_named_object"],
+                unit_count,
+            )
+            rows[row_result.entry.id] = [
+                row_result.entry.name,
+                _get_floor_name(row_result),
+                unit_count,
+                sum(1 for appliances in rack_space.values() if appliances),
+            ]
+
+    return dumps(
+        {
+            "columns": ["name", "フロア", ATTRNAME_UNIT, "occupied_units"],
+            "rows": sorted(rows.values(), key=lambda row: (row[1], row[0])),
+        }
+    )
 
 
-DC_LIST = [get_rack_list]
+DC_LIST = [get_rack_list, get_rack_inventory]
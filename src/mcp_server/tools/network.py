@@ -0,0 +1,188 @@
+import asyncio
+
+from mcp.server.fastmcp import Context
+from mcp_server.drivers.pagoda import AdvancedSearchResult
+from mcp_server.drivers.pagoda_async import advanced_search_split_api, get_model_id
+from mcp_server.lib.attribute import get_value_names
+from mcp_server.lib.log import get_prefix
+from mcp_server.lib.serializer import dumps
+from mcp_server.model import AdvancedSearchAttrInfo
+from mcp_server.tools.common import PAGE_CONCURRENCY, get_backend_param
+
+MODEL_IPADDRESS = "IPAddress"
+MODEL_LB_VIRTUAL_SERVER = "LBVirtualServer"
+MODEL_LB_SERVICE_GROUP = "LBServiceGroup"
+MODEL_LB_SERVER = "LBServer"
+MODEL_VM = "tsuchinoko-vm"
+
+ATTRNAME_NETWORK = "Network"
+ATTRNAME_IPADDRESS = "IPアドレス"
+ATTRNAME_LB_SERVICE_GROUP = "LBServiceGroup"
+ATTRNAME_LB_SERVER = "LBServer"
+ATTRNAME_CATEGORY = "大分類"
+
+# filter_key of AdvancedSearchAttrInfo
+ATTR_FILTER_NON_EMPTY = 2
+ATTR_FILTER_TEXT_CONTAINED = 3
+# item_filter_key of AdvancedSearch
+ITEM_FILTER_TEXT_CONTAINED = 1
+
+
+async def find_vm_from_network(network: str, ctx: Context) -> str:
+    """list VMs that belong to the specified global network (e.g. 1.12.123.0/24) through load balancers. this returns rows of global IP, LBVirtualServer, LBServiceGroup, LBServer, private IP, tsuchinoko-vm and its category."""
+    endpoint, token = get_backend_param(ctx)
+    log_prefix = get_prefix(ctx)
+
+    model_names = [
+        MODEL_IPADDRESS,
+        MODEL_LB_VIRTUAL_SERVER,
+        MODEL_LB_SERVICE_GROUP,
+        MODEL_LB_SERVER,
+        MODEL_VM,
+    ]
+    model_ids = dict(
+        zip(
+            model_names,
+            await asyncio.gather(
+                *[
+                    get_model_id(endpoint=endpoint, token=token, search=name)
+                    for name in model_names
+                ]
+            ),
+        )
+    )
+
+    async def _search(
+        model_name: str,
+        attrinfos: list[AdvancedSearchAttrInfo],
+        item_keyword: str = "",
+    ) -> AdvancedSearchResult:
+        return await advanced_search_split_api(
+            endpoint=endpoint,
+            token=token,
+            entities=[model_ids[model_name]],
+            attrinfos=attrinfos,
+            item_filter_key=ITEM_FILTER_TEXT_CONTAINED if item_keyword else 0,
+            item_keyword=item_keyword,
+            log_prefix=log_prefix,
+            concurrency=PAGE_CONCURRENCY,
+        )
+
+    # Each search narrows down items by (partial match of) names found in the
+    # previous one, then its results are joined by exact match of names.
+    ip_results = await _search(
+        MODEL_IPADDRESS,
+        [
+            AdvancedSearchAttrInfo(
+                name=ATTRNAME_NETWORK,
+                filter_key=ATTR_FILTER_TEXT_CONTAINED,
+                keyword=network,
+            )
+        ],
+    )
+    global_ips = {value.entry.name for value in ip_results.values}
+    if not global_ips:
+        return dumps({"rows": []})
+
+    vs_results = await _search(
+        MODEL_LB_VIRTUAL_SERVER,
+        [
+            AdvancedSearchAttrInfo(
+                name=ATTRNAME_LB_SERVICE_GROUP, filter_key=ATTR_FILTER_NON_EMPTY
+            ),
+            AdvancedSearchAttrInfo(
+                name=ATTRNAME_IPADDRESS,
+                filter_key=ATTR_FILTER_TEXT_CONTAINED,
+                keyword="|".join(sorted(global_ips)),
+            ),
+        ],
+    )
+    # (global IP, LBVirtualServer, LBServiceGroup)
+    vs_rows = [
+        (ip, value.entry.name, service_group)
+        for value in vs_results.values
+        for ip in get_value_names(value.attrs.get(ATTRNAME_IPADDRESS))
+        if ip in global_ips
+        for service_group in get_value_names(value.attrs.get(ATTRNAME_LB_SERVICE_GROUP))
+    ]
+
+    servers_by_service_group: dict[str, list[str]] = {}
+    service_groups = {row[2] for row in vs_rows}
+    if service_groups:
+        sg_results = await _search(
+            MODEL_LB_SERVICE_GROUP,
+            [
+                AdvancedSearchAttrInfo(
+                    name=ATTRNAME_LB_SERVER, filter_key=ATTR_FILTER_NON_EMPTY
+                )
+            ],
+            item_keyword="|".join(sorted(service_groups)),
+        )
+        for value in sg_results.values:
+            if value.entry.name in service_groups:
+                servers_by_service_group[value.entry.name] = get_value_names(
+                    value.attrs.get(ATTRNAME_LB_SERVER)
+                )
+
+    ips_by_server: dict[str, list[str]] = {}
+    servers = {x for names in servers_by_service_group.values() for x in names}
+    if servers:
+        server_results = await _search(
+            MODEL_LB_SERVER,
+            [
+                AdvancedSearchAttrInfo(
+                    name=ATTRNAME_IPADDRESS, filter_key=ATTR_FILTER_NON_EMPTY
+                )
+            ],
+            item_keyword="|".join(sorted(servers)),
+        )
+        for value in server_results.values:
+            if value.entry.name in servers:
+                ips_by_server[value.entry.name] = get_value_names(
+                    value.attrs.get(ATTRNAME_IPADDRESS)
+                )
+
+    vms_by_ip: dict[str, list[tuple[str, str]]] = {}
+    private_ips = {x for names in ips_by_server.values() for x in names}
+    if private_ips:
+        vm_results = await _search(
+            MODEL_VM,
+            [
+                AdvancedSearchAttrInfo(
+                    name=ATTRNAME_CATEGORY, filter_key=ATTR_FILTER_NON_EMPTY
+                ),
+                AdvancedSearchAttrInfo(
+                    name=ATTRNAME_IPADDRESS,
+                    filter_key=ATTR_FILTER_TEXT_CONTAINED,
+                    keyword="|".join(sorted(private_ips)),
+                ),
+            ],
+        )
+        for value in vm_results.values:
+            category = ", ".join(get_value_names(value.attrs.get(ATTRNAME_CATEGORY)))
+            for ip in get_value_names(value.attrs.get(ATTRNAME_IPADDRESS)):
+                if ip in private_ips:
+                    vms_by_ip.setdefault(ip, []).append((value.entry.name, category))
+
+    # Rows are kept even if the chain is broken on the way (like LEFT JOIN)
+    rows = []
+    for global_ip, virtual_server, service_group in vs_rows:
+        for server in servers_by_service_group.get(service_group) or [""]:
+            for private_ip in ips_by_server.get(server) or [""]:
+                for vm, category in vms_by_ip.get(private_ip) or [("", "")]:
+                    rows.append(
+                        {
+                            "グローバルIP": global_ip,
+                            "LBVirtualServer": virtual_server,
+                            "LBServiceGroup": service_group,
+                            "LBServer": server,
+                            "プライベートIP": private_ip,
+                            "tsuchinoko-vm": vm,
+                            "大分類": category,
+                        }
+                    )
+
+    return dumps({"rows": rows})
+
+
+NETWORK_LIST = [find_vm_from_network]
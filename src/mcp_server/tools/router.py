@@ -1,24 +1,182 @@
-import json
+import asyncio
+import math
+import time
 
 from mcp.server.fastmcp import Context
-from mcp_server.drivers.pagoda import get_router_topology
-from mcp_server.lib.log import get_prefix
+from mcp_server.drivers.pagoda_async import get_router_topology
+from mcp_server.lib.cache import token_scope
+from mcp_server.lib.log import Logger, get_prefix
+from mcp_server.lib.serializer import dumps
+from mcp_server.lib.singleflight import SingleFlight
+from mcp_server.lib.topology import TopologyGraph
 from mcp_server.tools.common import get_backend_param
 
 
-def router_topology(ctx: Context) -> str:
-    """Get router topology"""
+class TopologyCache:
+    """
+    Router topology that is indexed as TopologyGraph per endpoint and token.
+    Once it's fetched, it's refreshed in the background every refresh_interval
+    seconds (0 disables refreshing), where only changed items are indexed
+    again. It's dropped with the task refreshing it, which keeps the token,
+    as soon as it's not used for idle_timeout seconds.
+    """
+
+    def __init__(self, refresh_interval: float = 300, idle_timeout: float = 1800):
+        self.refresh_interval = refresh_interval
+        self.idle_timeout = idle_timeout
+        # (endpoint, token scope) => [graph, last used time, refresh task]
+        self._entries: dict[tuple[str, str], list] = {}
+        self._fetches = SingleFlight()
+
+    def configure(
+        self, refresh_interval: float | None = None, idle_timeout: float | None = None
+    ) -> None:
+        if refresh_interval is not None:
+            self.refresh_interval = refresh_interval
+        if idle_timeout is not None:
+            self.idle_timeout = idle_timeout
+        self.clear()
+
+    async def _fetch(self, endpoint: str, token: str, log_prefix: str) -> TopologyGraph:
+        items = await get_router_topology(
+            endpoint=endpoint, token=token, log_prefix=log_prefix
+        )
+        return TopologyGraph(items)
+
+    async def _refresh(self, key: tuple[str, str], token: str) -> None:
+        next_refresh = (
+            time.monotonic() + self.refresh_interval
+            if self.refresh_interval > 0
+            else math.inf
+        )
+        while True:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            # wake up at the next refresh, or when it gets idle
+            idle_at = entry[1] + self.idle_timeout
+            await asyncio.sleep(max(0, min(next_refresh, idle_at) - time.monotonic()))
+
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            now = time.monotonic()
+            if now - entry[1] >= self.idle_timeout:
+                del self._entries[key]
+                return
+            if now < next_refresh:
+                continue
+
+            next_refresh = now + self.refresh_interval
+            try:
+                items = await get_router_topology(endpoint=key[0], token=token)
+                changed = entry[0].update(items)
+                Logger.debug(f"Refreshed router topology: {changed} items changed")
+            except Exception as e:
+                # the previous topology is used until it's refreshed successfully
+                Logger.warning(f"Failed to refresh router topology: {e}")
+
+    async def get(
+        self, endpoint: str, token: str, log_prefix: str = ""
+    ) -> TopologyGraph:
+        key = (endpoint, token_scope(token))
+        entry = self._entries.get(key)
+        if entry is None:
+            graph = await self._fetches.do(
+                key, lambda: self._fetch(endpoint, token, log_prefix)
+            )
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = [graph, time.monotonic(), None]
+                self._entries[key] = entry
+                entry[2] = asyncio.create_task(self._refresh(key, token))
+
+        entry[1] = time.monotonic()
+        return entry[0]
+
+    def clear(self) -> None:
+        for entry in self._entries.values():
+            if entry[2] is not None:
+                entry[2].cancel()
+        self._entries.clear()
+
+
+TOPOLOGY_CACHE = TopologyCache()
+
+
+async def _get_topology(ctx: Context) -> TopologyGraph:
     endpoint, token = get_backend_param(ctx)
+    return await TOPOLOGY_CACHE.get(endpoint, token, get_prefix(ctx))
 
-    topology = get_router_topology(
-        endpoint=endpoint,
-        token=token,
-        log_prefix=get_prefix(ctx),
+
+async def router_topology(ctx: Context) -> str:
+    """Get router topology"""
+    topology = await _get_topology(ctx)
+
+    return dumps(topology.items)
+
+
+async def router_neighbors(router: str, depth: int = 1, ctx: Context = None) -> str:
+    """get routers within depth hops from the specified router (ID or name) in the router topology, with links between them"""
+    topology = await _get_topology(ctx)
+    node_id = topology.resolve(router)
+    hops = topology.neighbors(node_id, depth)
+
+    return dumps(
+        {
+            "router": topology.nodes[node_id],
+            "neighbors": [
+                {**topology.nodes[neighbor], "hops": hop}
+                for neighbor, hop in hops.items()
+                if hop > 0
+            ],
+            "links": topology.edges(set(hops)),
+        }
     )
 
-    return json.dumps(topology)
+
+async def router_path(source: str, target: str, ctx: Context = None) -> str:
+    """get the shortest path between two routers (ID or name) in the router topology. path is null when they are not connected."""
+    topology = await _get_topology(ctx)
+    path = topology.path(topology.resolve(source), topology.resolve(target))
+    if path is None:
+        return dumps({"path": None, "links": []})
+
+    return dumps(
+        {
+            "path": [topology.nodes[node_id] for node_id in path],
+            "links": [
+                {
+                    "source": source_id,
+                    "target": target_id,
+                    "labels": sorted(topology.adjacency[source_id][target_id]),
+                }
+                for source_id, target_id in zip(path, path[1:])
+            ],
+        }
+    )
+
+
+async def router_subgraph(
+    routers: list[str], depth: int = 0, ctx: Context = None
+) -> str:
+    """get the part of the router topology that consists of the specified routers (ID or name) and routers within depth hops from them"""
+    topology = await _get_topology(ctx)
+    node_ids: set[int] = set()
+    for router in routers:
+        node_ids.update(topology.neighbors(topology.resolve(router), depth))
+
+    return dumps(
+        {
+            "routers": [topology.nodes[node_id] for node_id in sorted(node_ids)],
+            "links": topology.edges(node_ids),
+        }
+    )
 
 
 ROUTER_LIST = [
     router_topology,
+    router_neighbors,
+    router_path,
+    router_subgraph,
 ]
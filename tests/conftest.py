@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from mcp_server.drivers import pagoda_async
+from mcp_server.lib.store import configure_store
+from mcp_server.tools import common, datacenter, network
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class FakePagoda:
+    """
+    Stand-in of Pagoda for the driver, which returns the response registered
+    for the path of each request (or 404) and records the requests.
+    """
+
+    def __init__(self):
+        self.responses: dict[str, object] = {}
+        self.requests: list[httpx.Request] = []
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        response = self.responses.get(request.url.path)
+        if callable(response):
+            response = response(request)
+        if response is None:
+            return httpx.Response(404, json={"detail": "Not found."})
+        if isinstance(response, httpx.Response):
+            return response
+        return httpx.Response(200, content=json.dumps(response).encode())
+
+    def paths(self) -> list[str]:
+        return [request.url.path for request in self.requests]
+
+
+@pytest.fixture
+def pagoda(monkeypatch):
+    fake = FakePagoda()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handle))
+    monkeypatch.setattr(pagoda_async, "get_async_client", lambda url: client)
+    pagoda_async.MODEL_CACHE.invalidate()
+    yield fake
+    pagoda_async.MODEL_CACHE.invalidate()
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Tools are called without the context of MCP, with this endpoint and token"""
+    for module in [common, datacenter, network]:
+        monkeypatch.setattr(
+            module, "get_backend_param", lambda ctx: ("http://pagoda", "token")
+        )
+        monkeypatch.setattr(module, "get_prefix", lambda ctx: "")
+    return "http://pagoda", "token"
+
+
+@pytest.fixture
+def shared_store(tmp_path):
+    """SQLite store shared as if by worker processes, which is reset after the test"""
+    store = configure_store(f"sqlite:///{tmp_path}/store.db")
+    yield store
+    configure_store("memory")
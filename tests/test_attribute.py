@@ -0,0 +1,96 @@
+import pytest
+
+from mcp_server.lib.attribute import (
+    flatten_value,
+    get_path,
+    project,
+)
+
+ROW = {"id": 1, "name": "server1", "model": {"id": 2, "name": "Server"}}
+
+
+def attr(**value) -> dict:
+    return {"type": 0, "value": value}
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (attr(as_string="10.0.0.1"), "10.0.0.1"),
+        (attr(as_number=0), 0),
+        (attr(as_boolean=False), False),
+        (attr(as_object={"id": 3, "name": "rack1"}), "rack1"),
+        (attr(as_object={}), None),
+        (
+            attr(as_named_object={"name": "U1", "object": {"id": 3, "name": "rack1"}}),
+            {"U1": "rack1"},
+        ),
+        (attr(as_array_string=["a", "b"]), ["a", "b"]),
+        (
+            attr(as_array_object=[{"id": 3, "name": "x"}, {"id": 4, "name": "y"}]),
+            ["x", "y"],
+        ),
+        (
+            attr(
+                as_array_named_object=[
+                    {"name": "1", "object": {"id": 3, "name": "x"}},
+                    {"name": "2", "object": None},
+                ]
+            ),
+            [{"1": "x"}, {"2": None}],
+        ),
+        # empty value of another type is contained together
+        (attr(as_string="", as_array_object=[{"id": 3, "name": "x"}]), ["x"]),
+        (attr(as_string="", as_array_object=[]), ""),
+        (attr(), None),
+        (None, None),
+    ],
+)
+def test_flatten_value(value, expected):
+    assert flatten_value(value) == expected
+
+
+def test_get_path():
+    obj = {"a": {"b": [{"c": 1}, {"c": 2}]}}
+
+    assert get_path(obj, ["a", "b", "1", "c"]) == 2
+    assert get_path(obj, ["a", "b", "2", "c"]) is None
+    assert get_path(obj, ["a", "x"]) is None
+    assert get_path(obj, []) == obj
+
+
+def test_project_returns_everything_without_fields():
+    attrs = {"IP": attr(as_string="10.0.0.1")}
+
+    assert project(ROW, attrs, None, False) == {**ROW, "attrs": attrs}
+    assert project(ROW, attrs, None, True) == {**ROW, "attrs": {"IP": "10.0.0.1"}}
+
+
+def test_project_selects_attributes_and_properties():
+    attrs = {
+        "IP": attr(as_string="10.0.0.1"),
+        "rack": attr(as_object={"id": 3, "name": "rack1"}),
+        "note": attr(as_string="unused"),
+    }
+
+    assert project(ROW, attrs, ["IP.value.as_string", "rack", "model.name"], False) == {
+        "id": 1,
+        "name": "server1",
+        "model.name": "Server",
+        "attrs": {
+            "IP.value.as_string": "10.0.0.1",
+            "rack": attr(as_object={"id": 3, "name": "rack1"}),
+        },
+    }
+    assert project(ROW, attrs, ["rack", "missing"], True) == {
+        "id": 1,
+        "name": "server1",
+        "missing": None,
+        "attrs": {"rack": "rack1"},
+    }
+
+
+def test_project_takes_longest_attribute_name_with_dots():
+    attrs = {"ver": attr(as_string="x"), "ver.2": attr(as_string="2.0")}
+
+    assert project(ROW, attrs, ["ver.2"], True)["attrs"] == {"ver.2": "2.0"}
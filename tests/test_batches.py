@@ -0,0 +1,66 @@
+import pytest
+
+from mcp_server.drivers.pagoda_async import NOT_PROCESSED, run_in_batches
+
+
+@pytest.mark.anyio
+async def test_ids_are_run_in_batches():
+    batches = []
+
+    async def run_batch(batch):
+        batches.append(batch)
+        return {x: None for x in batch}
+
+    results = await run_in_batches([1, 2, 3, 4, 5], run_batch, 2, 2)
+
+    assert sorted(batches) == [[1, 2], [3, 4], [5]]
+    assert results == {1: None, 2: None, 3: None, 4: None, 5: None}
+
+
+@pytest.mark.anyio
+async def test_all_ids_of_failed_batch_have_its_error():
+    async def run_batch(batch):
+        if 3 in batch:
+            raise RuntimeError("failed")
+        if 5 in batch:
+            raise TimeoutError()
+        return {x: None for x in batch}
+
+    results = await run_in_batches([1, 2, 3, 4, 5], run_batch, 2, 1)
+
+    assert results == {1: None, 2: None, 3: "failed", 4: "failed", 5: "TimeoutError"}
+
+
+@pytest.mark.anyio
+async def test_ids_not_reported_by_batch_are_not_processed():
+    async def run_batch(batch):
+        return {batch[0]: "error"}
+
+    results = await run_in_batches([1, 2, 3], run_batch, 3, 1)
+
+    assert results == {1: "error", 2: NOT_PROCESSED, 3: NOT_PROCESSED}
+
+
+@pytest.mark.anyio
+async def test_progress_is_reported_after_each_batch():
+    progress = []
+
+    async def run_batch(batch):
+        return {x: None for x in batch}
+
+    async def on_progress(processed, total):
+        progress.append((processed, total))
+
+    await run_in_batches([1, 2, 3], run_batch, 2, 1, on_progress=on_progress)
+
+    assert progress == [(2, 3), (3, 3)]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("batch_size", [0, -1])
+async def test_invalid_batch_size_is_rejected(batch_size):
+    async def run_batch(batch):
+        raise AssertionError("nothing should be run")
+
+    with pytest.raises(ValueError, match="batch_size"):
+        await run_in_batches([1, 2], run_batch, batch_size, 1)
@@ -0,0 +1,121 @@
+import pytest
+
+from mcp_server.lib import cache
+from mcp_server.lib.cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+class TestTTLCache:
+    def test_entry_expires_after_ttl(self, clock):
+        c = TTLCache(ttl=10)
+        c.set("key", "value")
+
+        clock.now += 10
+        assert c.get("key") == "value"
+        clock.now += 1
+        assert c.get("key") is None
+
+    def test_entry_has_its_own_ttl(self, clock):
+        c = TTLCache(ttl=10)
+        c.set("key", "value", ttl=100)
+
+        clock.now += 50
+        assert c.get("key") == "value"
+
+    def test_least_recently_used_entry_is_evicted(self):
+        c = TTLCache(maxsize=2)
+        c.set("a", 1)
+        c.set("b", 2)
+        c.get("a")
+        c.set("c", 3)
+
+        assert c.get("a") == 1
+        assert c.get("b") is None
+        assert c.get("c") == 3
+
+    def test_zero_ttl_disables_cache(self):
+        c = TTLCache(ttl=0)
+        c.set("key", "value")
+
+        assert c.get("key", "default") == "default"
+
+    def test_pop_removes_entry(self):
+        c = TTLCache()
+        c.set("key", "value")
+
+        assert c.pop("key") == "value"
+        assert c.pop("key") is None
+
+    def test_invalidate_removes_matching_entries(self):
+        c = TTLCache()
+        for key in [("a", 1), ("a", 2), ("b", 1)]:
+            c.set(key, "value")
+
+        assert c.invalidate(lambda key: key[0] == "a") == 2
+        assert c.get(("b", 1)) == "value"
+        assert c.invalidate() == 1
+        assert c.stats()["size"] == 0
+
+    def test_stats_counts_hits_and_misses(self):
+        c = TTLCache(maxsize=8, ttl=60)
+        c.set("key", "value")
+        c.get("key")
+        c.get("another")
+
+        assert c.stats() == {
+            "size": 1,
+            "maxsize": 8,
+            "ttl": 60,
+            "hits": 1,
+            "misses": 1,
+        }
+
+    def test_configure_clears_entries(self):
+        c = TTLCache()
+        c.set("key", "value")
+        c.configure(maxsize=4, ttl=30)
+
+        assert c.get("key") is None
+        assert (c.maxsize, c.ttl) == (4, 30)
+
+    def test_entry_is_read_from_shared_store(self, shared_store):
+        TTLCache(namespace="test").set(("token", 1), {"id": 1})
+
+        # this stands for the cache of another process
+        c = TTLCache(namespace="test")
+        assert c.get(("token", 1)) == {"id": 1}
+        assert c.stats()["size"] == 1
+
+    def test_entry_is_not_shared_without_namespace(self, shared_store):
+        TTLCache().set("key", "value")
+
+        assert TTLCache(namespace="test").get("key") is None
+
+    def test_invalidate_removes_entries_of_shared_store(self, shared_store):
+        TTLCache(namespace="test").set(("a", 1), "value")
+
+        assert TTLCache(namespace="test").invalidate(lambda key: key[0] == "a") == 1
+        assert TTLCache(namespace="test").get(("a", 1)) is None
+
+    @pytest.mark.anyio
+    async def test_async_methods_access_shared_store(self, shared_store):
+        await TTLCache(namespace="test").aset("key", [1, 2])
+
+        c = TTLCache(namespace="test")
+        assert await c.aget("key") == [1, 2]
+        assert await c.ainvalidate() == 1
+        assert await TTLCache(namespace="test").aget("key") is None
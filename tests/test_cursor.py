@@ -0,0 +1,140 @@
+import json
+
+import pytest
+
+from mcp_server.lib.cursor import CursorStore, skip_rows
+from mcp_server.tools.common import get_item_list
+
+
+async def iterate(rows):
+    for row in rows:
+        yield row
+
+
+@pytest.mark.anyio
+async def test_read_returns_all_rows_without_cursor_when_they_fit():
+    page, cursor = await CursorStore().read(iterate(range(3)), 3, "scope")
+
+    assert page == [0, 1, 2]
+    assert cursor is None
+
+
+@pytest.mark.anyio
+async def test_read_returns_all_rows_without_limit():
+    page, cursor = await CursorStore().read(iterate(range(300)), None, "scope")
+
+    assert page == list(range(300))
+    assert cursor is None
+
+
+@pytest.mark.anyio
+async def test_cursor_is_resumed_page_by_page_with_page_size_of_first_call():
+    cursors = CursorStore()
+    pages = []
+    page, cursor = await cursors.read(iterate(range(10)), 4, "scope")
+    pages.append(page)
+    while cursor is not None:
+        rows, pending, source, page_size = await cursors.resume(cursor, "scope")
+        assert page_size == 4
+        page, cursor = await cursors.read(rows, page_size, "scope", pending, source)
+        pages.append(page)
+
+    assert pages == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+@pytest.mark.anyio
+async def test_cursor_can_be_used_only_once():
+    cursors = CursorStore()
+    _, cursor = await cursors.read(iterate(range(10)), 4, "scope")
+    await cursors.resume(cursor, "scope")
+
+    with pytest.raises(ValueError, match="invalid or expired"):
+        await cursors.resume(cursor, "scope")
+
+
+@pytest.mark.anyio
+async def test_cursor_is_rejected_in_another_scope():
+    cursors = CursorStore()
+    _, cursor = await cursors.read(iterate(range(10)), 4, "scope")
+
+    with pytest.raises(ValueError, match="invalid or expired"):
+        await cursors.resume(cursor, "another")
+
+
+@pytest.mark.anyio
+async def test_unknown_cursor_is_rejected():
+    with pytest.raises(ValueError, match="invalid or expired"):
+        await CursorStore().resume("unknown", "scope")
+
+
+@pytest.mark.anyio
+async def test_skip_rows():
+    assert [row async for row in skip_rows(iterate(range(5)), 2)] == [2, 3, 4]
+
+
+@pytest.mark.anyio
+async def test_cursor_is_resumed_by_another_process_from_offset(shared_store):
+    source = {"model_id": 1}
+    _, cursor = await CursorStore().read(
+        iterate(range(10)), 4, ("token", 1), source=source
+    )
+
+    # this stands for the store of the other process that doesn't have the iterator
+    rows, pending, resumed, page_size = await CursorStore().resume(cursor, ("token", 1))
+
+    assert rows is None
+    assert pending == []
+    assert resumed == {"model_id": 1, "offset": 4}
+    assert page_size == 4
+    with pytest.raises(ValueError, match="invalid or expired"):
+        await CursorStore().resume(cursor, ("token", 1))
+
+
+@pytest.mark.anyio
+async def test_cursor_resumed_by_another_process_is_rejected_locally(shared_store):
+    cursors = CursorStore()
+    _, cursor = await cursors.read(iterate(range(10)), 4, "scope", source={})
+    await CursorStore().resume(cursor, "scope")
+
+    with pytest.raises(ValueError, match="invalid or expired"):
+        await cursors.resume(cursor, "scope")
+
+
+@pytest.mark.anyio
+async def test_shared_cursor_is_rejected_in_another_scope(shared_store):
+    _, cursor = await CursorStore().read(iterate(range(10)), 4, "scope", source={})
+
+    with pytest.raises(ValueError, match="invalid or expired"):
+        await CursorStore().resume(cursor, "another")
+
+
+@pytest.fixture
+def items(pagoda, backend):
+    def entries(request):
+        page = int(request.url.params["page"])
+        results = [
+            {"id": x, "name": f"item-{x}", "schema": {"id": 1, "name": "Server"}}
+            for x in range((page - 1) * 10 + 1, min(page * 10, 25) + 1)
+        ]
+        return {"count": 25, "next": None if page == 3 else "next", "results": results}
+
+    pagoda.responses["/entity/api/v2/1/entries/"] = entries
+    return pagoda
+
+
+@pytest.mark.anyio
+async def test_item_list_is_continued_with_cursor_only(items):
+    result = json.loads(await get_item_list(1, limit=7, ctx=None))
+    ids = [item["id"] for item in result["items"]]
+    while result["next_cursor"]:
+        result = json.loads(await get_item_list(0, cursor=result["next_cursor"]))
+        assert len(result["items"]) <= 7
+        ids += [item["id"] for item in result["items"]]
+
+    assert ids == list(range(1, 26))
+
+
+@pytest.mark.anyio
+async def test_item_list_with_invalid_cursor(items):
+    with pytest.raises(ValueError, match="invalid or expired"):
+        await get_item_list(1, cursor="invalid", ctx=None)
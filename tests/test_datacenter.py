@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+from mcp_server.drivers.pagoda import AdvancedSearchResult
+from mcp_server.tools import datacenter
+from mcp_server.tools.datacenter import build_rack_space, get_rack_inventory
+
+
+def make_rack(rack_id: int, name: str, floor: str, units: dict[str, str]) -> dict:
+    return {
+        "entry": {"id": rack_id, "name": name},
+        "entity": {"id": 1, "name": "ラック"},
+        "attrs": {
+            "ユニット数": {"type": 2, "value": {"as_string": "4"}},
+            "フロア": {
+                "type": 1,
+                "value": {"as_object": {"id": 10, "name": floor}},
+            },
+            "RackSpace": {
+                "type": 3073,
+                "value": {
+                    "as_array_named_object": [
+                        {"name": unit, "object": {"id": 100, "name": appliance}}
+                        for unit, appliance in units.items()
+                    ]
+                },
+            },
+        },
+        "referrals": None,
+    }
+
+
+def test_build_rack_space_lists_appliances_per_unit():
+    units = [
+        {"name": "1", "object": {"name": "server1"}},
+        {"name": "3", "object": {"name": "server2"}},
+        {"name": "3", "object": {"name": "server3"}},
+    ]
+
+    assert build_rack_space(units, 4) == {
+        "1": ["server1"],
+        "2": [],
+        "3": ["server2", "server3"],
+        "4": [],
+    }
+
+
+def test_build_rack_space_ignores_units_out_of_rack():
+    units = [
+        {"name": "0", "object": {"name": "server1"}},
+        {"name": "5", "object": {"name": "server2"}},
+        {"name": "", "object": {"name": "server3"}},
+    ]
+
+    assert build_rack_space(units, 4) == {"1": [], "2": [], "3": [], "4": []}
+    assert build_rack_space(units, 0) == {}
+
+
+RACKS = [
+    make_rack(1, "rack-b", "1F", {"1": "server1", "2": "server2"}),
+    make_rack(2, "rack-a", "1F", {}),
+    make_rack(3, "rack-c", "11F", {"4": "server3"}),
+    make_rack(4, "rack-d", "2F", {"1": "server4"}),
+]
+
+
+@pytest.fixture
+def searched(monkeypatch, backend):
+    searched = []
+
+    async def search_racks(floor_name, **kwargs):
+        # the search of Pagoda matches floors partially
+        searched.append(floor_name)
+        values = [
+            x
+            for x in RACKS
+            if floor_name in x["attrs"]["フロア"]["value"]["as_object"]["name"]
+        ]
+        return AdvancedSearchResult(total_count=len(values), values=values)
+
+    monkeypatch.setattr(datacenter, "_search_racks", search_racks)
+    return searched
+
+
+@pytest.mark.anyio
+async def test_rack_inventory_matches_floors_exactly(searched):
+    result = json.loads(await get_rack_inventory(["1F", "2F", "1F"]))
+
+    assert sorted(searched) == ["1F", "2F"]
+    assert result == {
+        "columns": ["name", "フロア", "ユニット数", "occupied_units"],
+        "rows": [
+            ["rack-a", "1F", 4, 0],
+            ["rack-b", "1F", 4, 2],
+            ["rack-d", "2F", 4, 1],
+        ],
+    }
+
+
+@pytest.mark.anyio
+async def test_rack_inventory_of_all_floors(searched):
+    result = json.loads(await get_rack_inventory())
+
+    assert searched == [""]
+    assert [row[0] for row in result["rows"]] == [
+        "rack-c",
+        "rack-a",
+        "rack-b",
+        "rack-d",
+    ]
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from mcp_server.tools import common
+from mcp_server.tools.common import get_item_details
+
+
+def make_item(item_id: int) -> dict:
+    return {
+        "id": item_id,
+        "name": f"item-{item_id}",
+        "schema": {"id": 1, "name": "Server"},
+        "is_active": True,
+        "attrs": [
+            {
+                "schema": {"id": 10, "name": "IP"},
+                "type": 2,
+                "value": {"as_string": f"10.0.0.{item_id}"},
+            }
+        ],
+    }
+
+
+@pytest.fixture
+def items(pagoda, backend):
+    for item_id in range(1, 41):
+        pagoda.responses[f"/entry/api/v2/{item_id}/"] = make_item(item_id)
+    return pagoda
+
+
+@pytest.mark.anyio
+async def test_items_are_fetched_once_in_order(items):
+    result = json.loads(await get_item_details([3, 1, 3, 2, 1], ctx=None))
+
+    assert [item["id"] for item in result["items"]] == [3, 1, 2]
+    assert result["errors"] == []
+    assert sorted(items.paths()) == [f"/entry/api/v2/{x}/" for x in [1, 2, 3]]
+
+
+@pytest.mark.anyio
+async def test_errors_are_returned_with_found_items(items):
+    result = json.loads(await get_item_details([1, 999, 2], ctx=None))
+
+    assert [item["id"] for item in result["items"]] == [1, 2]
+    assert [error["item_id"] for error in result["errors"]] == [999]
+
+
+@pytest.mark.anyio
+async def test_items_are_fetched_concurrently_within_limit(items, monkeypatch):
+    monkeypatch.setattr(common, "BATCH_CONCURRENCY", 4)
+    items.delay = 0.01
+
+    result = json.loads(await get_item_details(list(range(1, 41)), ctx=None))
+
+    assert len(result["items"]) == 40
+    assert items.max_in_flight == 4
+
+
+@pytest.mark.anyio
+async def test_fields_and_flatten_are_applied_to_each_item(items):
+    result = json.loads(
+        await get_item_details([1, 2], fields=["IP"], flatten=True, ctx=None)
+    )
+
+    assert [item["attrs"] for item in result["items"]] == [
+        {"IP": "10.0.0.1"},
+        {"IP": "10.0.0.2"},
+    ]
@@ -0,0 +1,112 @@
+import asyncio
+
+import httpx
+import pytest
+
+from mcp_server.lib.metrics import METRICS, Histogram, instrument_tool, timed
+from mcp_server.server_sse import create_mcp_server
+from mcp_server.tools import common
+from mcp_server.tools.common import get_item_detail
+
+ENDPOINT = "https://secret-pagoda.example"
+
+
+@pytest.fixture
+def metrics():
+    METRICS.reset()
+    yield METRICS
+    METRICS.reset()
+
+
+def by_labels(metrics, name: str) -> dict:
+    return {tuple(sorted(x["labels"].values())): x for x in metrics.snapshot()[name]}
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((1, 10))
+    for value in [0.5, 1, 5, 100]:
+        histogram.observe(value)
+
+    assert histogram.to_dict() == {
+        "count": 4,
+        "sum": 106.5,
+        "buckets": {"1": 2, "10": 3, "+Inf": 4},
+    }
+
+
+@pytest.mark.anyio
+async def test_tool_calls_are_recorded_by_status(metrics):
+    async def succeeds() -> str:
+        return "result"
+
+    async def fails() -> str:
+        raise RuntimeError("failed")
+
+    await instrument_tool(succeeds)()
+    with pytest.raises(RuntimeError):
+        await instrument_tool(fails)()
+
+    seconds = by_labels(metrics, "tool_seconds")
+    assert seconds[("ok", "succeeds")]["count"] == 1
+    assert seconds[("error", "fails")]["count"] == 1
+    assert by_labels(metrics, "tool_output_chars")[("succeeds",)]["sum"] == 6
+
+
+@pytest.mark.anyio
+async def test_driver_calls_are_timed(metrics):
+    @timed
+    async def driver_api() -> None:
+        await asyncio.sleep(0.01)
+
+    await driver_api()
+
+    seconds = by_labels(metrics, "driver_seconds")[("driver_api", "ok")]
+    assert seconds["count"] == 1
+    assert seconds["sum"] >= 0.01
+
+
+@pytest.fixture
+def item(pagoda, monkeypatch):
+    pagoda.responses["/entry/api/v2/42/"] = {
+        "id": 42,
+        "name": "item",
+        "schema": {"id": 1, "name": "Server"},
+        "is_active": True,
+        "attrs": [],
+    }
+    monkeypatch.setattr(
+        common, "get_backend_param", lambda ctx: (ENDPOINT, "secret-token")
+    )
+    monkeypatch.setattr(common, "get_prefix", lambda ctx: "")
+    return pagoda
+
+
+@pytest.mark.anyio
+async def test_requests_of_tool_are_recorded(metrics, item):
+    await instrument_tool(get_item_detail)(42)
+
+    requests = by_labels(metrics, "pagoda_request_seconds")
+    assert list(requests) == [("/entry/api/v2/{id}/", "GET")]
+    assert by_labels(metrics, "tool_pagoda_requests")[("get_item_detail",)]["sum"] == 1
+    assert by_labels(metrics, "tool_input_bytes")[("get_item_detail",)]["sum"] > 0
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint_doesnt_tell_pagoda(metrics, item):
+    await instrument_tool(get_item_detail)(42)
+    server = create_mcp_server("localhost", 8000, ENDPOINT, "bearer")
+
+    # /metrics doesn't require authorization
+    transport = httpx.ASGITransport(app=server.sse_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        response = await c.get("/metrics")
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["histograms"]["tool_seconds"][0]["labels"] == {
+        "tool": "get_item_detail",
+        "status": "ok",
+    }
+    assert {"http_pool", "caches", "requests_in_flight"} <= result.keys()
+    assert "secret-pagoda" not in response.text
+    assert "secret-token" not in response.text
@@ -0,0 +1,107 @@
+import pytest
+
+from mcp_server.drivers import pagoda_async
+from mcp_server.drivers.pagoda_async import (
+    MODEL_CACHE,
+    get_item_list_api,
+    get_model_detail_api,
+    get_model_id,
+    get_model_list_api,
+    invalidate_model_cache,
+)
+
+ENDPOINT = "http://pagoda"
+
+
+def make_model(model_id: int, name: str) -> dict:
+    return {
+        "id": model_id,
+        "name": name,
+        "note": "",
+        "item_name_pattern": "",
+        "status": 0,
+        "is_toplevel": False,
+    }
+
+
+@pytest.fixture
+def models(pagoda):
+    pagoda.responses["/entity/api/v2/"] = {
+        "count": 2,
+        "next": None,
+        "previous": None,
+        "results": [make_model(1, "Server"), make_model(2, "Rack")],
+    }
+    pagoda.responses["/entity/api/v2/1/"] = {**make_model(1, "Server"), "attrs": []}
+    return pagoda
+
+
+@pytest.mark.anyio
+async def test_model_list_is_cached(models):
+    first = await get_model_list_api(ENDPOINT, "token")
+    second = await get_model_list_api(ENDPOINT, "token")
+
+    assert [model.name for model in second] == [model.name for model in first]
+    assert models.paths() == ["/entity/api/v2/"]
+
+
+@pytest.mark.anyio
+async def test_model_id_is_cached_per_token(models):
+    assert await get_model_id(ENDPOINT, "token", "Rack") == 2
+    assert await get_model_id(ENDPOINT, "token", "Rack") == 2
+    assert await get_model_id(ENDPOINT, "another", "Rack") == 2
+
+    assert models.paths() == ["/entity/api/v2/", "/entity/api/v2/"]
+
+
+@pytest.mark.anyio
+async def test_model_detail_is_cached(models):
+    await get_model_detail_api(ENDPOINT, "token", 1)
+    detail = await get_model_detail_api(ENDPOINT, "token", 1)
+
+    assert detail.name == "Server"
+    assert models.paths() == ["/entity/api/v2/1/"]
+
+
+@pytest.mark.anyio
+async def test_cache_is_invalidated_when_model_is_not_found(models):
+    await get_model_id(ENDPOINT, "token", "Rack")
+    await get_model_detail_api(ENDPOINT, "token", 1)
+
+    # the model was deleted, so that the cached id doesn't exist anymore
+    with pytest.raises(RuntimeError):
+        await get_item_list_api(ENDPOINT, "token", 2)
+
+    assert MODEL_CACHE.stats()["size"] == 0
+    await get_model_id(ENDPOINT, "token", "Rack")
+    assert models.paths().count("/entity/api/v2/") == 2
+
+
+@pytest.mark.anyio
+async def test_missing_model_detail_invalidates_cache(models):
+    await get_model_id(ENDPOINT, "token", "Rack")
+
+    with pytest.raises(RuntimeError):
+        await get_model_detail_api(ENDPOINT, "token", 2)
+
+    assert MODEL_CACHE.stats()["size"] == 0
+
+
+@pytest.mark.anyio
+async def test_invalidate_model_cache_of_endpoint(models):
+    await get_model_id(ENDPOINT, "token", "Rack")
+    MODEL_CACHE.set(("model_id", "http://another", "scope", "Rack"), 2)
+
+    assert await invalidate_model_cache(ENDPOINT) == 2
+    assert MODEL_CACHE.get(("model_id", "http://another", "scope", "Rack")) == 2
+    assert await invalidate_model_cache() == 1
+
+
+@pytest.mark.anyio
+async def test_zero_ttl_disables_cache(models, monkeypatch):
+    monkeypatch.setattr(pagoda_async.MODEL_CACHE, "ttl", 0)
+
+    await get_model_list_api(ENDPOINT, "token")
+    await get_model_list_api(ENDPOINT, "token")
+
+    assert models.paths() == ["/entity/api/v2/", "/entity/api/v2/"]
@@ -0,0 +1,162 @@
+import json
+
+import httpx
+import pytest
+
+from mcp_server.lib.attribute import get_value_names
+from mcp_server.tools.network import find_vm_from_network
+
+MODELS = ["IPAddress", "LBVirtualServer", "LBServiceGroup", "LBServer", "tsuchinoko-vm"]
+
+
+def ref(*names: str) -> dict:
+    return {"value": {"as_array_object": [{"id": 0, "name": x} for x in names]}}
+
+
+def obj(name: str) -> dict:
+    return {"value": {"as_object": {"id": 0, "name": name}}}
+
+
+# items of each model as (name, attrs)
+ITEMS = {
+    "IPAddress": [
+        ("1.12.123.10", {"Network": obj("1.12.123.0/24")}),
+        ("1.12.123.11", {"Network": obj("1.12.123.0/24")}),
+        ("2.0.0.1", {"Network": obj("2.0.0.0/24")}),
+    ],
+    "LBVirtualServer": [
+        ("vs1", {"IPアドレス": ref("1.12.123.10"), "LBServiceGroup": ref("sg1")}),
+        ("vs2", {"IPアドレス": ref("1.12.123.11"), "LBServiceGroup": ref("sg2")}),
+        ("vs3", {"IPアドレス": ref("2.0.0.1"), "LBServiceGroup": ref("sg1")}),
+    ],
+    "LBServiceGroup": [
+        ("sg1", {"LBServer": ref("srv1", "srv2")}),
+        # this is matched partially by "sg1", but it's not joined
+        ("sg10", {"LBServer": ref("srv9")}),
+    ],
+    "LBServer": [
+        ("srv1", {"IPアドレス": ref("192.168.0.1")}),
+        ("srv2", {"IPアドレス": ref()}),
+        ("srv9", {"IPアドレス": ref("192.168.0.9")}),
+    ],
+    "tsuchinoko-vm": [
+        ("vm1", {"IPアドレス": ref("192.168.0.1"), "大分類": obj("web")}),
+        ("vm10", {"IPアドレス": ref("192.168.0.10"), "大分類": obj("db")}),
+    ],
+}
+
+
+def contains(names: list[str], keyword: str) -> bool:
+    return any(term in name for term in keyword.split("|") for name in names)
+
+
+def advanced_search(request: httpx.Request) -> httpx.Response:
+    """Advanced search of Pagoda, which matches keywords partially"""
+    data = json.loads(request.content)
+    model = MODELS[data["entities"][0] - 1]
+    values = []
+    for index, (name, attrs) in enumerate(ITEMS[model]):
+        keyword = data["hint_entry"]["keyword"]
+        if keyword and not contains([name], keyword):
+            continue
+        if any(
+            (info["filter_key"] == 2 and not get_value_names(attrs.get(info["name"])))
+            or (
+                info["filter_key"] == 3
+                and not contains(
+                    get_value_names(attrs.get(info["name"])), info["keyword"]
+                )
+            )
+            for info in data["attrinfo"]
+        ):
+            continue
+        values.append(
+            {
+                "entry": {"id": index + 1, "name": name},
+                "entity": {"id": data["entities"][0], "name": model},
+                "attrs": attrs,
+                "referrals": None,
+            }
+        )
+    offset = data["entry_offset"]
+    return httpx.Response(
+        200,
+        json={
+            "total_count": len(values),
+            "values": values[offset : offset + data["entry_limit"]],
+        },
+    )
+
+
+@pytest.fixture
+def lb(pagoda, backend):
+    def model_list(request: httpx.Request) -> dict:
+        search = request.url.params["search"]
+        results = [
+            {
+                "id": index + 1,
+                "name": name,
+                "note": "",
+                "item_name_pattern": "",
+                "status": 0,
+                "is_toplevel": False,
+            }
+            for index, name in enumerate(MODELS)
+            if search in name
+        ]
+        return {"count": len(results), "next": None, "results": results}
+
+    pagoda.responses["/entity/api/v2/"] = model_list
+    pagoda.responses["/entry/api/v2/advanced_search/"] = advanced_search
+    return pagoda
+
+
+def row(*values: str) -> dict:
+    keys = [
+        "グローバルIP",
+        "LBVirtualServer",
+        "LBServiceGroup",
+        "LBServer",
+        "プライベートIP",
+        "tsuchinoko-vm",
+        "大分類",
+    ]
+    return dict(zip(keys, values))
+
+
+@pytest.mark.anyio
+async def test_vms_are_joined_by_exact_names(lb):
+    result = json.loads(await find_vm_from_network("1.12.123.0/24", None))
+
+    assert result == {
+        "rows": [
+            row("1.12.123.10", "vs1", "sg1", "srv1", "192.168.0.1", "vm1", "web"),
+            row("1.12.123.10", "vs1", "sg1", "srv2", "", "", ""),
+            row("1.12.123.11", "vs2", "sg2", "", "", "", ""),
+        ]
+    }
+
+
+@pytest.mark.anyio
+async def test_no_rows_without_addresses_in_network(lb):
+    result = json.loads(await find_vm_from_network("3.0.0.0/24", None))
+
+    assert result == {"rows": []}
+    assert lb.paths().count("/entry/api/v2/advanced_search/") == 1
+
+
+@pytest.mark.anyio
+async def test_many_addresses_are_searched_by_split_keywords(lb, monkeypatch):
+    addresses = [f"1.12.{i // 256}.{i % 256}" for i in range(3000)]
+    monkeypatch.setitem(
+        ITEMS, "IPAddress", [(x, {"Network": obj("1.12.0.0/16")}) for x in addresses]
+    )
+    monkeypatch.setitem(
+        ITEMS,
+        "LBVirtualServer",
+        [("vs1", {"IPアドレス": ref(addresses[-1]), "LBServiceGroup": ref("sg1")})],
+    )
+
+    result = json.loads(await find_vm_from_network("1.12.0.0/16", None))
+
+    assert [x["LBVirtualServer"] for x in result["rows"]] == ["vs1", "vs1"]
@@ -0,0 +1,181 @@
+import asyncio
+import os
+import tempfile
+import uuid
+
+import pytest
+
+from mcp_server.lib.relay import (
+    FRAME_HEADER,
+    SESSIONS,
+    SSESessionRelay,
+    read_frame,
+    write_frame,
+)
+
+SESSION_ID = uuid.uuid4().hex
+
+
+class App:
+    """MCP server of a worker, which keeps a stream and accepts messages"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.messages: list[bytes] = []
+        self.closed = asyncio.Event()
+
+    async def __call__(self, scope, receive, send):
+        if scope["path"] == "/sse":
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": f"event: endpoint\r\ndata: /messages/?session_id={SESSION_ID}\r\n\r\n".encode(),
+                    "more_body": True,
+                }
+            )
+            await self.closed.wait()
+            return
+
+        message = await receive()
+        self.messages.append(message["body"])
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 202,
+                "headers": [(b"content-type", b"text/plain")],
+            }
+        )
+        await send({"type": "http.response.body", "body": self.name.encode()})
+
+
+def http_scope(path: str, query_string: bytes = b"") -> dict:
+    return {
+        "type": "http",
+        "method": "POST" if path == "/messages/" else "GET",
+        "path": path,
+        "query_string": query_string,
+        "headers": [(b"authorization", b"Bearer token")],
+    }
+
+
+async def post(relay: SSESessionRelay, body: bytes) -> tuple[int, bytes]:
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await relay(
+        http_scope("/messages/", f"session_id={SESSION_ID}".encode()), receive, send
+    )
+    return sent[0]["status"], sent[1]["body"]
+
+
+@pytest.fixture
+def workers(shared_store):
+    workers = []
+    for name in ["a", "b"]:
+        app = App(name)
+        relay = SSESessionRelay(app, shared_store)
+        # workers are processes of their own in production
+        relay.socket_path = os.path.join(
+            tempfile.gettempdir(), f"mcp-pagoda-test-{uuid.uuid4().hex[:8]}.sock"
+        )
+        workers.append((app, relay))
+    yield workers
+    for _, relay in workers:
+        relay._stop_server()
+
+
+@pytest.fixture
+async def stream(workers, shared_store):
+    """Stream of SSE kept by the first worker"""
+    app, relay = workers[0]
+
+    async def receive():
+        await app.closed.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        pass
+
+    task = asyncio.create_task(relay(http_scope("/sse"), receive, send))
+    while await shared_store.aget(SESSIONS, SESSION_ID) is None:
+        await asyncio.sleep(0.01)
+    yield task
+    app.closed.set()
+    await task
+
+
+@pytest.mark.anyio
+async def test_frame_is_prefixed_with_length():
+    reader = asyncio.StreamReader()
+    data = b'{"body": "' + b"x" * 200000 + b'"}'
+    reader.feed_data(FRAME_HEADER.pack(len(data)) + data)
+
+    assert await read_frame(reader) == {"body": "x" * 200000}
+
+
+@pytest.mark.anyio
+async def test_frames_are_written_and_read_through_socket():
+    frames = []
+
+    async def handle(reader, writer):
+        frames.append(await read_frame(reader))
+        frames.append(await read_frame(reader))
+        writer.close()
+
+    path = os.path.join(
+        tempfile.gettempdir(), f"mcp-pagoda-test-{uuid.uuid4().hex[:8]}.sock"
+    )
+    server = await asyncio.start_unix_server(handle, path)
+    try:
+        reader, writer = await asyncio.open_unix_connection(path)
+        await write_frame(writer, {"body": "a\nb" * 100000})
+        await write_frame(writer, {"body": ""})
+        await reader.read()
+        writer.close()
+    finally:
+        server.close()
+        os.unlink(path)
+
+    assert frames == [{"body": "a\nb" * 100000}, {"body": ""}]
+
+
+@pytest.mark.anyio
+async def test_message_is_relayed_to_worker_keeping_stream(workers, stream):
+    (app_a, relay_a), (app_b, relay_b) = workers
+    # larger than the buffer of StreamReader.readline()
+    body = b'{"jsonrpc": "2.0", "params": "' + b"x" * 200000 + b'"}'
+
+    assert await post(relay_b, body) == (202, b"a")
+    assert app_a.messages == [body]
+    assert app_b.messages == []
+
+    assert await post(relay_a, b"{}") == (202, b"a")
+    assert app_a.messages == [body, b"{}"]
+
+
+@pytest.mark.anyio
+async def test_session_is_removed_when_stream_ends(workers, stream, shared_store):
+    (app_a, _), (app_b, relay_b) = workers
+    app_a.closed.set()
+    await stream
+
+    assert await shared_store.aget(SESSIONS, SESSION_ID) is None
+    # the message is handled (and rejected) by the worker that received it
+    assert await post(relay_b, b"{}") == (202, b"b")
+
+
+@pytest.mark.anyio
+async def test_session_of_exited_worker_is_not_found(workers, shared_store):
+    _, relay_b = workers[1]
+    await shared_store.aset(SESSIONS, SESSION_ID, "/nonexistent.sock", ttl=60)
+
+    status, body = await post(relay_b, b"{}")
+
+    assert status == 404
+    assert await shared_store.aget(SESSIONS, SESSION_ID) is None
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from mcp_server.drivers.pagoda import Item
+from mcp_server.lib import serializer
+from mcp_server.lib.metrics import Span, _current_span
+from mcp_server.lib.serializer import (
+    SERIALIZERS,
+    dumps,
+    get_serializer,
+    loads,
+    set_serializer,
+)
+
+ITEM = Item(**{"id": 1, "name": "サーバー", "schema": {"id": 2, "name": "Server"}})
+
+
+@pytest.fixture(autouse=True)
+def restore_serializer():
+    current = get_serializer()
+    yield
+    serializer._serializer = current
+
+
+@pytest.fixture(params=sorted(SERIALIZERS))
+def name(request):
+    set_serializer(request.param)
+    return request.param
+
+
+def test_serializers_encode_same_json(name):
+    obj = {"items": [ITEM], "count": 1, "next": None, "ratio": 0.5}
+
+    assert json.loads(dumps(obj)) == json.loads(SERIALIZERS["json"].dumps(obj))
+
+
+def test_model_is_encoded_with_field_names(name):
+    assert json.loads(dumps(ITEM)) == {
+        "id": 1,
+        "name": "サーバー",
+        "model": {"id": 2, "name": "Server"},
+    }
+
+
+def test_serializers_decode_bytes_and_str(name):
+    data = '{"results": [{"id": 1, "name": "サーバー"}], "next": null}'
+
+    assert loads(data) == loads(data.encode()) == json.loads(data)
+
+
+def test_unsupported_object_is_rejected(name):
+    # pydantic raises PydanticSerializationError, which is a ValueError
+    with pytest.raises((TypeError, ValueError)):
+        dumps({"value": object()})
+
+
+def test_auto_prefers_orjson():
+    expected = "orjson" if "orjson" in SERIALIZERS else "pydantic"
+
+    assert set_serializer("auto").name == expected
+    assert get_serializer().name == expected
+
+
+def test_unavailable_serializer_is_rejected(monkeypatch):
+    monkeypatch.delitem(SERIALIZERS, "orjson", raising=False)
+
+    with pytest.raises(ValueError):
+        set_serializer("orjson")
+    assert set_serializer("auto").name == "pydantic"
+
+
+def test_time_is_recorded_in_span():
+    span = Span("tool")
+    token = _current_span.set(span)
+    try:
+        loads(dumps({"values": list(range(1000))}))
+    finally:
+        _current_span.reset(token)
+
+    assert span.serialize_seconds > 0
+    assert span.decode_seconds > 0
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from mcp_server.drivers.pagoda_async import get_item_detail_api
+from mcp_server.lib.metrics import METRICS, instrument_tool
+from mcp_server.lib.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    @pytest.mark.anyio
+    async def test_concurrent_calls_are_coalesced(self):
+        flight = SingleFlight()
+        called = 0
+
+        async def func():
+            nonlocal called
+            called += 1
+            await asyncio.sleep(0.01)
+            return called
+
+        results = await asyncio.gather(*[flight.do("key", func) for _ in range(5)])
+
+        assert results == [1] * 5
+        assert called == 1
+        assert flight.stats() == {"in_flight": 0, "calls": 1, "shared": 4}
+
+    @pytest.mark.anyio
+    async def test_calls_of_different_keys_are_not_coalesced(self):
+        flight = SingleFlight()
+
+        async def func():
+            await asyncio.sleep(0.01)
+
+        await asyncio.gather(flight.do("a", func), flight.do("b", func))
+
+        assert flight.stats() == {"in_flight": 0, "calls": 2, "shared": 0}
+
+    @pytest.mark.anyio
+    async def test_sequential_calls_are_not_coalesced(self):
+        flight = SingleFlight()
+
+        async def func():
+            return "value"
+
+        assert await flight.do("key", func) == "value"
+        assert await flight.do("key", func) == "value"
+        assert flight.stats()["calls"] == 2
+
+    @pytest.mark.anyio
+    async def test_exception_is_shared_by_callers(self):
+        flight = SingleFlight()
+
+        async def func():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("failed")
+
+        results = await asyncio.gather(
+            flight.do("key", func), flight.do("key", func), return_exceptions=True
+        )
+
+        assert [str(e) for e in results] == ["failed", "failed"]
+        assert flight.stats()["in_flight"] == 0
+
+
+@pytest.fixture
+def metrics():
+    METRICS.reset()
+    yield METRICS
+    METRICS.reset()
+
+
+@pytest.mark.anyio
+async def test_coalesced_request_is_counted_for_waiting_tool(pagoda, metrics):
+    pagoda.responses["/entry/api/v2/1/"] = {
+        "id": 1,
+        "name": "item",
+        "schema": {"id": 1, "name": "Server"},
+        "is_active": True,
+    }
+    pagoda.delay = 0.01
+
+    async def first() -> str:
+        await get_item_detail_api("http://pagoda", "token", 1)
+        return ""
+
+    async def second() -> str:
+        await asyncio.sleep(0)
+        await get_item_detail_api("http://pagoda", "token", 1)
+        return ""
+
+    await asyncio.gather(instrument_tool(first)(), instrument_tool(second)())
+
+    assert len(pagoda.requests) == 1
+    snapshot = metrics.snapshot()
+    requests = {x["labels"]["tool"]: x["sum"] for x in snapshot["tool_pagoda_requests"]}
+    coalesced = {
+        x["labels"]["tool"]: x["sum"] for x in snapshot["tool_coalesced_requests"]
+    }
+    assert requests == {"first": 1, "second": 0}
+    assert coalesced == {"first": 0, "second": 1}
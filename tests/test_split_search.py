@@ -0,0 +1,195 @@
+import json
+
+import pytest
+
+from mcp_server.drivers import pagoda_async
+from mcp_server.drivers.pagoda import AdvancedSearchResult
+from mcp_server.drivers.pagoda_async import (
+    KEYWORD_MAX_LENGTH,
+    MAX_SPLIT_CONDITIONS,
+    advanced_search_split_api,
+    split_keyword,
+)
+from mcp_server.model import AdvancedSearchAttrInfo
+from mcp_server.tools import common
+
+
+def make_result(ids: list[int]) -> AdvancedSearchResult:
+    return AdvancedSearchResult(
+        total_count=len(ids),
+        values=[
+            {
+                "entry": {"id": x, "name": f"item-{x}"},
+                "entity": {"id": 1, "name": "Server"},
+                "attrs": {},
+                "referrals": None,
+            }
+            for x in ids
+        ],
+    )
+
+
+def test_split_keyword_returns_short_keyword_as_it_is():
+    assert split_keyword("a|b|c") == ["a|b|c"]
+
+
+def test_split_keyword_splits_into_chunks_within_max_length():
+    terms = [f"term{i:03d}" for i in range(100)]
+    chunks = split_keyword("|".join(terms))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= KEYWORD_MAX_LENGTH for chunk in chunks)
+    assert "|".join(chunks).split("|") == terms
+
+
+def test_split_keyword_drops_empty_and_duplicated_terms():
+    assert split_keyword("a||b|a|c", max_length=3) == ["a|b", "c"]
+
+
+def test_split_keyword_leaves_long_term_as_it_is():
+    assert split_keyword("abcdef|g", max_length=4) == ["abcdef", "g"]
+
+
+@pytest.mark.anyio
+async def test_split_search_merges_results_in_order_without_duplicates(
+    monkeypatch,
+):
+    searched = []
+
+    async def advanced_search_all_api(**kwargs):
+        searched.append(kwargs["item_keyword"])
+        return make_result([1, 2] if kwargs["item_keyword"].startswith("x") else [2, 3])
+
+    monkeypatch.setattr(
+        pagoda_async, "advanced_search_all_api", advanced_search_all_api
+    )
+    keyword = "|".join(["x" * 150, "x" * 150, "y" * 150])
+    result = await advanced_search_split_api(
+        endpoint="http://pagoda",
+        token="token",
+        entities=[1],
+        attrinfos=[],
+        item_keyword=keyword,
+        concurrency=4,
+    )
+
+    assert searched == ["x" * 150, "y" * 150]
+    assert [value.entry.id for value in result.values] == [1, 2, 3]
+    assert result.total_count == 3
+
+
+@pytest.mark.anyio
+async def test_split_search_searches_each_combination_of_chunks(monkeypatch):
+    searched = []
+
+    async def advanced_search_all_api(**kwargs):
+        searched.append((kwargs["item_keyword"], kwargs["attrinfos"][0].keyword))
+        return make_result([])
+
+    monkeypatch.setattr(
+        pagoda_async, "advanced_search_all_api", advanced_search_all_api
+    )
+    keyword = "|".join(["a" * 200, "b" * 200])
+    await advanced_search_split_api(
+        endpoint="http://pagoda",
+        token="token",
+        entities=[1],
+        attrinfos=[AdvancedSearchAttrInfo(name="attr", filter_key=3, keyword=keyword)],
+        item_keyword=keyword,
+    )
+
+    assert sorted(searched) == [
+        ("a" * 200, "a" * 200),
+        ("a" * 200, "b" * 200),
+        ("b" * 200, "a" * 200),
+        ("b" * 200, "b" * 200),
+    ]
+
+
+@pytest.mark.anyio
+async def test_split_search_rejects_long_not_contained_keyword():
+    with pytest.raises(ValueError):
+        await advanced_search_split_api(
+            endpoint="http://pagoda",
+            token="token",
+            entities=[1],
+            attrinfos=[],
+            item_filter_key=2,
+            item_keyword="a|" * KEYWORD_MAX_LENGTH,
+        )
+
+
+@pytest.mark.anyio
+async def test_split_search_rejects_too_many_combinations(monkeypatch):
+    async def advanced_search_all_api(**kwargs):
+        raise AssertionError("nothing should be searched")
+
+    monkeypatch.setattr(
+        pagoda_async, "advanced_search_all_api", advanced_search_all_api
+    )
+    keyword = "|".join(f"term{i:05d}" for i in range(200))
+    attrinfos = [
+        AdvancedSearchAttrInfo(name=name, filter_key=3, keyword=keyword)
+        for name in ["a", "b"]
+    ]
+
+    with pytest.raises(ValueError, match=str(MAX_SPLIT_CONDITIONS)):
+        await advanced_search_split_api(
+            endpoint="http://pagoda",
+            token="token",
+            entities=[1],
+            attrinfos=attrinfos,
+            item_keyword=keyword,
+        )
+
+
+@pytest.mark.anyio
+async def test_single_keyword_is_split_into_any_number_of_chunks(monkeypatch):
+    searched = []
+
+    async def advanced_search_all_api(**kwargs):
+        searched.append(kwargs["attrinfos"][0].keyword)
+        return make_result([len(searched)])
+
+    monkeypatch.setattr(
+        pagoda_async, "advanced_search_all_api", advanced_search_all_api
+    )
+    # e.g. a list of IP addresses joined by find_vm_from_network
+    keyword = "|".join(f"10.0.{i // 256}.{i % 256}" for i in range(4000))
+    result = await advanced_search_split_api(
+        endpoint="http://pagoda",
+        token="token",
+        entities=[1],
+        attrinfos=[
+            AdvancedSearchAttrInfo(name="IP", filter_key=3, keyword=keyword),
+            AdvancedSearchAttrInfo(name="Category", filter_key=2),
+        ],
+        concurrency=8,
+    )
+
+    assert len(searched) > MAX_SPLIT_CONDITIONS
+    assert "|".join(searched) == keyword
+    assert result.total_count == len(searched)
+
+
+@pytest.mark.anyio
+async def test_split_search_applies_limit_and_offset_to_merged_items(
+    monkeypatch, backend
+):
+    async def advanced_search_split_api(**kwargs):
+        return make_result([1, 2, 3, 4, 5])
+
+    monkeypatch.setattr(common, "advanced_search_split_api", advanced_search_split_api)
+    kwargs = {"entities": [1], "attrinfo": [], "item_keyword": "a|" * 200}
+
+    result = json.loads(await common.advanced_search(**kwargs, limit=2, offset=1))
+    assert result["total_count"] == 5
+    assert [value["entry"]["id"] for value in result["values"]] == [2, 3]
+
+    result = json.loads(await common.advanced_search(**kwargs, limit=2, fetch_all=True))
+    assert [value["entry"]["id"] for value in result["values"]] == [1, 2, 3, 4, 5]
+
+    with pytest.raises(ValueError, match="limit"):
+        await common.advanced_search(**kwargs, limit=0)
+    with pytest.raises(ValueError, match="offset"):
+        await common.advanced_search(**kwargs, offset=-1)
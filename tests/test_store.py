@@ -0,0 +1,61 @@
+import pytest
+
+from mcp_server.lib.store import MemoryStore, SQLiteStore, Store, create_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path) -> Store:
+    if request.param == "memory":
+        return MemoryStore()
+    return SQLiteStore(str(tmp_path / "store.db"))
+
+
+def test_value_is_set_and_deleted(store):
+    store.set("ns", ("token", 1), {"name": "value"}, ttl=60)
+
+    assert store.get("ns", ("token", 1)) == {"name": "value"}
+    assert store.get("another", ("token", 1)) is None
+    store.delete("ns", ("token", 1))
+    assert store.get("ns", ("token", 1), "default") == "default"
+
+
+def test_expired_value_is_not_returned(store):
+    store.set("ns", "key", "value", ttl=-1)
+
+    assert store.get("ns", "key") is None
+
+
+def test_invalidate_removes_matching_keys_of_namespace(store):
+    for key in [("a", 1), ("a", 2), ("b", 1)]:
+        store.set("ns", key, "value", ttl=60)
+    store.set("another", ("a", 1), "value", ttl=60)
+
+    # keys may be returned as lists from JSON
+    assert store.invalidate("ns", lambda key: key[0] == "a") == 2
+    assert store.get("ns", ("b", 1)) == "value"
+    assert store.get("another", ("a", 1)) == "value"
+    assert store.invalidate("ns") == 1
+
+
+@pytest.mark.anyio
+async def test_async_methods(store):
+    await store.aset("ns", "key", "value", ttl=60)
+
+    assert await store.aget("ns", "key") == "value"
+    await store.adelete("ns", "key")
+    assert await store.aget("ns", "key") is None
+
+
+def test_sqlite_store_is_shared_by_connections(tmp_path):
+    SQLiteStore(str(tmp_path / "store.db")).set("ns", "key", [1, 2], ttl=60)
+
+    assert SQLiteStore(str(tmp_path / "store.db")).get("ns", "key") == [1, 2]
+
+
+def test_create_store(tmp_path):
+    assert isinstance(create_store("memory"), MemoryStore)
+    assert isinstance(create_store(f"sqlite:///{tmp_path}/store.db"), SQLiteStore)
+    with pytest.raises(ValueError):
+        create_store("redis://localhost")
+    with pytest.raises(ValueError):
+        create_store("sqlite:///")
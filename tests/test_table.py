@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from mcp_server.drivers.pagoda import AdvancedSearchResult
+from mcp_server.lib.table import flatten_row, to_table
+from mcp_server.tools.common import (
+    dump_advanced_search_result,
+    dump_json_array,
+    dump_json_table,
+    get_model_list,
+)
+
+
+async def iterate(rows):
+    for row in rows:
+        yield row
+
+
+def test_flatten_row_expands_nested_objects():
+    row = {"id": 1, "model": {"id": 2, "name": "Server"}, "tags": ["a"], "empty": {}}
+
+    assert flatten_row(row) == {
+        "id": 1,
+        "model.id": 2,
+        "model.name": "Server",
+        "tags": ["a"],
+        "empty": {},
+    }
+
+
+def test_to_table_has_union_of_columns():
+    rows = [{"id": 1, "attrs": {"IP": "10.0.0.1"}}, {"id": 2, "attrs": {"rack": "r1"}}]
+
+    assert to_table(rows) == {
+        "columns": ["id", "attrs.IP", "attrs.rack"],
+        "rows": [[1, "10.0.0.1", None], [2, None, "r1"]],
+    }
+    assert to_table([]) == {"columns": [], "rows": []}
+
+
+@pytest.mark.anyio
+async def test_dump_json_table_has_same_values_as_rows():
+    rows = [{"id": 1, "name": "サーバー"}, {"id": 2, "name": "b"}]
+
+    table = json.loads(await dump_json_table(["id", "name"], iterate(rows)))
+    array = json.loads(await dump_json_array(iterate(rows)))
+
+    assert table == {"columns": ["id", "name"], "rows": [[1, "サーバー"], [2, "b"]]}
+    assert [dict(zip(table["columns"], row)) for row in table["rows"]] == array
+
+
+@pytest.mark.anyio
+async def test_dump_json_table_of_no_rows():
+    assert json.loads(await dump_json_table(["id"], iterate([]))) == {
+        "columns": ["id"],
+        "rows": [],
+    }
+
+
+def test_advanced_search_result_as_table():
+    result = AdvancedSearchResult(
+        total_count=10,
+        values=[
+            {
+                "entry": {"id": 1, "name": "server1"},
+                "entity": {"id": 2, "name": "Server"},
+                "attrs": {"IP": {"value": {"as_string": "10.0.0.1"}}},
+                "referrals": None,
+            }
+        ],
+    )
+
+    table = json.loads(dump_advanced_search_result(result, "table"))
+
+    assert table["total_count"] == 10
+    assert dict(zip(table["columns"], table["rows"][0])) == {
+        "entry.id": 1,
+        "entry.name": "server1",
+        "entity.id": 2,
+        "entity.name": "Server",
+        "attrs.IP.value.as_string": "10.0.0.1",
+        "referrals": None,
+    }
+    assert (
+        json.loads(dump_advanced_search_result(result, "rows")) == result.model_dump()
+    )
+
+
+@pytest.mark.anyio
+async def test_model_list_as_table(pagoda, backend):
+    pagoda.responses["/entity/api/v2/"] = {
+        "count": 1,
+        "next": None,
+        "results": [
+            {
+                "id": 1,
+                "name": "Server",
+                "note": "",
+                "item_name_pattern": "",
+                "status": 0,
+                "is_toplevel": False,
+            }
+        ],
+    }
+
+    result = json.loads(await get_model_list(output_format="table", ctx=None))
+
+    assert result == {"columns": ["id", "name", "note"], "rows": [[1, "Server", ""]]}
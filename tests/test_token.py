@@ -0,0 +1,144 @@
+import ssl
+
+import httpx
+import pytest
+
+from mcp_server.lib import cache, http, pagoda
+from mcp_server.lib.cache import token_scope
+from mcp_server.lib.pagoda import (
+    TOKEN_CACHE,
+    TOKEN_NEGATIVE_CACHE_TTL,
+    is_token_valid_async,
+)
+
+ENDPOINT = "https://pagoda"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+class TokenServer:
+    """Token introspection of Pagoda which accepts "valid" only"""
+
+    def __init__(self):
+        self.requests = 0
+        self.status_code = 200
+        self.verify: list[bool] = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.status_code != 200:
+            return httpx.Response(self.status_code)
+        token = request.headers["Authorization"].removeprefix("Token ")
+        if token != "valid":
+            return httpx.Response(401, json={"detail": "Invalid token."})
+        return httpx.Response(200, json={"key": token})
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = TokenServer()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server.handle))
+
+    def get_async_client(url: str, verify: bool = False) -> httpx.AsyncClient:
+        server.verify.append(verify)
+        return client
+
+    monkeypatch.setattr(pagoda, "get_async_client", get_async_client)
+    TOKEN_CACHE.invalidate()
+    yield server
+    TOKEN_CACHE.invalidate()
+
+
+@pytest.mark.anyio
+async def test_token_is_verified_with_verifying_client(server):
+    assert await is_token_valid_async(ENDPOINT, "valid")
+    assert server.verify == [True]
+
+
+def test_verifying_client_has_its_own_pool():
+    http.configure_http_pool()
+    verifying = http.get_async_client(ENDPOINT + "/user/api/v2/token/", verify=True)
+    client = http.get_async_client(ENDPOINT + "/entry/api/v2/1/")
+
+    assert verifying is not client
+    assert verifying is http.get_async_client(ENDPOINT + "/", verify=True)
+    ssl_context = http._async_transports[(ENDPOINT, True)].transport._pool._ssl_context
+    assert ssl_context.verify_mode == ssl.CERT_REQUIRED
+    assert ssl_context.check_hostname
+    assert http.get_pool_stats()["endpoints"] == 1
+
+
+@pytest.mark.anyio
+async def test_valid_token_is_cached_for_ttl(server, clock):
+    assert await is_token_valid_async(ENDPOINT, "valid")
+    clock.now += TOKEN_CACHE.ttl
+    assert await is_token_valid_async(ENDPOINT, "valid")
+    assert server.requests == 1
+
+    clock.now += 1
+    assert await is_token_valid_async(ENDPOINT, "valid")
+    assert server.requests == 2
+
+
+@pytest.mark.anyio
+async def test_invalid_token_is_cached_for_shorter_time(server, clock):
+    assert not await is_token_valid_async(ENDPOINT, "invalid")
+    clock.now += TOKEN_NEGATIVE_CACHE_TTL
+    assert not await is_token_valid_async(ENDPOINT, "invalid")
+    assert server.requests == 1
+
+    clock.now += 1
+    assert not await is_token_valid_async(ENDPOINT, "invalid")
+    assert server.requests == 2
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("status_code", [500, 503])
+async def test_server_error_is_not_cached(server, status_code):
+    server.status_code = status_code
+    assert not await is_token_valid_async(ENDPOINT, "valid")
+
+    server.status_code = 200
+    assert await is_token_valid_async(ENDPOINT, "valid")
+    assert server.requests == 2
+
+
+@pytest.mark.anyio
+async def test_connection_error_is_not_cached(server, monkeypatch):
+    def handle(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("certificate verify failed")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    monkeypatch.setattr(pagoda, "get_async_client", lambda url, verify: client)
+
+    assert not await is_token_valid_async(ENDPOINT, "valid")
+    assert TOKEN_CACHE.stats()["size"] == 0
+
+
+@pytest.mark.anyio
+async def test_cache_is_not_keyed_by_token(server):
+    await is_token_valid_async(ENDPOINT, "valid")
+
+    assert TOKEN_CACHE.get((ENDPOINT, token_scope("valid"))) is True
+    assert all("valid" not in str(key) for key in TOKEN_CACHE._entries)
+
+
+def test_token_scope_does_not_contain_token():
+    scope = token_scope("secret")
+
+    assert "secret" not in scope
+    assert scope == token_scope("secret")
+    assert scope != token_scope("another")
@@ -0,0 +1,196 @@
+import asyncio
+
+import pytest
+
+from mcp_server.lib.topology import TopologyGraph
+from mcp_server.tools import router
+from mcp_server.tools.router import TopologyCache
+
+
+def make_router(node_id: int, name: str, ports: dict[str, int], peer: int = 0):
+    attrs = [
+        {
+            "schema": {"name": "ports"},
+            "value": {
+                "as_array_named_object": [
+                    {"name": port, "object": {"id": target, "name": f"r{target}"}}
+                    for port, target in ports.items()
+                ]
+            },
+        }
+    ]
+    if peer:
+        attrs.append(
+            {
+                "schema": {"name": "peer"},
+                "value": {"as_object": {"id": peer, "name": f"r{peer}"}},
+            }
+        )
+    return {"id": node_id, "name": name, "attrs": attrs}
+
+
+@pytest.fixture
+def items():
+    # r1 - r2 - r3 - r4 and r1 - r5 - r4, r6 is isolated and 99 is out of the topology
+    return [
+        make_router(1, "r1", {"p1": 2, "p2": 5, "p9": 99}),
+        make_router(2, "r2", {"p1": 3}),
+        make_router(3, "r3", {}, peer=4),
+        make_router(4, "r4", {}),
+        make_router(5, "r5", {"p1": 4}),
+        make_router(6, "r6", {}),
+    ]
+
+
+def test_references_are_undirected_labeled_edges(items):
+    graph = TopologyGraph(items)
+
+    assert graph.adjacency[1] == {2: {"ports:p1"}, 5: {"ports:p2"}}
+    assert graph.adjacency[4] == {3: {"peer"}, 5: {"ports:p1"}}
+    assert graph.adjacency[6] == {}
+
+
+def test_resolve_router_by_name_or_id(items):
+    graph = TopologyGraph(items)
+
+    assert graph.resolve("r3") == 3
+    assert graph.resolve("3") == 3
+    assert graph.resolve(3) == 3
+    with pytest.raises(ValueError):
+        graph.resolve("r99")
+    with pytest.raises(ValueError):
+        graph.resolve(99)
+
+
+def test_neighbors_within_depth(items):
+    graph = TopologyGraph(items)
+
+    assert graph.neighbors(1) == {1: 0, 2: 1, 5: 1}
+    assert graph.neighbors(1, depth=2) == {1: 0, 2: 1, 5: 1, 3: 2, 4: 2}
+    assert graph.neighbors(6, depth=3) == {6: 0}
+
+
+def test_path_is_one_of_shortest_paths(items):
+    graph = TopologyGraph(items)
+
+    assert graph.path(1, 4) == [1, 5, 4]
+    assert graph.path(2, 2) == [2]
+    assert graph.path(1, 6) is None
+
+
+def test_edges_between_nodes(items):
+    graph = TopologyGraph(items)
+
+    assert graph.edges({1, 2, 5}) == [
+        {"source": 1, "target": 2, "labels": ["ports:p1"]},
+        {"source": 1, "target": 5, "labels": ["ports:p2"]},
+    ]
+
+
+def test_attrs_of_dict_are_accepted():
+    graph = TopologyGraph(
+        [
+            {
+                "id": 1,
+                "name": "r1",
+                "attrs": {"peer": {"value": {"as_object": {"id": 2}}}},
+            },
+            {"id": 2, "name": "r2", "attrs": {}},
+        ]
+    )
+
+    assert graph.edges({1, 2}) == [{"source": 1, "target": 2, "labels": ["peer"]}]
+
+
+def test_update_is_same_as_building_again(items):
+    graph = TopologyGraph(items)
+    updated = [
+        # r1 loses r5, r7 is added and referred by r6, r4 is removed
+        make_router(1, "r1", {"p1": 2}),
+        make_router(2, "r2", {"p1": 3}),
+        make_router(3, "r3", {}, peer=4),
+        make_router(5, "r5", {"p1": 4}),
+        make_router(6, "r6", {"p1": 7, "p2": 7}),
+        make_router(7, "r7", {}),
+    ]
+
+    assert graph.update(updated) == 4
+    expected = TopologyGraph(updated)
+    assert graph.adjacency == expected.adjacency
+    assert graph.nodes == expected.nodes
+    assert graph.ids_by_name == expected.ids_by_name
+    assert graph.path(1, 5) is None
+    assert graph.neighbors(7) == {7: 0, 6: 1}
+
+
+def test_update_without_changes(items):
+    graph = TopologyGraph(items)
+
+    assert graph.update([dict(item) for item in items]) == 0
+    assert graph.adjacency == TopologyGraph(items).adjacency
+
+
+def test_removed_item_is_linked_again_when_added(items):
+    graph = TopologyGraph(items)
+    graph.update([item for item in items if item["id"] != 2])
+    assert graph.path(1, 3) == [1, 5, 4, 3]
+
+    graph.update(items)
+    assert graph.path(1, 3) == [1, 2, 3]
+
+
+@pytest.fixture
+def topology(monkeypatch, items):
+    topology = {"items": items, "fetches": 0}
+
+    async def get_router_topology(endpoint, token, log_prefix=""):
+        topology["fetches"] += 1
+        return topology["items"]
+
+    monkeypatch.setattr(router, "get_router_topology", get_router_topology)
+    return topology
+
+
+@pytest.mark.anyio
+async def test_topology_is_fetched_once_and_refreshed(topology):
+    cache = TopologyCache(refresh_interval=0.02, idle_timeout=10)
+    try:
+        graphs = await asyncio.gather(
+            *[cache.get("http://pagoda", "token") for _ in range(3)]
+        )
+        assert graphs[0] is graphs[1] is graphs[2]
+        assert topology["fetches"] == 1
+
+        topology["items"] = topology["items"][:2]
+        await asyncio.sleep(0.1)
+        graph = await cache.get("http://pagoda", "token")
+        assert graph is graphs[0]
+        assert topology["fetches"] > 1
+        assert set(graph.nodes) == {1, 2}
+    finally:
+        cache.clear()
+
+
+@pytest.mark.anyio
+async def test_topology_is_dropped_when_idle(topology):
+    cache = TopologyCache(refresh_interval=0, idle_timeout=0.02)
+    try:
+        graph = await cache.get("http://pagoda", "token")
+        await asyncio.sleep(0.1)
+
+        assert await cache.get("http://pagoda", "token") is not graph
+        assert topology["fetches"] == 2
+    finally:
+        cache.clear()
+
+
+@pytest.mark.anyio
+async def test_topology_is_cached_per_token(topology):
+    cache = TopologyCache()
+    try:
+        graph = await cache.get("http://pagoda", "token")
+
+        assert await cache.get("http://pagoda", "another") is not graph
+        assert await cache.get("http://pagoda", "token") is graph
+    finally:
+        cache.clear()